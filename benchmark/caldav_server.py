@@ -0,0 +1,118 @@
+"""Local CalDAV stand-in which serves one calendar collection."""
+
+import http.server
+import threading
+import time
+import urllib.parse
+
+_RESPONSE = "<D:response><D:href>{href}</D:href><D:propstat><D:prop><D:getetag>\"{etag}\"</D:getetag></D:prop>" \
+            "<D:status>HTTP/1.1 200 OK</D:status></D:propstat></D:response>"
+
+
+class FakeCalDAVServer:
+    """Answer the REPORT, PUT and DELETE requests of the calendar objects on a local port."""
+
+    def __init__(self, events=None, latency=0.0, host="127.0.0.1", port=0):
+        """Initialize the object.
+
+        :param dict events: Calendar objects already in the collection. ({'<uid>.ics': iCalendar text})
+        :param float latency: Seconds to wait before each response.
+        :param str host: Host.
+        :param int port: Port. (default=0, any free port)
+        """
+        self.events = dict(events or {})
+        self.latency = latency
+        # Request count by method, e.g. {'PUT': 3}
+        self.requests = {}
+        # Faults of the PUT requests, consumed one per request. ({'PUT': [status code]})
+        self.faults = {}
+        self._lock = threading.Lock()
+        self._server = http.server.ThreadingHTTPServer((host, port), self._create_handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Return the URL of the calendar collection.
+
+        :return: URL.
+        :rtype: str
+        """
+        return f"http://{self._server.server_address[0]}:{self._server.server_address[1]}/calendars/jobalio/"
+
+    def start(self) -> None:
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._thread is not None:
+            self._server.shutdown()
+        self._server.server_close()
+
+    def _create_handler(self):
+        """Create the request handler class bound to the server.
+
+        :return: Request handler class.
+        """
+        _fake = self
+
+        class _Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_REPORT(self):
+                self._read_body()
+                with _fake._lock:
+                    _names = sorted(_fake.events)
+                _body = (
+                    '<?xml version="1.0" encoding="utf-8" ?><D:multistatus xmlns:D="DAV:">'
+                    + "".join(_RESPONSE.format(href=self._get_href(_name), etag=hash(_name)) for _name in _names)
+                    + "</D:multistatus>"
+                ).encode("utf-8")
+                self._respond(207, _body, "application/xml; charset=utf-8")
+
+            def do_PUT(self):
+                _name = self._get_name()
+                _text = self._read_body().decode("utf-8")
+                with _fake._lock:
+                    _exists = _name in _fake.events
+                    if _fake.faults.get(self.command):
+                        _status = _fake.faults[self.command].pop(0)
+                    elif _exists and (self.headers.get("If-None-Match") == "*"):
+                        _status = 412
+                    else:
+                        _fake.events[_name] = _text
+                        _status = 204 if _exists else 201
+                self._respond(_status)
+
+            def do_DELETE(self):
+                self._read_body()
+                with _fake._lock:
+                    _status = 204 if _fake.events.pop(self._get_name(), None) is not None else 404
+                self._respond(_status)
+
+            def _get_name(self) -> str:
+                return urllib.parse.unquote(urllib.parse.urlparse(self.path).path.rstrip("/").split("/")[-1])
+
+            @staticmethod
+            def _get_href(name) -> str:
+                return f"/calendars/jobalio/{urllib.parse.quote(name)}"
+
+            def _read_body(self) -> bytes:
+                if _fake.latency:
+                    time.sleep(_fake.latency)
+                with _fake._lock:
+                    _fake.requests[self.command] = _fake.requests.get(self.command, 0) + 1
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            def _respond(self, status, body=b"", content_type="text/plain; charset=utf-8"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return _Handler
@@ -0,0 +1,501 @@
+"""Fake Appium/WebDriver endpoint which models the Naver calendar screens used by NaverCalendar."""
+
+import collections
+import datetime
+import http.server
+import json
+import re
+import threading
+import time
+import uuid
+
+_ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+_WINDOW = {"x": 0, "y": 0, "width": 1080, "height": 2340}
+# Date wheels of the picker. The wheel shows 5 rows, so the pitch of a row is 100 pixels.
+_WHEELS = {"year": (140, 1500), "month": (540, 1500), "day": (940, 1500)}
+_WHEEL_SIZE = {"width": 280, "height": 500}
+
+
+class FakeCalendarState:
+    """State of the fake Naver calendar app."""
+
+    def __init__(self, calendar, events=None):
+        """Initialize the object.
+
+        :param str calendar: Name of the calendar selected in the form.
+        :param dict events: {title: 'YYYY.MM.DD'} of the schedules already in the calendar. (default=None)
+        """
+        self.calendar = calendar
+        self.events = dict(events or {})
+        self.screens = ["home"]
+        self.keyword = ""
+        self.search_calendar = None
+        self.form = {}
+        self.detail = None
+        self.active_date = "startDate"
+
+    @property
+    def screen(self) -> str:
+        """Return the current screen name.
+
+        :return: Screen name.
+        :rtype: str
+        """
+        return self.screens[-1]
+
+    def open_form(self, title=None) -> None:
+        """Open the adding schedule form, or the editing form of the schedule.
+
+        :param str title: Title of the schedule to edit. (default=None, add a schedule)
+        """
+        _date = datetime.date.today()
+        if title is not None:
+            _date = datetime.datetime.strptime(self.events[title], "%Y.%m.%d").date()
+        self.form = {
+            "content": title or "", "memoEdit": "", "allday": title is not None, "reminder": title is None,
+            "calendarName": self.calendar, "startDate": [_date.year, _date.month, _date.day],
+            "endDate": [_date.year, _date.month, _date.day], "editing": title
+        }
+        self.screens.append("form")
+
+    def results(self) -> list:
+        """Return the search result titles.
+
+        :return: Title list.
+        :rtype: list
+        """
+        if not self.keyword:
+            return []
+        return [_title for _title in self.events if self.keyword in _title]
+
+    def elements(self) -> dict:
+        """Return the visible elements of the current screen.
+
+        :return: {resource id name: text}
+        :rtype: dict
+        """
+        _screen = self.screen
+        if _screen == "home":
+            return {"launcherIcon": ""}
+        if _screen == "calendar":
+            return {"menu_search": "", "floating_write_button": "", "floating_action_menu_schedule": ""}
+        if _screen in ("filter", "calendarFilter"):
+            return {"searchFilterInit": "", "calendarFilter": "", f"text:{self.calendar}": self.calendar}
+        if _screen == "search":
+            _elements = {"search_keyword_editor": self.keyword, "search_filter": ""}
+            if self.keyword and not self.results():
+                _elements["empty_view"] = ""
+            return _elements
+        if _screen == "detail":
+            return {"startDate": f"{self.events[self.detail]}(월)", "menu_edit": "", "menu_delete": ""}
+        if _screen == "dialog":
+            return {"button1": ""}
+        if _screen == "form":
+            _elements = {
+                "content": self.form["content"], "allday": "", "memoEdit": self.form["memoEdit"],
+                "calendarName": self.form["calendarName"], "toolbarConfirm": "",
+                "startDate": self._date_text("startDate"), "endDate": self._date_text("endDate"),
+                "year": "", "month": "", "day": ""
+            }
+            if self.form["reminder"]:
+                _elements["reminder_chip_view_remove"] = ""
+            return _elements
+        return {}
+
+    def _date_text(self, name) -> str:
+        """Return the date text of the form.
+
+        :param str name: 'startDate' or 'endDate'.
+        :return: 'YYYY.MM.DD(요일)'
+        :rtype: str
+        """
+        _year, _month, _day = self.form[name]
+        return f"{_year:04d}.{_month:02d}.{_day:02d}(월)"
+
+    def tap(self, name) -> None:
+        """Apply the tap on the element.
+
+        :param str name: Element name.
+        """
+        if name == "launcherIcon":
+            self.screens = ["home", "calendar"]
+        elif name == "menu_search":
+            self.keyword = ""
+            self.screens.append("search")
+        elif name == "search_filter":
+            self.screens.append("filter")
+        elif name == "calendarFilter":
+            self.screens.append("calendarFilter")
+        elif name == "searchFilterInit":
+            self.search_calendar = None
+        elif name.startswith("text:") and self.screen == "calendarFilter":
+            self.search_calendar = name.split(":", 1)[1]
+        elif name == "floating_action_menu_schedule":
+            self.open_form()
+        elif name == "menu_edit" and self.screen == "detail":
+            self.open_form(self.detail)
+        elif name == "menu_delete" and self.screen == "detail":
+            self.screens.append("dialog")
+        elif name == "button1" and self.screen == "dialog":
+            del self.events[self.detail]
+            self.screens = self.screens[:-2]
+        elif name.startswith("content:") and self.screen == "search":
+            self.detail = name.split(":", 1)[1]
+            self.screens.append("detail")
+        elif name == "allday":
+            self.form["allday"] = not self.form["allday"]
+        elif name == "reminder_chip_view_remove":
+            self.form["reminder"] = False
+        elif name in ("startDate", "endDate") and self.screen == "form":
+            self.active_date = name
+        elif name == "toolbarConfirm":
+            _start = self.form["startDate"]
+            if self.form["editing"] is not None:
+                del self.events[self.form["editing"]]
+                self.detail = self.form["content"]
+            self.events[self.form["content"]] = f"{_start[0]:04d}.{_start[1]:02d}.{_start[2]:02d}"
+            self.back()
+
+    def back(self) -> None:
+        """Go back to the previous screen."""
+        if len(self.screens) > 1:
+            self.screens.pop()
+
+    def swipe(self, x, y_start, y_end) -> None:
+        """Apply the swipe on the date wheel.
+
+        :param float x: X position.
+        :param float y_start: Start Y position.
+        :param float y_end: End Y position.
+        """
+        if self.screen != "form":
+            return
+
+        _pitch = _WHEEL_SIZE["height"] / 5
+        _length = abs(y_end - y_start)
+        _notches = max(1, round((_length - _pitch * 3 / 4) / _pitch) + 1)
+        _offset = _notches if y_end < y_start else -_notches
+
+        for _index, (_name, (_x, _)) in enumerate(_WHEELS.items()):
+            if abs(_x - x) < _WHEEL_SIZE["width"] / 2:
+                _date = self.form[self.active_date]
+                _date[_index] += _offset
+                _date[1] = (_date[1] - 1) % 12 + 1
+                _date[2] = (_date[2] - 1) % 31 + 1
+
+    def page_source(self) -> str:
+        """Return the page source XML of the current screen.
+
+        :return: Page source.
+        :rtype: str
+        """
+        _nodes = []
+        for _order, (_name, _text) in enumerate(self.elements().items()):
+            _resource_id = "" if _name.startswith("text:") else f"com.nhn.android.calendar:id/{_name}"
+            _selected = "true" if (_name == "allday" and self.form.get("allday")) else "false"
+            _nodes.append(
+                f'<android.widget.TextView index="{_order}" resource-id="{_resource_id}" text="{_escape(_text)}" '
+                f'selected="{_selected}" bounds="[0,{_order * 100}][1080,{_order * 100 + 90}]"/>'
+            )
+        for _order, _title in enumerate(self.results() if self.screen == "search" else []):
+            _nodes.append(
+                f'<android.widget.TextView resource-id="com.nhn.android.calendar:id/content" text="{_escape(_title)}" '
+                f'selected="false" bounds="[0,{1000 + _order * 100}][1080,{1090 + _order * 100}]"/>'
+            )
+        return f'<?xml version="1.0" encoding="UTF-8"?><hierarchy rotation="0">{"".join(_nodes)}</hierarchy>'
+
+
+def _escape(text) -> str:
+    """Escape the XML attribute value.
+
+    :param str text: Text.
+    :return: Escaped text.
+    :rtype: str
+    """
+    return text.replace("&", "&amp;").replace('"', "&quot;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+class FakeWebDriverServer:
+    """Local W3C WebDriver endpoint with Appium extensions, configurable per-command latency and command counts."""
+
+    def __init__(self, calendar, events=None, latency=0.0, host="127.0.0.1", port=0):
+        """Initialize the object.
+
+        :param str calendar: Name of the calendar selected in the form.
+        :param dict events: {title: 'YYYY.MM.DD'} of the schedules already in the calendar. (default=None)
+        :param float latency: Seconds to wait before each response.
+        :param str host: Host.
+        :param int port: Port. (default=0, any free port)
+        """
+        self.state = FakeCalendarState(calendar, events)
+        self.latency = latency
+        self.commands = collections.Counter()
+        self.bytes = 0
+        # Faults of the commands, consumed one per command. ({command (e.g. 'POST /session'): [status code]})
+        self.faults = {}
+        self._lock = threading.Lock()
+        self._elements = {}
+        self._server = http.server.ThreadingHTTPServer((host, port), self._create_handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Return the URL of the server.
+
+        :return: URL.
+        :rtype: str
+        """
+        return f"http://{self._server.server_address[0]}:{self._server.server_address[1]}"
+
+    def start(self) -> None:
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counts(self) -> None:
+        """Reset the command counts."""
+        with self._lock:
+            self.commands.clear()
+            self.bytes = 0
+
+    def handle(self, method, path, body) -> tuple:
+        """Handle the command.
+
+        :param str method: HTTP method.
+        :param str path: Path.
+        :param dict body: JSON body.
+        :return: (status code, value)
+        :rtype: tuple
+        """
+        _state = self.state
+        if path == "/session" and method == "POST":
+            return 200, {"sessionId": uuid.uuid4().hex, "capabilities": body.get("capabilities", {}).get("alwaysMatch", {})}
+
+        _match = re.match(r"/session/[^/]+(/.*)?$", path)
+        _command = (_match.group(1) or "") if _match else path
+
+        if _command in ("/element", "/elements"):
+            _names = self._lookup(body["using"], body["value"])
+            if _command == "/elements":
+                return 200, [{_ELEMENT_KEY: self._element_id(_name)} for _name in _names]
+            if not _names:
+                return 404, {"error": "no such element", "message": f"{body['value']} is not found."}
+            return 200, {_ELEMENT_KEY: self._element_id(_names[0])}
+
+        _element = re.match(r"/element/([^/]+)/(\w+)(?:/(.+))?$", _command)
+        if _element:
+            return self._handle_element(self._elements.get(_element.group(1), ""), _element.group(2), _element.group(3), body)
+
+        if _command == "/source":
+            return 200, _state.page_source()
+        if _command == "/back":
+            _state.back()
+            return 200, None
+        if _command == "/actions":
+            self._perform_actions(body.get("actions", []))
+            return 200, None
+        if _command == "/touch/perform":
+            for _action in body.get("actions", []):
+                if _action.get("action") == "tap" and "element" in _action.get("options", {}):
+                    _state.tap(self._elements.get(_action["options"]["element"], ""))
+            return 200, None
+        if _command in ("/window/rect", "/window/current/size"):
+            return 200, dict(_WINDOW)
+        if _command == "/appium/device/is_keyboard_shown":
+            return 200, False
+        if _command == "/appium/device/current_activity":
+            return 200, ".MainActivity"
+        if _command == "/appium/device/current_package":
+            return 200, "com.nhn.android.calendar"
+        if _command == "/appium/device/press_keycode":
+            _state.screens = ["home"]
+            return 200, None
+        if _command == "/execute/sync":
+            return 200, self._execute_script(body.get("script", ""), (body.get("args") or [{}])[0])
+        return 200, None
+
+    def _execute_script(self, script, argument):
+        """Handle the 'mobile:' script which the Appium client sends for the device commands.
+
+        :param str script: Script name.
+        :param dict argument: Script argument.
+        :return: Script result.
+        """
+        if script == "mobile: pressKey" and argument.get("keycode") == 3:
+            self.state.screens = ["home"]
+        elif script == "mobile: isKeyboardShown":
+            return False
+        elif script == "mobile: getCurrentActivity":
+            return ".MainActivity"
+        elif script == "mobile: getCurrentPackage":
+            return "com.nhn.android.calendar" if self.state.screen != "home" else "com.sec.android.app.launcher"
+        return None
+
+    def _handle_element(self, name, command, argument, body) -> tuple:
+        """Handle the element command.
+
+        :param str name: Element name.
+        :param str command: Element command.
+        :param str argument: Command argument.
+        :param dict body: JSON body.
+        :return: (status code, value)
+        :rtype: tuple
+        """
+        _state = self.state
+        _elements = _state.elements()
+        _visible = name in _elements or (name.startswith("content:") and name.split(":", 1)[1] in _state.results())
+        if not _visible:
+            return 404, {"error": "stale element reference", "message": f"{name} is not on the screen."}
+
+        if command == "text":
+            return 200, _elements.get(name, name.split(":", 1)[-1])
+        if command == "selected":
+            return 200, bool(name == "allday" and _state.form.get("allday"))
+        if command == "attribute":
+            return 200, {"bounds": "[0,1000][1080,1090]", "selected": "false"}.get(argument, "")
+        if command == "rect":
+            if name in _WHEELS:
+                _x, _y = _WHEELS[name]
+                return 200, {"x": _x - _WHEEL_SIZE["width"] / 2, "y": _y - _WHEEL_SIZE["height"] / 2, **_WHEEL_SIZE}
+            return 200, {"x": 0, "y": 1000, "width": 1080, "height": 90}
+        if command == "clear":
+            self._set_text(name, "")
+            return 200, None
+        if command == "value":
+            self._set_text(name, _elements.get(name, "") + body.get("text", ""))
+            return 200, None
+        if command == "click":
+            _state.tap(name)
+            return 200, None
+        return 200, None
+
+    def _set_text(self, name, text) -> None:
+        """Set the text of the editable element.
+
+        :param str name: Element name.
+        :param str text: Text.
+        """
+        if name == "search_keyword_editor":
+            self.state.keyword = text
+        elif name in ("content", "memoEdit"):
+            self.state.form[name] = text
+
+    def _perform_actions(self, actions) -> None:
+        """Apply the W3C pointer action sequences as taps and swipes.
+
+        :param list actions: Input source list.
+        """
+        for _source in actions:
+            _x = _y = _down = None
+            for _action in _source.get("actions", []):
+                if _action["type"] == "pointerMove":
+                    _x, _y = _action.get("x", _x), _action.get("y", _y)
+                elif _action["type"] == "pointerDown":
+                    _down = (_x, _y)
+                elif _action["type"] == "pointerUp" and _down is not None:
+                    if abs(_down[1] - _y) > 10:
+                        self.state.swipe(_x, _down[1], _y)
+                    else:
+                        self._tap_position(_x, _y)
+                    _down = None
+
+    def _tap_position(self, x, y) -> None:
+        """Tap the element at the position of the page source.
+
+        :param float x: X position.
+        :param float y: Y position.
+        """
+        for _order, _name in enumerate(self.state.elements()):
+            if _order * 100 <= y <= _order * 100 + 90:
+                self.state.tap(_name)
+                return
+
+    def _lookup(self, using, value) -> list:
+        """Return the element names which the locator finds on the current screen.
+
+        :param str using: Locator strategy.
+        :param str value: Locator value.
+        :return: Element name list.
+        :rtype: list
+        """
+        _elements = self.state.elements()
+        _text = re.search(r'(?:textContains|text)\("((?:[^"\\]|\\.)*)"\)|@text=\'([^\']*)\'|contains\(@text, \'([^\']*)\'\)', value)
+        _text = None if _text is None else next(_group for _group in _text.groups() if _group is not None).replace('\\"', '"')
+        _id = re.search(r"id/(\w+)", value)
+        _id = None if _id is None else _id.group(1)
+
+        if using == "accessibility id" or "content-desc" in value:
+            return ["launcherIcon"] if "launcherIcon" in _elements else []
+        if _id == "content" and self.state.screen == "search":
+            return [f"content:{_title}" for _title in self.state.results() if _text is None or _title == _text]
+        if _id == "calendarText":
+            return ["calendarText"] if self.state.screen == "form" else []
+        if _id is not None:
+            return [_id] if _id in _elements else []
+        if _text is not None:
+            return [_name for _name in _elements if _name == f"text:{_text}"]
+        return []
+
+    def _element_id(self, name) -> str:
+        """Return the element id of the name.
+
+        :param str name: Element name.
+        :return: Element id.
+        :rtype: str
+        """
+        _element_id = f"fake-{abs(hash(name))}"
+        self._elements[_element_id] = name
+        return _element_id
+
+    def _create_handler(self):
+        """Create the request handler class bound to the server.
+
+        :return: Request handler class.
+        """
+        _fake = self
+
+        class _Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self, method):
+                _length = int(self.headers.get("Content-Length", 0))
+                _body = json.loads(self.rfile.read(_length) or b"{}") if _length else {}
+                if _fake.latency:
+                    time.sleep(_fake.latency)
+
+                with _fake._lock:
+                    _name = re.sub(r"/session/[^/]+", "", self.path) or "/session"
+                    _command = f"{method} {re.sub(r'/element/[^/]+', '/element/:id', _name)}"
+                    if _fake.faults.get(_command):
+                        _status = _fake.faults[_command].pop(0)
+                        _value = {"error": "unknown error", "message": f"{_command} is failed by the fault."}
+                    else:
+                        _status, _value = _fake.handle(method, self.path.rstrip("/").replace("/wd/hub", ""), _body)
+                    _fake.commands[_command] += 1
+                    _payload = json.dumps({"value": _value}).encode("utf-8")
+                    _fake.bytes += len(_payload)
+
+                self.send_response(_status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(_payload)))
+                self.end_headers()
+                self.wfile.write(_payload)
+
+            def do_GET(self):
+                self._respond("GET")
+
+            def do_POST(self):
+                self._respond("POST")
+
+            def do_DELETE(self):
+                self._respond("DELETE")
+
+            def log_message(self, *args):
+                pass
+
+        return _Handler
@@ -0,0 +1,217 @@
+"""Local HTTP fixture server which serves recruit.do result pages."""
+
+import datetime
+import http.server
+import os
+import threading
+import time
+import urllib.parse
+
+_ROW = (
+    '<tr>'
+    '<td><input type="checkbox" name="chk" value="{idx}"></td>'
+    '<td>{no}</td>'
+    '<td class="left"><a href="/recruitview.do?pageNo=1&amp;idx={idx}">\'{org}\' {position} 채용 공고 ({idx})</a></td>'
+    '<td>{org}</td>'
+    '<td>\r\n\t\t\t\t{location}\r\n\t\t\t</td>'
+    '<td>\r\n\t\t\t\t정규직\r\n\t\t\t</td>'
+    '<td>\r\n\t\t\t\t{register_date}\r\n\t\t\t</td>'
+    '<td>\r\n\t\t\t\t{deadline_date} 18:00\r\n\t\t\t</td>'
+    '<td><span class="ing">{status}</span></td>'
+    '</tr>'
+)
+_LOCATIONS = ["서울특별시", "인천광역시", "대전광역시", "제주특별자치도"]
+
+
+class FixtureServer:
+    """Serve generated or recorded recruit.do pages on a local port."""
+
+    def __init__(self, pages=10, rows=10, latency=0.0, record_dir=None, start_date=None, host="127.0.0.1", port=0):
+        """Initialize the object.
+
+        :param int pages: Page count which has rows.
+        :param int rows: Row count of a page.
+        :param float latency: Seconds to wait before each response.
+        :param str record_dir: Directory of recorded pages 'page_<no>.html' which are served instead. (default=None)
+        :param datetime.date start_date: Register date of the newest notice. (default=None, today)
+        :param str host: Host.
+        :param int port: Port. (default=0, any free port)
+        """
+        self.pages = pages
+        self.rows = rows
+        self.latency = latency
+        self.record_dir = record_dir
+        self.start_date = start_date or datetime.date.today()
+        # Changes of the postings, e.g. to check the update and delete operations. ({idx: days}, {idx})
+        self.deadline_days = {}
+        self.closed = set()
+        # Faults of the result pages, consumed one per request. ({page no: [status code (int) or delay seconds (float)]})
+        self.faults = {}
+        self.requests = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._server = http.server.ThreadingHTTPServer((host, port), self._create_handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Return the recruit.do URL of the server.
+
+        :return: URL.
+        :rtype: str
+        """
+        return f"http://{self._server.server_address[0]}:{self._server.server_address[1]}/recruit.do"
+
+    def start(self) -> None:
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._thread is not None:
+            self._server.shutdown()
+        self._server.server_close()
+
+    def render_page(self, page_no, start_date=None, end_date=None) -> bytes:
+        """Render the result page.
+
+        :param int page_no: Page number.
+        :param str start_date: First register date 'YYYY.MM.DD' of the period. (default=None, no limit)
+        :param str end_date: Last register date 'YYYY.MM.DD' of the period. (default=None, no limit)
+        :return: Page content.
+        :rtype: bytes
+        """
+        if self.record_dir is not None:
+            _path = os.path.join(self.record_dir, f"page_{page_no}.html")
+            if os.path.exists(_path):
+                with open(_path, "rb") as _f:
+                    return _f.read()
+            return self._wrap("", page_no, 0)
+
+        _orders = range(self.pages * self.rows)
+        if (start_date is not None) or (end_date is not None):
+            _orders = [
+                _order for _order in _orders
+                if (start_date or "0000.00.00") <= self._get_register_date(_order).strftime("%Y.%m.%d") <= (end_date or "9999.99.99")
+            ]
+
+        _rows = []
+        for _order in _orders[(page_no - 1) * self.rows:page_no * self.rows]:
+            _register_date = self._get_register_date(_order)
+            _rows.append(_ROW.format(
+                idx=900000 - _order,
+                no=self.pages * self.rows - _order,
+                org=f"기관{_order % 37}",
+                position=f"직무{_order % 11}",
+                location=_LOCATIONS[_order % len(_LOCATIONS)],
+                register_date=_register_date.strftime("%Y.%m.%d"),
+                deadline_date=(
+                    _register_date + datetime.timedelta(days=self.deadline_days.get(900000 - _order, 14))
+                ).strftime("%y.%m.%d"),
+                status="마감" if (900000 - _order) in self.closed else "진행중"
+            ))
+        return self._wrap("".join(_rows), page_no, -(-len(_orders) // max(self.rows, 1)))
+
+    def _get_register_date(self, order) -> datetime.date:
+        """Return the register date of the notice. A page of notices is registered a day.
+
+        :param int order: Order of the notice from the newest.
+        :return: Register date.
+        :rtype: datetime.date
+        """
+        return self.start_date - datetime.timedelta(days=order // max(self.rows, 1))
+
+    @staticmethod
+    def render_detail(idx) -> bytes:
+        """Render the detail page of recruitview.do.
+
+        :param str idx: Notice idx.
+        :return: Page content.
+        :rtype: bytes
+        """
+        return (
+            '<html><head><meta charset="utf-8"></head><body><div class="tbl_view"><table><tbody>'
+            f'<tr><th scope="row">공고명</th><td colspan="3">채용 공고 ({idx})</td></tr>'
+            '<tr><th scope="row">접수기간</th><td>\r\n\t\t2026.01.01 09:00 ~ 2026.01.15 18:00\r\n\t</td>'
+            f'<th scope="row">채용인원</th><td>{int(idx) % 9 + 1}명</td></tr>'
+            '<tr><th scope="row">첨부파일</th><td>'
+            f'<a href="/fileDownload.do?fileNo={idx}1">공고문.hwp</a><br/>'
+            f'<a href="/fileDownload.do?fileNo={idx}2">응시원서.hwp</a>'
+            '</td></tr></tbody></table></div></body></html>'
+        ).encode("utf-8")
+
+    def _wrap(self, rows, page_no, pages) -> bytes:
+        """Wrap the rows with the page layout and the paging area.
+
+        :param str rows: Table rows.
+        :param int page_no: Page number.
+        :param int pages: Page count of the result.
+        :return: Page content.
+        :rtype: bytes
+        """
+        _first = (page_no - 1) // 10 * 10 + 1
+        _paging = "".join(
+            f'<a href="javascript:goPage({i})">{i}</a>' for i in range(_first, min(_first + 10, pages + 1))
+        )
+        if pages > 0:
+            _paging += f'<a class="last" href="javascript:goPage({pages})">마지막</a>'
+        return (
+            '<html><head><meta charset="utf-8"></head><body>'
+            '<form id="frm" name="frm"><table class="tbl type_03"><thead><tr><th>번호</th></tr></thead>'
+            f'<tbody>{rows}</tbody></table></form>'
+            f'<div class="paging">{_paging}</div>'
+            '</body></html>'
+        ).encode("utf-8")
+
+    def _create_handler(self):
+        """Create the request handler class bound to the server.
+
+        :return: Request handler class.
+        """
+        _fixture = self
+
+        class _Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                _path = urllib.parse.urlparse(self.path)
+                _query = urllib.parse.parse_qs(_path.query)
+                if _fixture.latency:
+                    time.sleep(_fixture.latency)
+
+                _headers = {"Content-Type": "text/html; charset=utf-8"}
+                if _path.path.endswith("recruitview.do"):
+                    _idx = _query.get("idx", ["0"])[0]
+                    _headers["ETag"] = f'"detail-{_idx}"'
+                    if self.headers.get("If-None-Match") == _headers["ETag"]:
+                        _status, _body = 304, b""
+                    else:
+                        _status, _body = 200, _fixture.render_detail(_idx)
+                else:
+                    _page_no = int(_query.get("pageNo", ["1"])[0])
+                    with _fixture._lock:
+                        _fault = _fixture.faults.get(_page_no, []).pop(0) if _fixture.faults.get(_page_no) else None
+                    if isinstance(_fault, float):
+                        time.sleep(_fault)
+                    if isinstance(_fault, int):
+                        _status, _body = _fault, b""
+                    else:
+                        _status, _body = 200, _fixture.render_page(
+                            _page_no, _query.get("s_date", [None])[0], _query.get("e_date", [None])[0]
+                        )
+                with _fixture._lock:
+                    _fixture.requests += 1
+                    _fixture.bytes += len(_body)
+
+                self.send_response(_status)
+                for _name, _value in _headers.items():
+                    self.send_header(_name, _value)
+                self.send_header("Content-Length", str(len(_body)))
+                self.end_headers()
+                self.wfile.write(_body)
+
+            def log_message(self, *args):
+                pass
+
+        return _Handler
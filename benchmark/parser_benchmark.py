@@ -0,0 +1,111 @@
+"""Micro-benchmark of the result page parsers.
+
+Run from the repository root:
+
+    python -m benchmark.parser_benchmark
+    python -m benchmark.parser_benchmark --record-dir ./recorded
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+from benchmark.fixture_server import FixtureServer
+from module.parser import PARSERS, lxml
+
+
+def load_pages(pages=20, rows=10, record_dir=None) -> list:
+    """Load the recorded pages, or render the fixture pages with some markup variations.
+
+    :param int pages: Page count to render.
+    :param int rows: Row count of a page.
+    :param str record_dir: Directory of recorded pages 'page_<no>.html'. (default=None)
+    :return: Page content list.
+    :rtype: list
+    """
+    if record_dir is not None:
+        _pages = []
+        for _path in sorted(glob.glob(os.path.join(record_dir, "page_*.html"))):
+            with open(_path, "rb") as _f:
+                _pages.append(_f.read())
+        return _pages
+
+    _fixture = FixtureServer(pages=pages, rows=rows)
+    try:
+        _pages = [_fixture.render_page(_page_no) for _page_no in range(1, pages + 2)]
+    finally:
+        _fixture.stop()
+
+    # Entities, comments, inline tags and single quoted attributes which the site may use.
+    _pages.append(re.sub(
+        rb'<a href="([^"]*)"', rb"<a class='title' href='\1'",
+        _pages[0]
+        .replace("정규직".encode("utf-8"), "정규&amp;직<!-- 고용형태 --><br/>".encode("utf-8"))
+        .replace("기관1".encode("utf-8"), "기관&#39;1 <b>본부</b>".encode("utf-8"))
+    ))
+    return _pages
+
+
+def run(pages, repeat=5) -> dict:
+    """Parse every page with every available parser and compare the result with html.parser.
+
+    :param list pages: Page content list.
+    :param int repeat: Repeat count.
+    :return: Report of each parser.
+    :rtype: dict
+    """
+    _expected = [PARSERS["html.parser"]().parse(_page) for _page in pages]
+    _report = {}
+
+    for _name, _class in PARSERS.items():
+        if (_name == "lxml") and (lxml is None):
+            _report[_name] = {"skipped": "lxml is not installed."}
+            continue
+
+        _parser = _class()
+        _start = time.perf_counter()
+        for _ in range(repeat):
+            _result = [_parser.parse(_page) for _page in pages]
+        _seconds = time.perf_counter() - _start
+
+        _report[_name] = {
+            "ms_per_page": _seconds / repeat / len(pages) * 1000,
+            "identical": _result == _expected,
+            "last_page_no_identical": (
+                [_parser.get_last_page_no(_page) for _page in pages] ==
+                [PARSERS["html.parser"]().get_last_page_no(_page) for _page in pages]
+            )
+        }
+    return _report
+
+
+def main() -> int:
+    """Run the micro-benchmark from the command line.
+
+    :return: Exit code. (1 if any parser gives a different result.)
+    :rtype: int
+    """
+    _parser = argparse.ArgumentParser(description="Micro-benchmark of the result page parsers.")
+    _parser.add_argument("--pages", type=int, default=20, help="Fixture page count. (default=20)")
+    _parser.add_argument("--rows", type=int, default=10, help="Row count of a fixture page. (default=10)")
+    _parser.add_argument("--repeat", type=int, default=5, help="Repeat count. (default=5)")
+    _parser.add_argument("--record-dir", default=None, help="Directory of recorded pages 'page_<no>.html'.")
+    _args = _parser.parse_args()
+
+    _report = run(load_pages(_args.pages, _args.rows, _args.record_dir), _args.repeat)
+    _failed = False
+    for _name, _result in _report.items():
+        if "skipped" in _result:
+            print(f"{_name:12} skipped ({_result['skipped']})")
+            continue
+        print(f"{_name:12} {_result['ms_per_page']:8.3f} ms/page  identical: {_result['identical']}, "
+              f"last page: {_result['last_page_no_identical']}")
+        _failed = _failed or not (_result["identical"] and _result["last_page_no_identical"])
+    return 1 if _failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
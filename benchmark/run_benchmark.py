@@ -0,0 +1,193 @@
+"""Offline benchmark of the scraping, deduplication and insertion stages.
+
+Run from the repository root:
+
+    python -m benchmark.run_benchmark
+    python -m benchmark.run_benchmark --update-baseline
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from benchmark.fake_webdriver import FakeWebDriverServer
+from benchmark.fixture_server import FixtureServer
+from module.mobile_automation import NaverCalendar
+from module.web_scraping import JobAlioScraping
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def run(pages=10, rows=10, http_latency=0.0, command_latency=0.0, notices=10, existing=0.5, logger=None) -> dict:
+    """Run every stage against the local fixture server and the fake WebDriver endpoint.
+
+    :param int pages: Page count of the fixture.
+    :param int rows: Row count of a page.
+    :param float http_latency: Seconds the fixture server waits before each response.
+    :param float command_latency: Seconds the fake WebDriver endpoint waits before each command.
+    :param int notices: Notice count used for the device stages.
+    :param float existing: Ratio of the notices which are already in the calendar.
+    :param logger logger: Logger. (default=None, silent)
+    :return: Report of each stage.
+    :rtype: dict
+    """
+    if logger is None:
+        logger = logging.getLogger("benchmark")
+        logger.addHandler(logging.NullHandler())
+        logger.propagate = False
+
+    with open("./config/init.json", encoding="utf-8") as _f:
+        _configuration = json.load(_f)
+
+    _report = {}
+    with tempfile.TemporaryDirectory() as _temp_dir:
+        _fixture = FixtureServer(pages=pages, rows=rows, latency=http_latency)
+        _fixture.start()
+        _configuration["web_scraping"]["url"] = _fixture.url
+        _configuration["web_scraping"]["state_file"] = os.path.join(_temp_dir, "watermark.json")
+
+        _start = time.perf_counter()
+        _scraped = JobAlioScraping(_configuration, logger).start(full=True)
+        _seconds = time.perf_counter() - _start
+        _report["scrape"] = {
+            "seconds": _seconds, "notices": len(_scraped), "requests": _fixture.requests, "bytes": _fixture.bytes,
+            "notices_per_second": len(_scraped) / _seconds if _seconds else None
+        }
+        _fixture.stop()
+
+        _targets = _scraped[:notices]
+        _existing = {_noti["title"]: _noti["rigister_date"] for _noti in _targets[:int(len(_targets) * existing)]}
+        _fake = FakeWebDriverServer(_configuration["mobile"]["calendar"], events=_existing, latency=command_latency)
+        _fake.start()
+        _configuration["mobile"]["appium_url"] = _fake.url
+        _configuration["mobile"]["sync_index"] = os.path.join(_temp_dir, "sync_index.sqlite3")
+        _configuration["mobile"]["reconcile_mode"] = "search"
+
+        mobile = NaverCalendar(_configuration, logger)
+        mobile.go_to_naver_calendar()
+
+        _fake.reset_counts()
+        _start = time.perf_counter()
+        _new = mobile.arrange_schedule(_targets, reconcile=True)
+        _report["arrange_schedule"] = _get_device_report(_fake, time.perf_counter() - _start, len(_targets))
+
+        _fake.reset_counts()
+        _start = time.perf_counter()
+        for _noti in _new:
+            mobile.add_schedule(_noti)
+        _report["add_schedule"] = _get_device_report(_fake, time.perf_counter() - _start, len(_new))
+
+        mobile.finalize()
+        _fake.stop()
+
+    return _report
+
+
+def _get_device_report(fake, seconds, count) -> dict:
+    """Return the report of a device stage.
+
+    :param FakeWebDriverServer fake: Fake WebDriver endpoint.
+    :param float seconds: Elapsed seconds.
+    :param int count: Processed notice count.
+    :return: Stage report.
+    :rtype: dict
+    """
+    _commands = sum(fake.commands.values())
+    return {
+        "seconds": seconds, "notices": count, "commands": _commands, "bytes": fake.bytes,
+        "commands_per_notice": _commands / count if count else None,
+        "notices_per_second": count / seconds if seconds else None,
+        "command_counts": dict(fake.commands)
+    }
+
+
+def compare(report, baseline, tolerance=0.5) -> list:
+    """Compare the report with the baseline.
+
+    A stage regresses when its seconds are longer than the baseline by more than the tolerance ratio, or when it
+    sends more driver commands than the baseline. See get_improvements for the stages which send fewer commands.
+
+    :param dict report: Current report.
+    :param dict baseline: Baseline report.
+    :param float tolerance: Allowed ratio of the slowdown. (default=0.5)
+    :return: Regression message list.
+    :rtype: list
+    """
+    _regressions = []
+    for _stage, _current in report.items():
+        _base = baseline.get(_stage)
+        if _base is None:
+            continue
+        if _current["seconds"] > _base["seconds"] * (1 + tolerance):
+            _regressions.append(f"{_stage}: {_current['seconds']:.3f} sec > baseline {_base['seconds']:.3f} sec")
+        if ("commands" in _base) and (_current["commands"] > _base["commands"]):
+            _regressions.append(f"{_stage}: {_current['commands']} commands > baseline {_base['commands']} commands")
+    return _regressions
+
+
+def get_improvements(report, baseline) -> list:
+    """Get the stages which send fewer driver commands than the baseline.
+
+    The change which saves the commands should update the baseline, otherwise a later change can add them back
+    without a regression.
+
+    :param dict report: Current report.
+    :param dict baseline: Baseline report.
+    :return: Improvement message list.
+    :rtype: list
+    """
+    _improvements = []
+    for _stage, _current in report.items():
+        _base = baseline.get(_stage)
+        if (_base is not None) and ("commands" in _base) and (_current["commands"] < _base["commands"]):
+            _improvements.append(f"{_stage}: {_current['commands']} commands < baseline {_base['commands']} commands")
+    return _improvements
+
+
+def main() -> int:
+    """Run the benchmark from the command line.
+
+    :return: Exit code. (1 if any stage regresses.)
+    :rtype: int
+    """
+    _parser = argparse.ArgumentParser(description="Offline benchmark of Calendar_Autosync.")
+    _parser.add_argument("--pages", type=int, default=10, help="Page count of the fixture. (default=10)")
+    _parser.add_argument("--rows", type=int, default=10, help="Row count of a page. (default=10)")
+    _parser.add_argument("--http-latency", type=float, default=0.02, help="Seconds per page response. (default=0.02)")
+    _parser.add_argument("--command-latency", type=float, default=0.0, help="Seconds per driver command. (default=0)")
+    _parser.add_argument("--notices", type=int, default=10, help="Notice count of the device stages. (default=10)")
+    _parser.add_argument("--existing", type=float, default=0.5, help="Ratio of the notices already in the calendar.")
+    _parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline report path.")
+    _parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed ratio of the slowdown. (default=0.5)")
+    _parser.add_argument("--update-baseline", action="store_true", help="Save the report as the baseline.")
+    _args = _parser.parse_args()
+
+    _report = run(_args.pages, _args.rows, _args.http_latency, _args.command_latency, _args.notices, _args.existing)
+    print(json.dumps(_report, indent=2, ensure_ascii=False))
+
+    if _args.update_baseline:
+        with open(_args.baseline, "w", encoding="utf-8") as _f:
+            json.dump(_report, _f, indent=2, ensure_ascii=False)
+        print(f"The baseline is saved to {_args.baseline}.")
+        return 0
+
+    if not os.path.exists(_args.baseline):
+        print("There is no baseline to compare.")
+        return 0
+
+    with open(_args.baseline, encoding="utf-8") as _f:
+        _baseline = json.load(_f)
+    _regressions = compare(_report, _baseline, _args.tolerance)
+    for _improvement in get_improvements(_report, _baseline):
+        print(f"IMPROVEMENT {_improvement} (Update the baseline with --update-baseline in the same change.)")
+    for _regression in _regressions:
+        print(f"REGRESSION {_regression}")
+    return 1 if _regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""Get the notices of a long period of Job-Alio site into sharded JSONL files."""
+
+import datetime
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Union
+
+from module.instrumentation import METRICS
+from module.parser import create_parser
+from module.web_scraping import JobAlioScraping
+
+_parsers = {}
+
+
+def parse_page(content, parser_name) -> list:
+    """Parse the page content in a worker process.
+
+    :param bytes content: Page content.
+    :param str parser_name: Parser name.
+    :return: Parsed data list.
+    :rtype: list
+    """
+    if parser_name not in _parsers:
+        _parsers[parser_name] = create_parser(parser_name)
+    return _parsers[parser_name].parse(content)
+
+
+def split_period(start_date, end_date, window_days=7) -> list:
+    """Split the period into windows which do not overlap.
+
+    :param datetime.date start_date: First date of the period.
+    :param datetime.date end_date: Last date of the period.
+    :param int window_days: Day count of a window. (default=7)
+    :return: (first date, last date) list in the date order.
+    :rtype: list
+    """
+    _windows = []
+    _start = start_date
+    while _start <= end_date:
+        _end = min(_start + datetime.timedelta(days=window_days - 1), end_date)
+        _windows.append((_start, _end))
+        _start = _end + datetime.timedelta(days=1)
+    return _windows
+
+
+class JobAlioBackfill(JobAlioScraping):
+    """Job-Alio backfill class.
+
+    The period is split into windows which are fetched concurrently. The pages are parsed in a process pool and the
+    notices of a window are streamed into its own JSONL shard. A window is recorded in the manifest as soon as its
+    shard is complete, so an interrupted or failed backfill resumes from the windows not recorded yet.
+    """
+
+    def __init__(self, configuration: Union[str, dict], logger=None):
+        """Initialize the object.
+
+        :param str/dict configuration: Configuration path or Configuration dictionary.
+        :param logger logger: Logger.
+        """
+        super().__init__(configuration, logger)
+
+        _backfill = self._configuration.get("backfill", {})
+        self._window_days = int(_backfill.get("window_days", 7))
+        self._window_concurrency = int(_backfill.get("concurrency", self._concurrency))
+        self._processes = _backfill.get("processes", None)
+        self._max_pending_pages = int(_backfill.get("max_pending_pages", (self._processes or os.cpu_count() or 1) * 2))
+        self._output_dir = _backfill.get("output_dir", "./output/backfill")
+        self._parser_name = self._parser.name
+        self._manifest = {"windows": {}}
+        self._manifest_lock = threading.Lock()
+
+        self._logger.debug("JobAlioBackfill initialize finish.")
+
+    def run(self, start_date, end_date) -> int:
+        """Get every notice of the period into the shards.
+
+        :param datetime.date start_date: First register date of the period.
+        :param datetime.date end_date: Last register date of the period.
+        :return: Notice count written in this run.
+        :rtype: int
+        :raise RequestException: if request is not normal. (The other windows are finished and recorded before.)
+        """
+        os.makedirs(self._output_dir, exist_ok=True)
+        self._manifest = self._load_manifest()
+        _windows = split_period(start_date, end_date, self._window_days)
+        _pending = [_window for _window in _windows if self._get_shard_name(_window) not in self._manifest["windows"]]
+        self._logger.info("Backfill start... (windows: %d, completed before: %d)", len(_windows),
+                          len(_windows) - len(_pending))
+
+        # The params are created here, because the filters and the period are kept in one object.
+        _params = {_window: self._create_params(*_window) for _window in _pending}
+        _total = 0
+        _error = None
+
+        with ProcessPoolExecutor(max_workers=self._processes) as _parsers, \
+                ThreadPoolExecutor(max_workers=self._window_concurrency) as _fetchers:
+            _futures = {
+                _fetchers.submit(self._backfill_window, _window, _params[_window], _parsers): _window
+                for _window in _pending
+            }
+            for _future in as_completed(_futures):
+                _window = _futures[_future]
+                try:
+                    _count = _future.result()
+                except Exception as e:
+                    self._logger.exception("Window %s is failed.", self._get_shard_name(_window))
+                    _error = _error or e
+                    continue
+                _total += _count
+                self._logger.info("Window %s is finish. (%d notices)", self._get_shard_name(_window), _count)
+
+        METRICS.count("notices", _total, state="backfilled")
+        if _error is not None:
+            raise _error
+        self._logger.info("Backfill is finish. (Total notice of employment: %d)", _total)
+        return _total
+
+    def _backfill_window(self, window, params, parsers) -> int:
+        """Get every page of the window and write its notices into the shard.
+
+        The pages of the window are fetched one after another while the previous pages are parsed. At most
+        'max_pending_pages' pages wait for the parser, so a slow parser holds back the fetching instead of the memory.
+        The window is recorded in the manifest as soon as its shard is complete.
+
+        :param tuple window: (first date, last date) of the window.
+        :param dict params: Params of the window.
+        :param ProcessPoolExecutor parsers: Process pool which parses the pages.
+        :return: Notice count of the window.
+        :rtype: int
+        """
+        _path = os.path.join(self._output_dir, f"{self._get_shard_name(window)}.jsonl")
+        _first_page = self._get_page(1, params)
+        _last_page_no = self._get_last_page_no(_first_page)
+        _count = 0
+
+        with open(f"{_path}.tmp", "w", encoding="utf-8") as _f:
+            if _last_page_no is None:
+                _page_no, _content = 1, _first_page
+            else:
+                _pending = [parsers.submit(parse_page, _first_page, self._parser_name)]
+                for _page_no in range(2, _last_page_no + 1):
+                    _pending.append(parsers.submit(parse_page, self._get_page(_page_no, params), self._parser_name))
+                    # Write the parsed pages in the page order as soon as they are ready to keep the memory flat.
+                    while _pending and (_pending[0].done() or len(_pending) >= self._max_pending_pages):
+                        _count += self._write_notices(_f, _pending.pop(0).result())
+                for _future in _pending:
+                    _count += self._write_notices(_f, _future.result())
+                _page_no = _last_page_no + 1
+                _content = self._get_page(_page_no, params)
+
+            # The paging area may show only a part of the pages, so the next page is requested until it is empty.
+            while _parsing := parsers.submit(parse_page, _content, self._parser_name).result():
+                _count += self._write_notices(_f, _parsing)
+                _page_no += 1
+                _content = self._get_page(_page_no, params)
+
+            _f.flush()
+            os.fsync(_f.fileno())
+
+        os.replace(f"{_path}.tmp", _path)
+        with self._manifest_lock:
+            self._manifest["windows"][self._get_shard_name(window)] = {
+                "start_date": window[0].strftime("%Y.%m.%d"),
+                "end_date": window[1].strftime("%Y.%m.%d"),
+                "notices": _count
+            }
+            self._save_manifest(self._manifest)
+        return _count
+
+    @staticmethod
+    def _write_notices(file, notice_list) -> int:
+        """Write the notices as JSON lines.
+
+        :param file: Shard file.
+        :param list notice_list: Notice list.
+        :return: Written notice count.
+        :rtype: int
+        """
+        for _noti in notice_list:
+            file.write(json.dumps(dict(_noti), ensure_ascii=False) + "\n")
+        return len(notice_list)
+
+    @staticmethod
+    def _get_shard_name(window) -> str:
+        """Return the shard name of the window.
+
+        :param tuple window: (first date, last date) of the window.
+        :return: Shard name.
+        :rtype: str
+        """
+        return f"{window[0].strftime('%Y%m%d')}-{window[1].strftime('%Y%m%d')}"
+
+    def _load_manifest(self) -> dict:
+        """Load the manifest of the completed windows.
+
+        :return: Manifest.
+        :rtype: dict
+        """
+        _path = os.path.join(self._output_dir, "manifest.json")
+        if not os.path.exists(_path):
+            return {"windows": {}}
+        with open(_path, encoding="utf-8") as _f:
+            return json.load(_f)
+
+    def _save_manifest(self, manifest) -> None:
+        """Save the manifest through a temporary file.
+
+        :param dict manifest: Manifest.
+        """
+        _path = os.path.join(self._output_dir, "manifest.json")
+        with open(f"{_path}.tmp", "w", encoding="utf-8") as _f:
+            json.dump(manifest, _f, indent=2, ensure_ascii=False)
+        os.replace(f"{_path}.tmp", _path)
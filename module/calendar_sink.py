@@ -0,0 +1,546 @@
+"""Destinations of the schedules made from the Job-Alio notices."""
+
+import datetime
+import logging
+import os
+import re
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+
+from miraelogger import Logger
+
+from module import exception
+from module.diff import CLOSED_STATUS, DELETE, UPDATE, diff_notices
+from module.http_client import HttpClient
+from module.instrumentation import staged
+from module.journal import FAILED, INSERTED
+from module.sync_state import SyncIndex
+
+_REPORT_BODY = """<?xml version="1.0" encoding="utf-8" ?>
+<C:calendar-query xmlns:D="DAV:" xmlns:C="urn:ietf:params:xml:ns:caldav">
+  <D:prop><D:getetag/></D:prop>
+  <C:filter><C:comp-filter name="VCALENDAR"><C:comp-filter name="VEVENT"/></C:comp-filter></C:filter>
+</C:calendar-query>"""
+_EVENT_PATTERN = re.compile(r"BEGIN:VEVENT\r?\n.*?END:VEVENT", re.S)
+_UID_PATTERN = re.compile(r"^UID:(.*)$", re.M)
+
+
+class CalendarSink:
+    """Calendar sink interface.
+
+    The new notices are queued with 'submit' and written when 'join' is called, so a sink can write them in bulk.
+    The 'inserted' or 'failed' state of each notice is recorded in the 'journal' if it is set.
+    """
+
+    journal = None
+
+    def __init__(self):
+        """Initialize the object."""
+        # Notices queued by 'submit' until 'join'
+        self._pending = []
+
+    def open(self, foreground=True) -> None:
+        """Prepare the sink.
+
+        :param bool foreground: Make the calendar ready to add the schedules now. (default=True)
+        """
+
+    def prepare(self) -> None:
+        """Make the sink ready to add the schedules again after it has been idle."""
+
+    def should_reconcile(self) -> bool:
+        """Return whether the notices not in the sync index should be searched in the calendar.
+
+        :return: True if the sink should reconcile.
+        :rtype: bool
+        """
+        return False
+
+    def arrange_schedule(self, notice_list, reconcile=None) -> list:
+        """Check the old notice and get the new notice list.
+
+        :param list notice_list: Notice list.
+        :param bool reconcile: Search the notices in the calendar. (default=None)
+        :return: New notice list.
+        :rtype: list.
+        """
+        raise NotImplementedError
+
+    def add_schedules(self, notice_list) -> list:
+        """Add the schedules of the notices.
+
+        :param list notice_list: Notice list.
+        :return: Added notice list.
+        :rtype: list
+        """
+        raise NotImplementedError
+
+    def submit(self, notice) -> None:
+        """Queue the notice to add.
+
+        :param dict notice: Notice.
+        """
+        self._pending.append(notice)
+
+    def join(self) -> list:
+        """Add every queued notice.
+
+        :return: Added notice list.
+        :rtype: list
+        """
+        _pending, self._pending = self._pending, []
+        return self.add_schedules(_pending) if _pending else []
+
+    def diff(self, notice_list, closed_status=CLOSED_STATUS) -> list:
+        """Get the add, update and delete operations of the notices.
+
+        The sink without the sync index cannot tell the stale schedules, so it gets only the add operations.
+
+        :param list notice_list: Notice list.
+        :param tuple closed_status: Status texts of the closed notice. (default=('마감',))
+        :return: Operation list.
+        :rtype: list
+        """
+        return diff_notices(notice_list, None, closed_status)
+
+    def apply_changes(self, operations) -> list:
+        """Apply the update and delete operations.
+
+        :param list operations: Operation list.
+        :return: Applied operation list.
+        :rtype: list
+        """
+        for _operation in operations:
+            self.apply_change(_operation)
+        return operations
+
+    def apply_change(self, operation) -> None:
+        """Apply the update or delete operation.
+
+        :param Operation operation: Operation.
+        """
+        if operation.kind == UPDATE:
+            self.edit_schedule(operation.notice, operation.record)
+        elif operation.kind == DELETE:
+            self.delete_schedule(operation.notice, operation.record)
+
+    def edit_schedule(self, notice, record) -> None:
+        """Change the schedule of the notice to the current notice.
+
+        :param dict notice: Notice.
+        :param dict record: Sync index record of the schedule.
+        """
+        raise NotImplementedError
+
+    def delete_schedule(self, notice, record) -> None:
+        """Delete the schedule of the notice.
+
+        :param dict notice: Notice.
+        :param dict record: Sync index record of the schedule.
+        """
+        raise NotImplementedError
+
+    def finalize(self) -> None:
+        """Finalize."""
+
+    def _record(self, notice, state, error=None) -> None:
+        """Record the state of the notice in the journal.
+
+        :param dict notice: Notice.
+        :param str state: 'inserted' or 'failed'.
+        :param str error: Error of the failure. (default=None)
+        """
+        if self.journal is not None:
+            self.journal.record(notice, state, error)
+
+
+def get_uid(notice) -> str:
+    """Return the stable UID of the notice.
+
+    :param dict notice: Notice.
+    :return: UID.
+    :rtype: str
+    """
+    return f"jobalio-{notice['idx']}@job.alio.go.kr"
+
+
+def get_unique_notices(notice_list) -> list:
+    """Keep the first copy of each notice. The filter profiles copy a notice for each calendar it is routed to.
+
+    :param list notice_list: Notice list.
+    :return: Notice list without the copies.
+    :rtype: list
+    """
+    _uids = set()
+    _unique = []
+    for _noti in notice_list:
+        if get_uid(_noti) not in _uids:
+            _uids.add(get_uid(_noti))
+            _unique.append(_noti)
+    return _unique
+
+
+def render_event(notice, cancelled=False) -> str:
+    """Render the notice as an all-day VEVENT from the register date to the deadline date.
+
+    :param dict notice: Notice.
+    :param bool cancelled: Mark the event as cancelled, so the calendar which imports it removes it. (default=False)
+    :return: VEVENT lines joined with CRLF.
+    :rtype: str
+    """
+    _start = datetime.datetime.strptime(notice["rigister_date"], "%Y.%m.%d").date()
+    _end = datetime.datetime.strptime(notice["deadline_date"], "%Y.%m.%d").date() + datetime.timedelta(days=1)
+    _lines = [
+        "BEGIN:VEVENT",
+        f"UID:{get_uid(notice)}",
+        f"DTSTAMP:{datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')}",
+        f"DTSTART;VALUE=DATE:{_start.strftime('%Y%m%d')}",
+        f"DTEND;VALUE=DATE:{max(_end, _start + datetime.timedelta(days=1)).strftime('%Y%m%d')}",
+        f"SUMMARY:{_escape(notice['title'])}",
+        f"DESCRIPTION:{_escape(notice['memo'])}",
+        "END:VEVENT"
+    ]
+    if cancelled:
+        _lines.insert(-1, "STATUS:CANCELLED")
+    return "\r\n".join(_fold(_line) for _line in _lines)
+
+
+def render_calendar(notice_list, cancelled=(), events=()) -> str:
+    """Render the notices as one VCALENDAR.
+
+    :param list notice_list: Notice list.
+    :param set cancelled: UIDs of the cancelled events. (default=())
+    :param list events: Rendered VEVENTs written before the notices, e.g. the events of a previous run. (default=())
+    :return: iCalendar text.
+    :rtype: str
+    """
+    _lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//Calendar_Autosync//Job-Alio//KO", "CALSCALE:GREGORIAN"]
+    _lines.extend(events)
+    _lines.extend(render_event(_noti, get_uid(_noti) in cancelled) for _noti in notice_list)
+    _lines.append("END:VCALENDAR")
+    return "\r\n".join(_lines) + "\r\n"
+
+
+def read_events(path) -> dict:
+    """Read the VEVENTs of the iCalendar file.
+
+    :param str path: iCalendar file path.
+    :return: {UID: VEVENT lines joined with CRLF} (Empty dictionary if there is no file.)
+    :rtype: dict
+    """
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, encoding="utf-8", newline="") as _f:
+        _text = _f.read()
+    _events = {}
+    for _event in _EVENT_PATTERN.findall(_text):
+        _uid = _UID_PATTERN.search(re.sub(r"\r?\n[ \t]", "", _event))
+        if _uid is not None:
+            _events[_uid.group(1).strip()] = _event
+    return _events
+
+
+def _escape(text) -> str:
+    """Escape the TEXT value of iCalendar.
+
+    :param str text: Text.
+    :return: Escaped text.
+    :rtype: str
+    """
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r", "").replace("\n", "\\n")
+
+
+def _fold(line, limit=75) -> str:
+    """Fold the content line longer than the limit octets.
+
+    :param str line: Content line.
+    :param int limit: Maximum octets of a line. (default=75)
+    :return: Folded content line.
+    :rtype: str
+    """
+    _folded = []
+    _current = ""
+    for _char in line:
+        if len((_current + _char).encode("utf-8")) > limit:
+            _folded.append(_current)
+            _current = " "
+        _current += _char
+    _folded.append(_current)
+    return "\r\n".join(_folded)
+
+
+class ICalendarSink(CalendarSink):
+    """Write the new notices into one .ics file.
+
+    The changed notices of the same run are written into the file too, and a closed notice as a cancelled event.
+    The events already in the file are kept, so the events of a previous run which are not imported yet are not lost.
+    """
+
+    def __init__(self, configuration, logger=None, sync_index=None):
+        """Initialize the object.
+
+        :param dict configuration: Configuration dictionary.
+        :param logger logger: Logger.
+        :param SyncIndex sync_index: Index of the created schedules. (default=None, open the configured 'sync_index')
+        """
+        super().__init__()
+        if logger is not None:
+            self._logger = logger
+        else:
+            self._logger = Logger(log_name=__name__, stream_log_level=logging.DEBUG).logger
+
+        self._configuration = configuration["calendar_sink"]
+        self._path = self._configuration.get("path", "./output/jobalio.ics")
+
+        self._own_sync_index = sync_index is None
+        if sync_index is not None:
+            self._sync_index = sync_index
+        else:
+            self._sync_index = SyncIndex(self._configuration.get("sync_index", "./state/sync_index.sqlite3"))
+        self._events = {}
+        self._cancelled = set()
+
+        self._logger.debug("ICalendarSink initialize finish.")
+
+    def arrange_schedule(self, notice_list, reconcile=None) -> list:
+        """Get the notices not in the sync index. The file has one event of a notice routed to several calendars.
+
+        :param list notice_list: Notice list.
+        :param bool reconcile: Not used.
+        :return: New notice list.
+        :rtype: list.
+        """
+        return [_noti for _noti in get_unique_notices(notice_list) if _noti not in self._sync_index]
+
+    def diff(self, notice_list, closed_status=CLOSED_STATUS) -> list:
+        """Get the add, update and delete operations of the notices from the sync index.
+
+        :param list notice_list: Notice list.
+        :param tuple closed_status: Status texts of the closed notice. (default=('마감',))
+        :return: Operation list.
+        :rtype: list
+        """
+        return diff_notices(get_unique_notices(notice_list), self._sync_index, closed_status)
+
+    def add_schedules(self, notice_list) -> list:
+        """Write the notices into the .ics file.
+
+        :param list notice_list: Notice list.
+        :return: Added notice list.
+        :rtype: list
+        """
+        self._events.update((get_uid(_noti), _noti) for _noti in notice_list)
+        self._write()
+
+        for _noti in notice_list:
+            self._sync_index.record(_noti, self._path)
+            self._record(_noti, INSERTED)
+        self._logger.info("%d schedules are written to %s.", len(notice_list), self._path)
+        return notice_list
+
+    def apply_changes(self, operations) -> list:
+        """Write the changed notices into the .ics file.
+
+        :param list operations: Operation list.
+        :return: Applied operation list.
+        :rtype: list
+        """
+        for _operation in operations:
+            self.apply_change(_operation)
+        self._write()
+        self._logger.info("%d changed schedules are written to %s.", len(operations), self._path)
+        return operations
+
+    def edit_schedule(self, notice, record) -> None:
+        """Replace the event of the notice. The same UID updates the imported event.
+
+        :param dict notice: Notice.
+        :param dict record: Sync index record of the schedule.
+        """
+        self._events[get_uid(notice)] = notice
+        self._cancelled.discard(get_uid(notice))
+        self._sync_index.record(notice, self._path)
+
+    def delete_schedule(self, notice, record) -> None:
+        """Write the event of the notice as cancelled.
+
+        :param dict notice: Notice.
+        :param dict record: Sync index record of the schedule.
+        """
+        self._events[get_uid(notice)] = notice
+        self._cancelled.add(get_uid(notice))
+        self._sync_index.delete(notice)
+
+    def finalize(self) -> None:
+        """Finalize."""
+        if self._own_sync_index:
+            self._sync_index.close()
+
+    def _write(self) -> None:
+        """Write every event of this run and the other events already in the file into the .ics file."""
+        if os.path.dirname(self._path):
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+
+        _kept = [_event for _uid, _event in read_events(self._path).items() if _uid not in self._events]
+        _temp_path = f"{self._path}.tmp"
+        with open(_temp_path, "w", encoding="utf-8", newline="") as _f:
+            _f.write(render_calendar(list(self._events.values()), self._cancelled, _kept))
+        os.replace(_temp_path, self._path)
+
+
+class CalDAVSink(CalendarSink):
+    """Put the new notices into a CalDAV calendar collection.
+
+    The put events are recorded in the sync index, so the changed notices update or delete their events by the UID.
+    """
+
+    def __init__(self, configuration, logger=None, sync_index=None):
+        """Initialize the object.
+
+        :param dict configuration: Configuration dictionary.
+        :param logger logger: Logger.
+        :param SyncIndex sync_index: Index of the put events. (default=None, open the configured 'sync_index')
+        """
+        super().__init__()
+        if logger is not None:
+            self._logger = logger
+        else:
+            self._logger = Logger(log_name=__name__, stream_log_level=logging.DEBUG).logger
+
+        self._configuration = configuration["calendar_sink"]
+        self._url = self._configuration["url"].rstrip("/") + "/"
+        self._exists = None
+        self._concurrency = int(self._configuration.get("concurrency", 4))
+
+        self._own_sync_index = sync_index is None
+        if sync_index is not None:
+            self._sync_index = sync_index
+        else:
+            self._sync_index = SyncIndex(self._configuration.get("sync_index", "./state/sync_index.sqlite3"))
+
+        self._client = HttpClient(self._configuration.get("http"), self._concurrency, self._logger)
+        if "username" in self._configuration:
+            self._client.session.auth = (self._configuration["username"], self._configuration.get("password", ""))
+
+        self._logger.debug("CalDAVSink initialize finish.")
+
+    @staged("caldav_report")
+    def arrange_schedule(self, notice_list, reconcile=None) -> list:
+        """Get the notices whose UID is not in the collection. The collection is read once with a REPORT request.
+
+        :param list notice_list: Notice list.
+        :param bool reconcile: Not used.
+        :return: New notice list.
+        :rtype: list.
+        :raise RequestException: if the REPORT request is not normal.
+        """
+        if self._exists is None:
+            response = self._client.request(
+                "REPORT", self._url, data=_REPORT_BODY.encode("utf-8"),
+                headers={"Depth": "1", "Content-Type": "application/xml; charset=utf-8"}
+            )
+            if response.status_code != 207:
+                self._logger.error(msg := f"Could not get the calendar events. status code is {response.status_code}")
+                raise exception.RequestException(msg)
+
+            self._exists = set()
+            for _href in ElementTree.fromstring(response.content).iter("{DAV:}href"):
+                self._exists.add(urllib.parse.unquote(_href.text.rstrip("/").split("/")[-1]))
+            self._logger.debug("Events in the collection: %d", len(self._exists))
+
+        return [_noti for _noti in get_unique_notices(notice_list) if f"{get_uid(_noti)}.ics" not in self._exists]
+
+    def diff(self, notice_list, closed_status=CLOSED_STATUS) -> list:
+        """Get the add, update and delete operations of the notices from the sync index.
+
+        :param list notice_list: Notice list.
+        :param tuple closed_status: Status texts of the closed notice. (default=('마감',))
+        :return: Operation list.
+        :rtype: list
+        """
+        return diff_notices(get_unique_notices(notice_list), self._sync_index, closed_status)
+
+    def add_schedules(self, notice_list) -> list:
+        """Put the notices concurrently. An event which already exists is not overwritten.
+
+        :param list notice_list: Notice list.
+        :return: Added notice list.
+        :rtype: list
+        :raise RequestException: if any PUT request is not normal.
+        """
+        with ThreadPoolExecutor(max_workers=self._concurrency) as _executor:
+            _status_codes = list(_executor.map(self._put, notice_list))
+
+        for _noti, _code in zip(notice_list, _status_codes):
+            if _code in (201, 204, 412):
+                self._sync_index.record(_noti, self._url)
+                self._record(_noti, INSERTED)
+            else:
+                self._record(_noti, FAILED, f"status code {_code}")
+
+        _failed = [_code for _code in _status_codes if _code not in (201, 204, 412)]
+        if _failed:
+            self._logger.error(msg := f"Could not put {len(_failed)} events. status codes are {_failed}")
+            raise exception.RequestException(msg)
+
+        self._exists = None if self._exists is None else self._exists | {f"{get_uid(_noti)}.ics" for _noti in notice_list}
+        _added = [_noti for _noti, _code in zip(notice_list, _status_codes) if _code != 412]
+        self._logger.info("%d events are put to %s.", len(_added), self._url)
+        return _added
+
+    def edit_schedule(self, notice, record) -> None:
+        """Overwrite the event of the notice by its UID.
+
+        :param dict notice: Notice.
+        :param dict record: Sync index record of the schedule.
+        :raise RequestException: if the PUT request is not normal.
+        """
+        _code = self._put(notice, overwrite=True)
+        if _code not in (200, 201, 204):
+            self._logger.error(msg := f"Could not update the event of {notice['idx']}. status code is {_code}")
+            raise exception.RequestException(msg)
+        self._sync_index.record(notice, self._url)
+
+    @staged("caldav_delete")
+    def delete_schedule(self, notice, record) -> None:
+        """Delete the event of the notice by its UID. An event which is already deleted is not an error.
+
+        :param dict notice: Notice.
+        :param dict record: Sync index record of the schedule.
+        :raise RequestException: if the DELETE request is not normal.
+        """
+        response = self._client.request("DELETE", f"{self._url}{get_uid(notice)}.ics")
+        if response.status_code not in (200, 204, 404):
+            self._logger.error(
+                msg := f"Could not delete the event of {notice['idx']}. status code is {response.status_code}"
+            )
+            raise exception.RequestException(msg)
+
+        if self._exists is not None:
+            self._exists.discard(f"{get_uid(notice)}.ics")
+        self._sync_index.delete(notice)
+
+    @staged("caldav_put")
+    def _put(self, notice, overwrite=False) -> int:
+        """Put the notice as one calendar object resource.
+
+        :param dict notice: Notice.
+        :param bool overwrite: Replace the event which already exists. (default=False)
+        :return: Status code.
+        :rtype: int
+        """
+        _headers = {"Content-Type": "text/calendar; charset=utf-8"}
+        if not overwrite:
+            _headers["If-None-Match"] = "*"
+        response = self._client.put(
+            f"{self._url}{get_uid(notice)}.ics", data=render_calendar([notice]).encode("utf-8"), headers=_headers
+        )
+        return response.status_code
+
+    def finalize(self) -> None:
+        """Finalize."""
+        self._client.close()
+        if self._own_sync_index:
+            self._sync_index.close()
@@ -0,0 +1,247 @@
+"""Command line interface of the Job-Alio calendar autosync.
+
+- **scrape**: Print the scraped notices as JSON lines.
+- **diff**: Print the operations which the scraped notices need, from the sync index.
+- **push**: Add the notices of the JSON lines (e.g. the 'scrape' output) to the calendar.
+- **run**: Scrape the notices and add the new ones to the calendar. (Default command)
+
+The modules are imported only by the command which needs them. 'scrape', 'diff' and the dry runs never open a device,
+so they start fast, e.g. in cron or CI.
+"""
+
+import argparse
+import atexit
+import datetime
+import json
+import os
+import sys
+
+CONFIGURATION_PATH = "./config/init.json"
+LOG_PATH = "./log/calendar_autosync.log"
+COMMANDS = ("scrape", "diff", "push", "run")
+
+
+def main(argv=None) -> int:
+    """Run the command.
+
+    Without a command, 'run' is used, so the options of the former script keep working.
+
+    :param list argv: Argument list. (default=None, sys.argv[1:])
+    :return: Exit code.
+    :rtype: int
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not any(_arg in COMMANDS or _arg in ("-h", "--help") for _arg in argv):
+        argv.insert(0, "run")
+
+    _args = _create_parser().parse_args(argv)
+    return _args.handler(_args)
+
+
+def _create_parser() -> argparse.ArgumentParser:
+    """Create the argument parser.
+
+    :return: Argument parser.
+    :rtype: argparse.ArgumentParser
+    """
+    _common = argparse.ArgumentParser(add_help=False)
+    _common.add_argument("--config", default=CONFIGURATION_PATH, help=f"Configuration path. (default: {CONFIGURATION_PATH})")
+
+    _parser = argparse.ArgumentParser(description="Autosync the Job-Alio notices into the Naver calendar.")
+    _commands = _parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    _scrape = _commands.add_parser("scrape", parents=[_common], help="Print the scraped notices as JSON lines.")
+    _scrape.add_argument("--full", action="store_true", help="Walk every page of the period regardless of the watermark.")
+    _scrape.add_argument("--output", default="-", help="Output path of the JSON lines. (default: stdout)")
+    _scrape.set_defaults(handler=_scrape_command)
+
+    _diff = _commands.add_parser("diff", parents=[_common],
+                                 help="Print the operations which the scraped notices need. No device is used.")
+    _diff.add_argument("--full", action="store_true", help="Walk every page of the period regardless of the watermark.")
+    _diff.add_argument("--json", action="store_true", help="Print the operations as one JSON document.")
+    _diff.set_defaults(handler=_diff_command)
+
+    _push = _commands.add_parser("push", parents=[_common], help="Add the notices of the JSON lines to the calendar.")
+    _push.add_argument("--input", default="-", help="Input path of the JSON lines. (default: stdin)")
+    _push.add_argument("--reconcile", action="store_true", default=None,
+                       help="Search the notices not in the sync index in the calendar app.")
+    _push.add_argument("--dry-run", action="store_true", help="Print the operations instead of opening the calendar.")
+    _push.add_argument("--json", action="store_true", help="Print the operations of the dry run as one JSON document.")
+    _push.add_argument("--metrics", metavar="PATH", help="Write the JSON summary of the metrics. (Not with --dry-run)")
+    _push.set_defaults(handler=_push_command)
+
+    _run = _commands.add_parser("run", parents=[_common],
+                                help="Scrape the notices and add the new ones to the calendar.")
+    _run.add_argument("--full", action="store_true", help="Walk every page of the period regardless of the watermark.")
+    _run.add_argument("--reconcile", action="store_true", default=None,
+                      help="Search the notices not in the sync index in the calendar app.")
+    _run.add_argument("--restart", action="store_true",
+                      help="Discard the unfinished run of the journal instead of resuming it.")
+    _run.add_argument("--daemon", action="store_true", help="Keep polling the site with the 'daemon' interval.")
+    _run.add_argument("--backfill", nargs=2, type=_date, metavar=("START_DATE", "END_DATE"),
+                      help="Get the notices of the period (YYYY.MM.DD) into the sharded JSONL files.")
+    _run.add_argument("--dry-run", action="store_true",
+                      help="Print the operations instead of opening the calendar. The watermark is not moved.")
+    _run.add_argument("--json", action="store_true", help="Print the operations of the dry run as one JSON document.")
+    _run.add_argument("--metrics", metavar="PATH", help="Write the JSON summary of the metrics. (Not with --dry-run)")
+    _run.set_defaults(handler=_run_command)
+    return _parser
+
+
+def _date(text) -> datetime.date:
+    """Convert the 'YYYY.MM.DD' argument to the date."""
+    return datetime.datetime.strptime(text, "%Y.%m.%d").date()
+
+
+def _create_logger(configuration_path):
+    """Create the logger of the commands. The log is written to stderr and the log file, so stdout has only the result.
+
+    With the 'queue' option of the 'logging' section (default true), the records are written by a background thread
+    which is stopped at the exit. The 'json_lines' option adds the JSON lines log.
+
+    :param str configuration_path: Configuration path.
+    :return: Logger.
+    """
+    from miraelogger import Logger
+    from module.log_queue import create_json_handler, start_queue_logging
+
+    os.makedirs(os.path.dirname(os.path.realpath(LOG_PATH)), exist_ok=True)
+    logger = Logger("run_jobalio_naver", os.path.realpath(LOG_PATH)).logger
+
+    _logging = _load_configuration(configuration_path).get("logging", {})
+    if _logging.get("queue", True):
+        atexit.register(start_queue_logging(logger, _logging.get("json_lines", "")).stop)
+    elif _logging.get("json_lines"):
+        logger.addHandler(create_json_handler(_logging["json_lines"]))
+    return logger
+
+
+def _load_configuration(path, metrics=None) -> dict:
+    """Load the configuration.
+
+    :param str path: Configuration path.
+    :param str metrics: Path of the JSON summary of the metrics, which overrides the 'instrumentation' section.
+        (default=None, the 'summary' option)
+    :return: Configuration dictionary.
+    :rtype: dict
+    """
+    with open(path, encoding="utf-8") as _f:
+        _configuration = json.load(_f)
+    if metrics:
+        _configuration.setdefault("instrumentation", {})["summary"] = metrics
+    return _configuration
+
+
+def _scrape_command(args) -> int:
+    """Print the scraped notices as JSON lines. The watermark is not moved."""
+    from module.web_scraping import JobAlioScraping
+
+    _notices = JobAlioScraping(_load_configuration(args.config), _create_logger(args.config)).start(full=args.full)
+    if args.output == "-":
+        _write_notices(sys.stdout, _notices)
+    else:
+        with open(args.output, "w", encoding="utf-8") as _f:
+            _write_notices(_f, _notices)
+    return 0
+
+
+def _diff_command(args) -> int:
+    """Print the operations which the scraped notices need. The watermark is not moved."""
+    from module.pipeline import SyncPipeline
+    from module.web_scraping import JobAlioScraping
+
+    _configuration = _load_configuration(args.config)
+    logger = _create_logger(args.config)
+    pipeline = SyncPipeline(_configuration, logger)
+    _full = args.full or _configuration.get("calendar_sink", {}).get("track_changes", False)
+    _notices = JobAlioScraping(_configuration, logger).start(full=_full)
+    _print_plan(pipeline.plan(_notices), args.json)
+    return 0
+
+
+def _push_command(args) -> int:
+    """Add the notices of the JSON lines to the calendar, or print the operations of them."""
+    from module.notice import Notice
+    from module.pipeline import SyncPipeline
+
+    if args.input == "-":
+        _notices = _read_notices(sys.stdin, Notice)
+    else:
+        with open(args.input, encoding="utf-8") as _f:
+            _notices = _read_notices(_f, Notice)
+
+    pipeline = SyncPipeline(_load_configuration(args.config, args.metrics), _create_logger(args.config))
+    if args.dry_run:
+        _print_plan(pipeline.plan(_notices), args.json)
+    else:
+        pipeline.push(_notices, reconcile=args.reconcile)
+    return 0
+
+
+def _run_command(args) -> int:
+    """Run the synchronization, the daemon or the backfill."""
+    if args.dry_run:
+        return _diff_command(args)
+
+    if args.backfill:
+        from module.backfill import JobAlioBackfill
+
+        JobAlioBackfill(args.config, _create_logger(args.config)).run(*args.backfill)
+    elif args.daemon:
+        from module.daemon import SyncDaemon
+
+        SyncDaemon(_load_configuration(args.config, args.metrics), _create_logger(args.config)).run(
+            full=args.full, reconcile=args.reconcile
+        )
+    else:
+        from module.pipeline import SyncPipeline
+
+        SyncPipeline(_load_configuration(args.config, args.metrics), _create_logger(args.config)).run(
+            full=args.full, reconcile=args.reconcile, resume=not args.restart
+        )
+    return 0
+
+
+def _write_notices(file, notice_list) -> None:
+    """Write the notices as JSON lines.
+
+    :param file: Output file.
+    :param list notice_list: Notice list.
+    """
+    for _noti in notice_list:
+        file.write(json.dumps(dict(_noti), ensure_ascii=False) + "\n")
+
+
+def _read_notices(file, notice_class) -> list:
+    """Read the notices of the JSON lines. The blank lines are skipped.
+
+    :param file: Input file.
+    :param type notice_class: Notice class.
+    :return: Notice list.
+    :rtype: list
+    """
+    return [notice_class.from_dict(json.loads(_line)) for _line in file if _line.strip()]
+
+
+def _print_plan(plan, as_json=False) -> None:
+    """Print the planned operations.
+
+    :param dict plan: {'add': notice list, 'update': operation list, 'delete': operation list}
+    :param bool as_json: Print one JSON document instead of a line per operation. (default=False)
+    """
+    if as_json:
+        _document = {
+            "add": [dict(_noti) for _noti in plan["add"]],
+            "update": [{"notice": dict(_operation.notice), "record": _operation.record} for _operation in plan["update"]],
+            "delete": [{"notice": dict(_operation.notice), "record": _operation.record} for _operation in plan["delete"]]
+        }
+        print(json.dumps(_document, ensure_ascii=False, indent=2))
+        return
+
+    for _noti in plan["add"]:
+        print(f"add\t{_noti['rigister_date']} ~ {_noti['deadline_date']}\t{_noti['title']}")
+    for _operation in plan["update"]:
+        print(f"update\t{_operation.record['deadline_date']} -> {_operation.notice['deadline_date']}\t{_operation.notice['title']}")
+    for _operation in plan["delete"]:
+        print(f"delete\t{_operation.notice['status']}\t{_operation.record['title']}")
+    print(f"{len(plan['add'])} to add, {len(plan['update'])} to update, {len(plan['delete'])} to delete.", file=sys.stderr)
@@ -0,0 +1,144 @@
+"""Poll the Job-Alio site and keep the calendar synchronized as a long-running process."""
+
+import json
+import logging
+import os
+import random
+import threading
+from typing import Union
+
+from miraelogger import Logger
+
+from module.diff import ADD, CLOSED_STATUS, count_operations
+from module.enrichment import DetailEnricher
+from module.instrumentation import METRICS
+from module.pipeline import create_sink
+from module.web_scraping import JobAlioScraping
+
+
+class SyncDaemon:
+    """Run the synchronization periodically, keeping the HTTP session and the device sessions alive."""
+
+    def __init__(self, configuration: Union[str, dict], logger=None, calendar_factory=None):
+        """Initialize the object.
+
+        :param str/dict configuration: Configuration path or Configuration dictionary.
+        :param logger logger: Logger.
+        :param callable calendar_factory: Calendar controller factory of the device pool. (default=None, NaverCalendar)
+        """
+        if logger is not None:
+            self._logger = logger
+        else:
+            self._logger = Logger(log_name=__name__, stream_log_level=logging.DEBUG).logger
+
+        if isinstance(configuration, str) and os.path.exists(configuration) and ('.json' in configuration):
+            with open(configuration, encoding="utf-8") as _f:
+                self._configuration = json.load(_f)
+        elif isinstance(configuration, dict):
+            self._configuration = configuration
+        else:
+            raise TypeError
+
+        _daemon = self._configuration.get("daemon", {})
+        self._interval = float(_daemon.get("interval", 1800))
+        self._jitter = float(_daemon.get("jitter", 300))
+
+        _sink = self._configuration.get("calendar_sink", {})
+        self._track_changes = _sink.get("track_changes", False)
+        self._closed_status = tuple(_sink.get("closed_status", CLOSED_STATUS))
+
+        self._calendar_factory = calendar_factory
+        self._job_scraping = None
+        self._enricher = None
+        self._sink = None
+        self._reconcile = None
+        self._stop = threading.Event()
+
+        self._logger.debug("SyncDaemon initialize finish.")
+
+    def run(self, full=False, reconcile=None, max_cycles=None) -> None:
+        """Run the cycles until 'stop' is called or the max cycle count.
+
+        :param bool full: Walk every page of the period in the first cycle. (default=False)
+        :param bool reconcile: Search the notices not in the sync index in the app. (default=None, 'reconcile' option)
+        :param int max_cycles: Maximum cycle count. (default=None, no limit)
+        """
+        self._job_scraping = JobAlioScraping(self._configuration, self._logger)
+        self._enricher = DetailEnricher(self._configuration, self._logger)
+        self._sink = create_sink(self._configuration, self._logger, self._calendar_factory)
+        self._sink.open(foreground=False)
+        self._reconcile = reconcile
+
+        _cycle = 0
+        try:
+            while not self._stop.is_set():
+                METRICS.reset()
+                try:
+                    self.run_cycle(full=full and _cycle == 0)
+                except Exception:
+                    METRICS.count("cycle_errors")
+                    self._logger.exception("The synchronization cycle is failed. Retry in the next cycle.")
+                finally:
+                    METRICS.write(self._configuration)
+
+                _cycle += 1
+                if (max_cycles is not None) and (_cycle >= max_cycles):
+                    break
+
+                _wait = max(0.0, self._interval + random.uniform(-self._jitter, self._jitter))
+                self._logger.info("Next synchronization in %.0f sec.", _wait)
+                self._stop.wait(_wait)
+        except KeyboardInterrupt:
+            self._logger.info("The daemon is interrupted.")
+        finally:
+            self._sink.finalize()
+            self._enricher.finalize()
+
+    def run_cycle(self, full=False) -> list:
+        """Scrape the notices and add the new ones. The calendar is brought to the foreground only if there is work.
+
+        With the 'track_changes' option, every page of the period is walked, and the changed schedules are edited
+        or deleted.
+
+        :param bool full: Walk every page of the period regardless of the watermark. (default=False)
+        :return: Added notice list.
+        :rtype: list
+        """
+        _notices = self._job_scraping.start(full=full or self._track_changes)
+        METRICS.count("notices", len(_notices), state="scraped")
+
+        _adds = _notices
+        _changes = []
+        if self._track_changes:
+            _operations = self._sink.diff(_notices, self._closed_status)
+            _changes = [_operation for _operation in _operations if _operation.kind != ADD]
+            _adds = [_operation.notice for _operation in _operations if _operation.kind == ADD]
+
+        # The sync index answers without the device, so an idle cycle never touches it.
+        _unknown = self._sink.arrange_schedule(_adds, reconcile=False)
+        if not (_unknown or _changes):
+            self._logger.info("There is no new notice.")
+            self._job_scraping.update_watermark(_notices)
+            return []
+
+        self._sink.prepare()
+        _reconcile = self._sink.should_reconcile() if self._reconcile is None else self._reconcile
+        if _reconcile and _unknown:
+            _unknown = self._sink.arrange_schedule(_unknown, reconcile=True)
+
+        for _noti in self._enricher.enrich(_unknown):
+            self._sink.submit(_noti)
+        _added = self._sink.join()
+        METRICS.count("notices", len(_added), state="added")
+        if _changes:
+            for _kind, _count in count_operations(self._sink.apply_changes(_changes)).items():
+                METRICS.count("notices", _count, state=_kind)
+
+        self._job_scraping.update_watermark(_notices)
+        self._logger.info("Add %d new schedules is finish. (Total notice of employment: %d)", len(_added),
+                          len(_notices))
+        return _added
+
+    def stop(self) -> None:
+        """Stop the daemon after the current cycle."""
+        self._stop.set()
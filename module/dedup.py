@@ -0,0 +1,146 @@
+"""Find the notices which are the same posting or a repost of a known schedule by their similar titles.
+
+The institutions often close a posting and register it again with a new idx and a slightly different title, so the
+exact key of the sync index cannot tell them. The title is normalized, cut into character n-grams and hashed into a
+bit signature. The signatures of the same organization are compared with the integer bit operations, and the numbers
+of the titles (e.g. the year or the round) must be the same.
+"""
+
+import collections
+import re
+import unicodedata
+import zlib
+
+NEW = "new"
+SAME = "same"
+REPOST = "repost"
+SIGNATURE_BITS = 1024
+REPOST_PREFIXES = ("기간연장", "연장", "추가", "재")
+POSTING_WORDS = ("공고", "모집", "채용")
+
+_TITLE_PATTERN = re.compile(r"^\s*\[([^\]]*)\]\s*(.*)$", re.S)
+_SYMBOLS = re.compile(r"[\W_]+")
+_NUMBERS = re.compile(r"\d+")
+_REPOST_PREFIX = re.compile(f"(?:{'|'.join(REPOST_PREFIXES)})(?=(?:{'|'.join(POSTING_WORDS)}))")
+_REPEATED_WORD = re.compile(f"({'|'.join(POSTING_WORDS)})\\1+")
+
+Match = collections.namedtuple("Match", ["kind", "notice", "record", "similarity"])
+Match.__doc__ = """Classification of a notice. 'record' is the matched sync index record. (None if it is new, or it
+matches a notice of the same batch)"""
+
+
+def normalize_title(title) -> tuple:
+    """Split the '[organization] title' into the normalized organization and title.
+
+    The width and case are unified, and the whitespace and the symbols are removed. Only the repost prefix of a
+    posting word is removed (e.g. '채용 재공고' becomes '채용공고'), so a repost keeps the title of its original posting.
+
+    :param str title: Title of the notice.
+    :return: (organization, title)
+    :rtype: tuple
+    """
+    _match = _TITLE_PATTERN.match(unicodedata.normalize("NFKC", title).lower())
+    _organization, _text = _match.groups() if _match else ("", title.lower())
+    _text = _REPOST_PREFIX.sub("", _SYMBOLS.sub("", _text))
+    return _SYMBOLS.sub("", _organization), _REPEATED_WORD.sub(r"\1", _text)
+
+
+def get_signature(text, size=3) -> int:
+    """Get the bit signature of the character n-grams of the text.
+
+    :param str text: Normalized text.
+    :param int size: Character count of an n-gram. (default=3)
+    :return: Signature which has a bit set for each hashed n-gram.
+    :rtype: int
+    """
+    _signature = 0
+    for i in range(max(len(text) - size + 1, 1)):
+        _signature |= 1 << (zlib.crc32(text[i:i + size].encode("utf-8")) % SIGNATURE_BITS)
+    return _signature
+
+
+def get_similarity(signature, other) -> float:
+    """Get the Jaccard similarity of the n-gram sets of the two signatures.
+
+    :param int signature: Signature.
+    :param int other: Other signature.
+    :return: Similarity between 0 and 1.
+    :rtype: float
+    """
+    _union = bin(signature | other).count("1")
+    return bin(signature & other).count("1") / _union if _union else 1.0
+
+
+class FuzzyIndex:
+    """In-memory index of the known schedules, blocked by the route and the organization of the title."""
+
+    def __init__(self, threshold=0.85):
+        """Initialize the object.
+
+        :param float threshold: Similarity from which the titles are the same posting. (default=0.85)
+        """
+        self._threshold = threshold
+        self._blocks = collections.defaultdict(list)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, title, register_date, deadline_date=None, route="", record=None) -> None:
+        """Add a known schedule.
+
+        :param str title: Title.
+        :param str register_date: Register date. ('YYYY.MM.DD')
+        :param str deadline_date: Deadline date. (default=None, unknown)
+        :param str route: Calendar of the notice routed by the filter profiles. (default='')
+        :param dict record: Sync index record of the schedule. (default=None)
+        """
+        _organization, _text = normalize_title(title)
+        self._blocks[(route, _organization)].append(
+            (get_signature(_text), _NUMBERS.findall(_text), register_date, deadline_date, record)
+        )
+        self._size += 1
+
+    def classify(self, notice_list) -> list:
+        """Classify each notice as new, the same posting or a repost of a known schedule.
+
+        - **same**: The most similar title is at or above the threshold and has the same register and deadline dates.
+        - **repost**: The most similar title is at or above the threshold and was registered before.
+        - **new**: Otherwise. (e.g. No title of the organization is similar enough)
+
+        The new notices and the reposts are added to the index, so a duplicate later in the same list is 'same'.
+
+        :param list notice_list: Notice list.
+        :return: Match list in the notice order.
+        :rtype: list
+        """
+        _matches = []
+        for _noti in notice_list:
+            _organization, _text = normalize_title(_noti["title"])
+            _signature = get_signature(_text)
+            _numbers = _NUMBERS.findall(_text)
+            _block = self._blocks[(_noti.get("calendar", ""), _organization)]
+
+            _best = None
+            _best_similarity = 0.0
+            for _entry in _block:
+                if _entry[1] != _numbers:
+                    continue
+                _similarity = get_similarity(_signature, _entry[0])
+                # The same register date wins the tie, so a posting listed twice is not taken as its repost.
+                if (_similarity > _best_similarity) or ((_similarity == _best_similarity) and (_best is not None) and
+                                                        (_entry[2] == _noti["rigister_date"])):
+                    _best, _best_similarity = _entry, _similarity
+
+            _kind = NEW
+            if (_best is not None) and (_best_similarity >= self._threshold):
+                if (_best[2] == _noti["rigister_date"]) and (_best[3] in (None, _noti["deadline_date"])):
+                    _kind = SAME
+                elif _best[2] < _noti["rigister_date"]:
+                    _kind = REPOST
+
+            _matches.append(Match(_kind, _noti, None if _kind == NEW else _best[4], _best_similarity))
+            if _kind != SAME:
+                _block.append((_signature, _numbers, _noti["rigister_date"], _noti["deadline_date"], None))
+                self._size += 1
+        return _matches
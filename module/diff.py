@@ -0,0 +1,64 @@
+"""Compare the scraped notices with the sync index and get the operations which make the calendar up to date."""
+
+import collections
+
+ADD = "add"
+UPDATE = "update"
+DELETE = "delete"
+CLOSED_STATUS = ("마감",)
+
+Operation = collections.namedtuple("Operation", ["kind", "notice", "record"])
+Operation.__doc__ = """Calendar operation of a notice. 'record' is the sync index record of the schedule. (None to add)"""
+
+
+def diff_notices(notice_list, sync_index=None, closed_status=CLOSED_STATUS) -> list:
+    """Get the minimal operations for the notices.
+
+    - **add**: The notice is not recorded and it is not closed.
+    - **update**: The notice is recorded, and its deadline date or title has changed.
+    - **delete**: The notice is recorded and it is closed now.
+
+    A notice which is recorded and has not changed needs no operation.
+
+    :param list notice_list: Notice list.
+    :param SyncIndex sync_index: Index of the created schedules. (default=None, every open notice is added)
+    :param tuple closed_status: Status texts of the closed notice. (default=('마감',))
+    :return: Operation list in the notice order.
+    :rtype: list
+    """
+    _operations = []
+    for _noti in notice_list:
+        _record = sync_index.get(_noti) if sync_index is not None else None
+        _closed = _noti.get("status") in closed_status
+
+        if _record is None:
+            if not _closed:
+                _operations.append(Operation(ADD, _noti, None))
+        elif _closed:
+            _operations.append(Operation(DELETE, _noti, _record))
+        elif _is_changed(_noti, _record):
+            _operations.append(Operation(UPDATE, _noti, _record))
+    return _operations
+
+
+def count_operations(operations) -> dict:
+    """Count the operations by kind.
+
+    :param list operations: Operation list.
+    :return: {kind: count}
+    :rtype: dict
+    """
+    return dict(collections.Counter(_operation.kind for _operation in operations))
+
+
+def _is_changed(notice, record) -> bool:
+    """Return whether the schedule of the record is stale. A value not recorded by the old index is not compared.
+
+    :param dict notice: Notice.
+    :param dict record: Sync index record.
+    :return: True if the deadline date or the title has changed.
+    :rtype: bool
+    """
+    if (record["deadline_date"] is not None) and (record["deadline_date"] != notice["deadline_date"]):
+        return True
+    return record["title"] != notice["title"]
@@ -0,0 +1,213 @@
+"""Add the details of the recruitview.do pages of Job-Alio site to the notices."""
+
+import hashlib
+import json
+import logging
+import os
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union
+
+import requests
+from bs4 import BeautifulSoup
+from miraelogger import Logger
+
+from module import exception
+from module.http_client import HttpClient
+from module.instrumentation import METRICS, staged
+from module.notice import Notice
+
+_LABELS = {
+    "period": ("접수기간", "공고기간", "기간"),
+    "headcount": ("채용인원", "모집인원", "인원"),
+    "attachments": ("첨부파일", "첨부")
+}
+
+
+class DetailEnricher:
+    """Fetch the detail pages of the notices concurrently through an on-disk cache.
+
+    A cached detail younger than 'ttl' is used without a request. An older one is revalidated with a conditional
+    request (If-None-Match / If-Modified-Since), so an unchanged detail page is never downloaded twice.
+    """
+
+    def __init__(self, configuration: Union[str, dict], logger=None):
+        """Initialize the object.
+
+        :param str/dict configuration: Configuration path or Configuration dictionary.
+        :param logger logger: Logger.
+        """
+        if logger is not None:
+            self._logger = logger
+        else:
+            self._logger = Logger(log_name=__name__, stream_log_level=logging.DEBUG).logger
+
+        if isinstance(configuration, str) and os.path.exists(configuration) and ('.json' in configuration):
+            with open(configuration, encoding="utf-8") as _f:
+                _web_scraping = json.load(_f)["web_scraping"]
+        elif isinstance(configuration, dict):
+            _web_scraping = configuration["web_scraping"]
+        else:
+            raise TypeError
+        self._configuration = _web_scraping.get("enrichment", {})
+
+        self.enabled = bool(self._configuration) and self._configuration.get("enabled", True)
+        self._url = self._configuration.get("url", "https://job.alio.go.kr/recruitview.do")
+        self._concurrency = int(self._configuration.get("concurrency", 4))
+        self._ttl = float(self._configuration.get("ttl", 86400))
+        self._cache_dir = self._configuration.get("cache_dir", "./state/detail_cache")
+
+        # The detail pages are on the same site, so the 'http' option of 'web_scraping' is used unless it is given.
+        self._client = HttpClient(self._configuration.get("http", _web_scraping.get("http")), self._concurrency, self._logger)
+
+        self._logger.debug("DetailEnricher initialize finish.")
+
+    @staged("enrich")
+    def enrich(self, notice_list) -> list:
+        """Add the period, the headcount and the attachments of the detail pages to the notices. The memo shows them.
+
+        A notice whose detail could not be fetched is returned as it is.
+
+        :param list notice_list: Notice list.
+        :return: Notice list.
+        :rtype: list
+        """
+        if (not self.enabled) or (not notice_list):
+            return notice_list
+
+        _idx_list = list(dict.fromkeys(str(_noti["idx"]) for _noti in notice_list))
+        with ThreadPoolExecutor(max_workers=self._concurrency) as _executor:
+            _details = dict(zip(_idx_list, _executor.map(self._get_detail_safely, _idx_list)))
+
+        _enriched = []
+        for _noti in notice_list:
+            _detail = _details[str(_noti["idx"])]
+            _enriched.append(_noti if _detail is None else Notice.from_dict(_noti).replace(**_detail))
+        return _enriched
+
+    def finalize(self) -> None:
+        """Finalize."""
+        self._client.close()
+
+    def _get_detail_safely(self, idx) -> Union[dict, None]:
+        """Get the detail, and log the failure instead of raising it.
+
+        :param str idx: Notice idx.
+        :return: Detail. (None if it could not be fetched.)
+        :rtype: dict/None
+        """
+        try:
+            return self._get_detail(idx)
+        except (exception.RequestException, requests.exceptions.RequestException):
+            self._logger.exception("Could not get the detail of %s.", idx, extra={"idx": idx})
+            return None
+
+    def _get_detail(self, idx) -> dict:
+        """Get the detail from the cache, or from the detail page.
+
+        :param str idx: Notice idx.
+        :return: Detail.
+        :rtype: dict
+        :raise RequestException: if request is not normal.
+        """
+        _entry = self._load_cache(idx)
+        if (_entry is not None) and (time.time() - _entry["fetched_at"] < self._ttl):
+            METRICS.count("detail_cache", result="fresh")
+            return _entry["detail"]
+
+        _headers = {}
+        if _entry is not None:
+            if _entry.get("etag"):
+                _headers["If-None-Match"] = _entry["etag"]
+            if _entry.get("last_modified"):
+                _headers["If-Modified-Since"] = _entry["last_modified"]
+
+        response = self._client.get(self._url, params={"idx": idx}, headers=_headers)
+        if (response.status_code == 304) and (_entry is not None):
+            METRICS.count("detail_cache", result="revalidated")
+            _entry["fetched_at"] = time.time()
+            self._save_cache(idx, _entry)
+            return _entry["detail"]
+
+        if response.status_code != 200:
+            self._logger.error(msg := f"Could not get the detail page. status code is {response.status_code}")
+            raise exception.RequestException(msg)
+
+        METRICS.count("detail_cache", result="miss")
+        _detail = parse_detail(response.content, response.url)
+        self._save_cache(idx, {
+            "fetched_at": time.time(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "detail": _detail
+        })
+        return _detail
+
+    def _get_cache_path(self, idx) -> str:
+        """Return the cache file path of the idx.
+
+        :param str idx: Notice idx.
+        :return: Cache file path.
+        :rtype: str
+        """
+        _name = idx if idx.isdigit() else hashlib.sha1(idx.encode("utf-8")).hexdigest()
+        return os.path.join(self._cache_dir, f"{_name}.json")
+
+    def _load_cache(self, idx) -> Union[dict, None]:
+        """Load the cache entry.
+
+        :param str idx: Notice idx.
+        :return: Cache entry. (None if there is no valid entry.)
+        :rtype: dict/None
+        """
+        try:
+            with open(self._get_cache_path(idx), encoding="utf-8") as _f:
+                return json.load(_f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_cache(self, idx, entry) -> None:
+        """Save the cache entry through a temporary file.
+
+        :param str idx: Notice idx.
+        :param dict entry: Cache entry.
+        """
+        os.makedirs(self._cache_dir, exist_ok=True)
+        _path = self._get_cache_path(idx)
+        with open(f"{_path}.tmp", "w", encoding="utf-8") as _f:
+            json.dump(entry, _f, ensure_ascii=False)
+        os.replace(f"{_path}.tmp", _path)
+
+
+def parse_detail(content, url) -> dict:
+    """Parse the detail page.
+
+    The detail page shows the items as header and data cell pairs, so the items are found by the header labels. A label
+    is matched as a whole, so a short fallback label such as '기간' does not pick another item such as '근무기간'.
+
+    :param bytes content: Page content.
+    :param str url: Page URL to resolve the attachment links.
+    :return: Detail which has 'period', 'headcount' and 'attachments' ([{'name', 'url'}] list).
+    :rtype: dict
+    """
+    my_soup = BeautifulSoup(content, "html.parser")
+    _cells = {}
+    for _header in my_soup.select("th"):
+        _data = _header.find_next_sibling("td")
+        if _data is not None:
+            _cells.setdefault(" ".join(_header.text.split()), _data)
+
+    _detail = {"period": None, "headcount": None, "attachments": []}
+    for _key, _labels in _LABELS.items():
+        _data = next((_cells[_label] for _label in _labels if _label in _cells), None)
+        if _data is None:
+            continue
+        if _key == "attachments":
+            _detail[_key] = [
+                {"name": " ".join(_anchor.text.split()), "url": urllib.parse.urljoin(url, _anchor.get("href"))}
+                for _anchor in _data.select("a[href]") if _anchor.text.strip()
+            ]
+        else:
+            _detail[_key] = " ".join(_data.text.split())
+    return _detail
@@ -0,0 +1,216 @@
+"""HTTP client with the timeouts, the retries of the transient failures and the hedged requests."""
+
+import collections
+import logging
+import random
+import threading
+import time
+import urllib.parse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from miraelogger import Logger
+
+from module.instrumentation import METRICS, bind_stage, current_stage, instrument_session
+
+TRANSIENT_STATUS = (429, 500, 502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE", "REPORT", "PROPFIND")
+
+
+def get_percentiles(values, percents=(50, 90, 99)) -> dict:
+    """Get the percentiles of the values with the nearest rank method.
+
+    :param list values: Values.
+    :param tuple percents: Percents. (default=(50, 90, 99))
+    :return: {'p50': value, ...} (Empty dictionary if there is no value.)
+    :rtype: dict
+    """
+    _sorted = sorted(values)
+    if not _sorted:
+        return {}
+    return {f"p{_percent}": _sorted[max(0, -(-len(_sorted) * _percent // 100) - 1)] for _percent in percents}
+
+
+def _get_host(url) -> str:
+    """Return the host of the URL.
+
+    :param str url: URL.
+    :return: Host with the port.
+    :rtype: str
+    """
+    return urllib.parse.urlsplit(url).netloc
+
+
+class HttpClient:
+    """Pooled HTTP session which bounds the time of each request.
+
+    Every request has the connect and read timeouts. A connection error, a timeout or a transient status code of an
+    idempotent request is retried with the exponential backoff and the full jitter, or after the Retry-After header.
+    With the 'hedge_after' option, a GET request which has not answered in time is sent once more and the first
+    answer is used. The latency of the recent requests is kept per host.
+    """
+
+    def __init__(self, configuration=None, pool_size=1, logger=None):
+        """Initialize the object.
+
+        :param dict configuration: 'http' option. (default=None, the default values)
+        :param int pool_size: Connection count kept for the concurrent requests. (default=1)
+        :param logger logger: Logger.
+        """
+        if logger is not None:
+            self._logger = logger
+        else:
+            self._logger = Logger(log_name=__name__, stream_log_level=logging.DEBUG).logger
+
+        configuration = configuration or {}
+        self._timeout = (float(configuration.get("connect_timeout", 5)), float(configuration.get("read_timeout", 30)))
+        self._retries = int(configuration.get("retries", 3))
+        self._backoff = float(configuration.get("backoff", 0.5))
+        self._backoff_max = float(configuration.get("backoff_max", 10))
+        self._hedge_after = configuration.get("hedge_after", None)
+        self._latency_window = int(configuration.get("latency_window", 1000))
+        self._latencies = collections.defaultdict(lambda: collections.deque(maxlen=self._latency_window))
+        self._lock = threading.Lock()
+        self._hedger = None
+
+        self.session = requests.Session()
+        _adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1) * 2)
+        self.session.mount("https://", _adapter)
+        self.session.mount("http://", _adapter)
+        instrument_session(self.session)
+
+    def get(self, url, **kwargs) -> requests.Response:
+        """Send the GET request.
+
+        :param str url: URL.
+        :param kwargs: Arguments of requests.Session.request.
+        :return: Response.
+        :rtype: requests.Response
+        """
+        return self.request("GET", url, **kwargs)
+
+    def put(self, url, **kwargs) -> requests.Response:
+        """Send the PUT request.
+
+        :param str url: URL.
+        :param kwargs: Arguments of requests.Session.request.
+        :return: Response.
+        :rtype: requests.Response
+        """
+        return self.request("PUT", url, **kwargs)
+
+    def request(self, method, url, **kwargs) -> requests.Response:
+        """Send the request, and retry the transient failure of the idempotent request.
+
+        The latency includes the retries, so it is the time the caller waited.
+
+        :param str method: HTTP method.
+        :param str url: URL.
+        :param kwargs: Arguments of requests.Session.request.
+        :return: Response. (The last response if the status code is still transient after the retries.)
+        :rtype: requests.Response
+        :raise requests.exceptions.RequestException: if the request could not be sent after the retries.
+        """
+        kwargs.setdefault("timeout", self._timeout)
+        _retries = self._retries if method.upper() in IDEMPOTENT_METHODS else 0
+        _start_time = time.perf_counter()
+
+        try:
+            for _attempt in range(_retries + 1):
+                try:
+                    response = self._send(method, url, kwargs)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    if _attempt == _retries:
+                        raise
+                    _delay = self._get_backoff(_attempt)
+                    self._logger.warning("%s %s is failed (%s). Retry in %.2f sec.", method, url, type(e).__name__, _delay)
+                else:
+                    if (response.status_code not in TRANSIENT_STATUS) or (_attempt == _retries):
+                        return response
+                    _delay = self._get_backoff(_attempt, response.headers.get("Retry-After"))
+                    self._logger.warning("%s %s is %d. Retry in %.2f sec.", method, url, response.status_code, _delay)
+
+                METRICS.count("http_retries", stage=current_stage())
+                time.sleep(_delay)
+        finally:
+            with self._lock:
+                self._latencies[_get_host(url)].append(time.perf_counter() - _start_time)
+
+    def get_percentiles(self, percents=(50, 90, 99), url=None, minimum=1) -> dict:
+        """Get the percentiles of the latency of the recent requests.
+
+        :param tuple percents: Percents. (default=(50, 90, 99))
+        :param str url: URL of the host whose requests are used. (default=None, every host)
+        :param int minimum: Request count needed to get the percentiles. (default=1)
+        :return: {'p50': seconds, ...} (Empty dictionary if there are fewer requests than the minimum.)
+        :rtype: dict
+        """
+        with self._lock:
+            if url is not None:
+                _latencies = list(self._latencies.get(_get_host(url), ()))
+            else:
+                _latencies = [_latency for _host_latencies in self._latencies.values() for _latency in _host_latencies]
+        return get_percentiles(_latencies, percents) if len(_latencies) >= minimum else {}
+
+    def close(self) -> None:
+        """Close the session. The hedged requests still running are not waited."""
+        if self._hedger is not None:
+            self._hedger.shutdown(wait=False)
+        self.session.close()
+
+    def _send(self, method, url, kwargs) -> requests.Response:
+        """Send the request once, or hedge the GET request.
+
+        :param str method: HTTP method.
+        :param str url: URL.
+        :param dict kwargs: Arguments of requests.Session.request.
+        :return: Response.
+        :rtype: requests.Response
+        """
+        _delay = self._get_hedge_delay(url) if method.upper() == "GET" else None
+        if _delay is None:
+            return self.session.request(method, url, **kwargs)
+
+        with self._lock:
+            if self._hedger is None:
+                self._hedger = ThreadPoolExecutor(thread_name_prefix="hedge")
+        _send = bind_stage(self.session.request)
+        _futures = [self._hedger.submit(_send, method, url, **kwargs)]
+        if not wait(_futures, timeout=_delay).done:
+            METRICS.count("http_hedges", stage=current_stage())
+            self._logger.debug("%s %s is slower than %.2f sec. Send the hedged request.", method, url, _delay)
+            _futures.append(self._hedger.submit(_send, method, url, **kwargs))
+
+        # The first answer wins. A failed one waits for the other request.
+        while True:
+            _done, _pending = wait(_futures, return_when=FIRST_COMPLETED)
+            for _future in _done:
+                if _future.exception() is None:
+                    return _future.result()
+            if not _pending:
+                return _done.pop().result()
+            _futures = list(_pending)
+
+    def _get_hedge_delay(self, url):
+        """Get the seconds after which the hedged request is sent.
+
+        :param str url: URL.
+        :return: 'hedge_after' seconds, the p95 latency of the recent requests to the host for 'auto' (after 20
+            requests), or None not to hedge.
+        :rtype: float/None
+        """
+        if self._hedge_after == "auto":
+            return self.get_percentiles((95,), url, minimum=20).get("p95")
+        return None if self._hedge_after is None else float(self._hedge_after)
+
+    def _get_backoff(self, attempt, retry_after=None) -> float:
+        """Get the seconds to wait before the retry.
+
+        :param int attempt: Failed attempt count minus one.
+        :param str retry_after: Retry-After header. (default=None)
+        :return: Seconds.
+        :rtype: float
+        """
+        if (retry_after is not None) and retry_after.strip().isdigit():
+            return min(float(retry_after), self._backoff_max)
+        return random.uniform(0, min(self._backoff_max, self._backoff * (2 ** attempt)))
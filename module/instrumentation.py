@@ -0,0 +1,276 @@
+"""Count and time the HTTP requests, the WebDriver commands and the stages of a synchronization."""
+
+import contextlib
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+
+# Upper bounds (sec) of the latency histogram buckets.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_context = threading.local()
+
+
+class Metrics:
+    """Thread safe registry of counters and latency histograms.
+
+    A metric is identified by its name and its labels. A histogram keeps the count, the sum, the maximum and the
+    cumulative bucket counts of the observed seconds.
+    """
+
+    def __init__(self):
+        """Initialize the object."""
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._started_at = datetime.datetime.now(datetime.timezone.utc)
+
+    def count(self, name, value=1, **labels) -> None:
+        """Increase the counter.
+
+        :param str name: Metric name.
+        :param int value: Increment. (default=1)
+        :param labels: Labels of the metric.
+        """
+        _key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[_key] = self._counters.get(_key, 0) + value
+
+    def observe(self, name, seconds, **labels) -> None:
+        """Add the seconds to the histogram.
+
+        :param str name: Metric name.
+        :param float seconds: Observed seconds.
+        :param labels: Labels of the metric.
+        """
+        _key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            _histogram = self._histograms.get(_key)
+            if _histogram is None:
+                _histogram = self._histograms[_key] = {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * len(BUCKETS)}
+            _histogram["count"] += 1
+            _histogram["sum"] += seconds
+            _histogram["max"] = max(_histogram["max"], seconds)
+            for i, _bound in enumerate(BUCKETS):
+                if seconds <= _bound:
+                    _histogram["buckets"][i] += 1
+
+    @contextlib.contextmanager
+    def timer(self, name, **labels):
+        """Observe the seconds of the block into the histogram.
+
+        :param str name: Metric name.
+        :param labels: Labels of the metric.
+        """
+        _start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - _start_time, **labels)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time the block as a stage. The WebDriver commands and the HTTP requests in the block are labeled with it.
+
+        :param str name: Stage name.
+        """
+        _previous = getattr(_context, "stage", None)
+        _context.stage = name
+        try:
+            with self.timer("stage_seconds", stage=name):
+                yield
+        finally:
+            _context.stage = _previous
+
+    def reset(self) -> None:
+        """Drop every metric."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._started_at = datetime.datetime.now(datetime.timezone.utc)
+
+    def summary(self) -> dict:
+        """Return the metrics as a dictionary.
+
+        :return: Summary which has 'started_at', 'finished_at', 'counters' and 'histograms'.
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                "started_at": self._started_at.isoformat(),
+                "finished_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "counters": [
+                    {"name": _name, "labels": dict(_labels), "value": _value}
+                    for (_name, _labels), _value in sorted(self._counters.items())
+                ],
+                "histograms": [
+                    {
+                        "name": _name, "labels": dict(_labels), "count": _h["count"], "sum": _h["sum"], "max": _h["max"],
+                        "mean": _h["sum"] / _h["count"], "buckets": dict(zip(BUCKETS, _h["buckets"]))
+                    }
+                    for (_name, _labels), _h in sorted(self._histograms.items())
+                ]
+            }
+
+    def to_prometheus(self) -> str:
+        """Return the metrics in the Prometheus text exposition format.
+
+        :return: Exposition text.
+        :rtype: str
+        """
+        _lines = []
+        with self._lock:
+            for _name in sorted({_name for _name, _ in self._counters}):
+                _lines.append(f"# TYPE calendar_autosync_{_name}_total counter")
+                for (_n, _labels), _value in sorted(self._counters.items()):
+                    if _n == _name:
+                        _lines.append(f"calendar_autosync_{_name}_total{_format_labels(_labels)} {_value}")
+
+            for _name in sorted({_name for _name, _ in self._histograms}):
+                _lines.append(f"# TYPE calendar_autosync_{_name} histogram")
+                for (_n, _labels), _h in sorted(self._histograms.items()):
+                    if _n != _name:
+                        continue
+                    for _bound, _count in zip(BUCKETS, _h["buckets"]):
+                        _lines.append(f"calendar_autosync_{_name}_bucket{_format_labels(_labels, le=_bound)} {_count}")
+                    _lines.append(f"calendar_autosync_{_name}_bucket{_format_labels(_labels, le='+Inf')} {_h['count']}")
+                    _lines.append(f"calendar_autosync_{_name}_sum{_format_labels(_labels)} {_h['sum']}")
+                    _lines.append(f"calendar_autosync_{_name}_count{_format_labels(_labels)} {_h['count']}")
+        return "\n".join(_lines) + "\n"
+
+    def write(self, configuration) -> dict:
+        """Write the JSON summary and the optional Prometheus text file of the 'instrumentation' section.
+
+        :param dict configuration: Configuration dictionary.
+        :return: Summary.
+        :rtype: dict
+        """
+        _configuration = configuration.get("instrumentation", {})
+        _summary = self.summary()
+
+        _summary_path = _configuration.get("summary", "")
+        if _summary_path:
+            _write_atomic(_summary_path, json.dumps(_summary, indent=2, ensure_ascii=False))
+        if _configuration.get("prometheus"):
+            _write_atomic(_configuration["prometheus"], self.to_prometheus())
+        return _summary
+
+
+def current_stage() -> str:
+    """Return the stage of the current thread.
+
+    :return: Stage name. ('none' if no stage is running.)
+    :rtype: str
+    """
+    return getattr(_context, "stage", None) or "none"
+
+
+def bind_stage(function):
+    """Bind the function to the stage of the current thread, e.g. to run it in a worker thread.
+
+    :param function: Function.
+    :return: Function which runs in the stage.
+    """
+    _stage = getattr(_context, "stage", None)
+
+    @functools.wraps(function)
+    def _wrapper(*args, **kwargs):
+        _previous = getattr(_context, "stage", None)
+        _context.stage = _stage
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _context.stage = _previous
+    return _wrapper
+
+
+def staged(name):
+    """Decorate the function to run as a stage of METRICS.
+
+    :param str name: Stage name.
+    :return: Decorator.
+    """
+    def _decorator(function):
+        @functools.wraps(function)
+        def _wrapper(*args, **kwargs):
+            with METRICS.stage(name):
+                return function(*args, **kwargs)
+        return _wrapper
+    return _decorator
+
+
+def instrument_session(session, metrics=None) -> None:
+    """Record the count and the latency of every request of the session.
+
+    :param requests.Session session: HTTP session.
+    :param Metrics metrics: Metric registry. (default=None, METRICS)
+    """
+    metrics = METRICS if metrics is None else metrics
+
+    def _record(response, *args, **kwargs):
+        _labels = {"stage": current_stage(), "method": response.request.method, "status": str(response.status_code)}
+        metrics.observe("http_request_seconds", response.elapsed.total_seconds(), **_labels)
+        metrics.count("http_response_bytes", len(response.content), stage=_labels["stage"])
+
+    session.hooks["response"].append(_record)
+
+
+def instrument_driver(driver, metrics=None) -> None:
+    """Record the count and the latency of every command the WebDriver sends.
+
+    Every command of the Selenium and Appium clients goes through 'execute', so wrapping it covers the element
+    lookups, the touch actions and the page source requests alike.
+
+    :param WebDriver driver: WebDriver.
+    :param Metrics metrics: Metric registry. (default=None, METRICS)
+    """
+    metrics = METRICS if metrics is None else metrics
+    _execute = driver.execute
+
+    def execute(driver_command, params=None):
+        _labels = {"stage": current_stage(), "command": driver_command}
+        try:
+            with metrics.timer("webdriver_command_seconds", **_labels):
+                return _execute(driver_command, params)
+        except Exception:
+            metrics.count("webdriver_command_errors", **_labels)
+            raise
+
+    driver.execute = execute
+
+
+def _format_labels(labels, **extra) -> str:
+    """Format the labels of the Prometheus text exposition format.
+
+    :param tuple labels: (name, value) pairs.
+    :param extra: Additional labels.
+    :return: Formatted labels.
+    :rtype: str
+    """
+    _pairs = list(labels) + list(extra.items())
+    if not _pairs:
+        return ""
+    _escaped = []
+    for _name, _value in _pairs:
+        _value = str(_value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        _escaped.append(f'{_name}="{_value}"')
+    return "{" + ",".join(_escaped) + "}"
+
+
+def _write_atomic(path, text) -> None:
+    """Write the text through a temporary file so a reader never sees a partial file.
+
+    :param str path: File path.
+    :param str text: Text.
+    """
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as _f:
+        _f.write(text)
+    os.replace(f"{path}.tmp", path)
+
+
+METRICS = Metrics()
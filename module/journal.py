@@ -0,0 +1,192 @@
+"""Journal the state of each notice of a run, so a failed run resumes where it stopped."""
+
+import datetime
+import json
+import os
+import threading
+
+from module.notice import Notice
+
+SCRAPED = "scraped"
+DEDUPED = "deduped"
+INSERTED = "inserted"
+FAILED = "failed"
+
+
+def get_key(notice) -> tuple:
+    """Return the journal key of the notice. It is the same as the key of the sync index.
+
+    :param dict notice: Notice.
+    :return: (idx, register date, route)
+    :rtype: tuple
+    """
+    return str(notice["idx"]), notice["rigister_date"], notice.get("calendar", "")
+
+
+class NoticeJournal:
+    """Append-only JSON lines journal of the notice states of a run.
+
+    A run starts with a 'begin' line and ends with an 'end' line. Each notice is written once as 'scraped' with its
+    fields, then its 'deduped' (with whether it is new), 'inserted' or 'failed' state is appended. A run without the
+    'end' line is resumed by the next run: the notices are read from the journal instead of scraped again (entirely if
+    the journal has the 'scrape_end' line), the deduplicated ones are not searched again, and the inserted ones are
+    skipped. The journal is started again when the previous run has ended.
+    """
+
+    def __init__(self, path):
+        """Initialize the object.
+
+        :param str path: Journal file path.
+        """
+        self._path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self._notices = {}
+        self._states = {}
+        self._new = {}
+        self.scrape_finished = False
+
+    def begin(self, resume=True) -> bool:
+        """Open the journal, and load the unfinished run of the journal.
+
+        :param bool resume: Resume the unfinished run. (default=True, False to start again)
+        :return: True if an unfinished run is resumed.
+        :rtype: bool
+        """
+        if os.path.dirname(self._path):
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+
+        _resumed = resume and self._load()
+        if not _resumed:
+            self._notices, self._states, self._new = {}, {}, {}
+            self.scrape_finished = False
+
+        self._file = open(self._path, "a" if _resumed else "w", encoding="utf-8")
+        self._write([{"event": "begin", "at": datetime.datetime.now().isoformat(timespec="seconds")}])
+        return _resumed
+
+    def __contains__(self, notice):
+        return get_key(notice) in self._notices
+
+    def get_notices(self, state=None) -> list:
+        """Return the notices of the journal in the scraped order.
+
+        :param str state: State of the notices. (default=None, every notice)
+        :return: Notice list.
+        :rtype: list
+        """
+        return [_noti for _key, _noti in self._notices.items() if (state is None) or (self._states[_key] == state)]
+
+    def get_pending(self) -> list:
+        """Return the new notices which are not inserted yet. They need neither the scrape nor the deduplication.
+
+        :return: Notice list.
+        :rtype: list
+        """
+        return [
+            _noti for _key, _noti in self._notices.items()
+            if (self._states[_key] == FAILED) or ((self._states[_key] == DEDUPED) and self._new[_key])
+        ]
+
+    def record_scraped(self, notice_list) -> None:
+        """Record the scraped notices with their fields.
+
+        :param list notice_list: Notice list.
+        """
+        _lines = []
+        for _noti in notice_list:
+            _noti = Notice.from_dict(_noti)
+            self._notices[get_key(_noti)] = _noti
+            self._states[get_key(_noti)] = SCRAPED
+            _lines.append({"state": SCRAPED, "notice": _noti.to_record()})
+        self._write(_lines)
+
+    def record_deduped(self, notice_list, new_list) -> None:
+        """Record the result of the deduplication.
+
+        :param list notice_list: Deduplicated notice list.
+        :param list new_list: New notice list among them.
+        """
+        _new_keys = {get_key(_noti) for _noti in new_list}
+        _lines = []
+        for _noti in notice_list:
+            self._states[get_key(_noti)] = DEDUPED
+            self._new[get_key(_noti)] = get_key(_noti) in _new_keys
+            _lines.append({"state": DEDUPED, "key": list(get_key(_noti)), "new": get_key(_noti) in _new_keys})
+        self._write(_lines)
+
+    def record(self, notice, state, error=None) -> None:
+        """Record the 'inserted' or 'failed' state of the notice.
+
+        :param dict notice: Notice.
+        :param str state: INSERTED or FAILED.
+        :param str error: Error of the failure. (default=None)
+        """
+        _line = {"state": state, "key": list(get_key(notice))}
+        if error is not None:
+            _line["error"] = error
+        self._states[get_key(notice)] = state
+        self._write([_line])
+
+    def finish_scrape(self) -> None:
+        """Record that every page is scraped."""
+        self.scrape_finished = True
+        self._write([{"event": "scrape_end"}])
+
+    def end(self) -> None:
+        """Record that the run is finished. The next run starts the journal again."""
+        self._write([{"event": "end", "at": datetime.datetime.now().isoformat(timespec="seconds")}])
+
+    def close(self) -> None:
+        """Close the journal."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _write(self, lines) -> None:
+        """Append the lines and flush them to the disk.
+
+        :param list lines: JSON line list.
+        """
+        if not lines:
+            return
+        with self._lock:
+            self._file.write("".join(json.dumps(_line, ensure_ascii=False) + "\n" for _line in lines))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _load(self) -> bool:
+        """Load the last run of the journal if it has not ended.
+
+        A line broken by a crash is ignored.
+
+        :return: True if the last run has not ended.
+        :rtype: bool
+        """
+        if not os.path.exists(self._path):
+            return False
+
+        _ended = True
+        with open(self._path, encoding="utf-8") as _f:
+            for _text in _f:
+                try:
+                    _line = json.loads(_text)
+                except ValueError:
+                    continue
+
+                if _line.get("event") == "begin":
+                    _ended = False
+                elif _line.get("event") == "scrape_end":
+                    self.scrape_finished = True
+                elif _line.get("event") == "end":
+                    _ended = True
+                elif _line.get("state") == SCRAPED:
+                    _noti = Notice.from_dict(_line["notice"])
+                    self._notices[get_key(_noti)] = _noti
+                    self._states[get_key(_noti)] = SCRAPED
+                elif tuple(_line.get("key", ())) in self._notices:
+                    self._states[tuple(_line["key"])] = _line["state"]
+                    if _line["state"] == DEDUPED:
+                        self._new[tuple(_line["key"])] = _line["new"]
+        return (not _ended) and bool(self._notices)
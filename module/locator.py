@@ -0,0 +1,80 @@
+"""Locators of the Naver Calendar mobile app.
+
+Each logical name is mapped to the lookup strategies to try in order. The resource id and UiSelector strategies are
+answered by uiautomator2 without serializing the whole hierarchy, so XPath is kept only as the fallback.
+"""
+
+from appium.webdriver.common.appiumby import AppiumBy
+
+NAVER_CALENDAR_PACKAGE = "com.nhn.android.calendar"
+
+
+def resource_id(name) -> list:
+    """Return the strategies to find the element by the resource id.
+
+    :param str name: Resource id name without the package. (e.g. 'startDate')
+    :return: (by, value) list.
+    :rtype: list
+    """
+    return [
+        (AppiumBy.ID, f"{NAVER_CALENDAR_PACKAGE}:id/{name}"),
+        (AppiumBy.XPATH, f"//*[contains(@resource-id, 'id/{name}')]")
+    ]
+
+
+def text_contains(text) -> list:
+    """Return the strategies to find the element which contains the text.
+
+    :param str text: Text.
+    :return: (by, value) list.
+    :rtype: list
+    """
+    return [
+        (AppiumBy.ANDROID_UIAUTOMATOR, f'new UiSelector().textContains("{_escape(text)}")'),
+        (AppiumBy.XPATH, f"//*[contains(@text, '{text}')]")
+    ]
+
+
+def resource_id_with_text(name, text) -> list:
+    """Return the strategies to find the element by the resource id and the exact text.
+
+    :param str name: Resource id name without the package.
+    :param str text: Text.
+    :return: (by, value) list.
+    :rtype: list
+    """
+    return [
+        (AppiumBy.ANDROID_UIAUTOMATOR,
+         f'new UiSelector().resourceId("{NAVER_CALENDAR_PACKAGE}:id/{name}").text("{_escape(text)}")'),
+        (AppiumBy.XPATH, f"//*[contains(@resource-id, 'id/{name}') and @text='{text}']")
+    ]
+
+
+def _escape(text) -> str:
+    """Escape the text for the UiSelector string literal.
+
+    :param str text: Text.
+    :return: Escaped text.
+    :rtype: str
+    """
+    return text.replace("\\", "\\\\").replace('"', '\\"')
+
+
+LOCATORS = {
+    "launcherIcon": [
+        (AppiumBy.ACCESSIBILITY_ID, "네이버 캘린더"),
+        (AppiumBy.XPATH, '//*[@content-desc="네이버 캘린더"]')
+    ],
+    # The edit and delete flows are tested against benchmark/fake_webdriver.py only. The ids of 'menu_edit',
+    # 'menu_delete' and 'dialog_confirm' are not verified on a device yet.
+    "dialog_confirm": [
+        (AppiumBy.ID, "android:id/button1"),
+        (AppiumBy.XPATH, "//*[@resource-id='android:id/button1']")
+    ],
+    **{_name: resource_id(_name) for _name in [
+        "menu_search", "search_filter", "searchFilterInit", "calendarFilter", "search_keyword_editor", "empty_view",
+        "floating_write_button", "floating_action_menu_schedule", "content", "allday", "memoEdit", "calendarName",
+        "reminder_chip_view_remove", "toolbarConfirm", "startDate", "endDate", "year", "month", "day", "menu_edit",
+        "menu_delete"
+    ]}
+}
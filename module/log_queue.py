@@ -0,0 +1,112 @@
+"""Hand the log records to a background thread, and write them as JSON lines.
+
+The handlers of the logger (e.g. the stream and file handlers of miraelogger) are moved behind a queue, so the thread
+which controls the device or fetches the pages only puts the record into the queue. The message is formatted and
+written by the listener thread.
+"""
+
+import copy
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+
+from module.instrumentation import current_stage
+
+
+class ContextFilter(logging.Filter):
+    """Add the stage of the logging thread and the notice idx to the record."""
+
+    def filter(self, record) -> bool:
+        """Add the 'stage' and the 'idx' attributes. The 'idx' is given with the 'extra' argument of the log call.
+
+        :param logging.LogRecord record: Log record.
+        :return: True. (Every record is kept.)
+        :rtype: bool
+        """
+        if not hasattr(record, "stage"):
+            record.stage = current_stage()
+        if not hasattr(record, "idx"):
+            record.idx = None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Format the record as one JSON line."""
+
+    def format(self, record) -> str:
+        """Format the record.
+
+        :param logging.LogRecord record: Log record.
+        :return: JSON text which has 'time', 'level', 'logger', 'thread', 'location', 'stage', 'idx' and 'message'.
+        :rtype: str
+        """
+        _line = {
+            "time": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "location": f"{record.filename}:{record.lineno}",
+            "stage": getattr(record, "stage", None),
+            "idx": getattr(record, "idx", None),
+            "message": record.getMessage()
+        }
+        if record.exc_info:
+            _line["exception"] = self.formatException(record.exc_info)
+        return json.dumps(_line, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queue handler which leaves the formatting to the listener thread."""
+
+    def prepare(self, record):
+        """Copy the record without formatting it. The record does not leave the process, so it is not pickled.
+
+        :param logging.LogRecord record: Log record.
+        :return: Copied record.
+        :rtype: logging.LogRecord
+        """
+        return copy.copy(record)
+
+
+def create_json_handler(path) -> logging.FileHandler:
+    """Create the handler which writes the records as JSON lines.
+
+    :param str path: Path of the JSON lines log.
+    :return: File handler.
+    :rtype: logging.FileHandler
+    """
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    _handler = logging.FileHandler(path, encoding="utf-8")
+    _handler.setFormatter(JsonFormatter())
+    _handler.addFilter(ContextFilter())
+    return _handler
+
+
+def start_queue_logging(logger, json_lines="") -> logging.handlers.QueueListener:
+    """Move the handlers of the logger behind a queue, and start the listener thread which runs them.
+
+    Stop the returned listener at the end to write the remaining records.
+
+    :param logging.Logger logger: Logger.
+    :param str json_lines: Path of the JSON lines log. (default='', no JSON lines log)
+    :return: Queue listener.
+    :rtype: logging.handlers.QueueListener
+    """
+    _handlers = list(logger.handlers)
+    if json_lines:
+        _handlers.append(create_json_handler(json_lines))
+
+    _queue = queue.SimpleQueue()
+    _queue_handler = _QueueHandler(_queue)
+    _queue_handler.addFilter(ContextFilter())
+    for _handler in logger.handlers[:]:
+        logger.removeHandler(_handler)
+    logger.addHandler(_queue_handler)
+
+    _listener = logging.handlers.QueueListener(_queue, *_handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
@@ -2,7 +2,9 @@
 import json
 import logging
 import os
+import re
 import time
+from xml.etree import ElementTree
 
 import urllib3.exceptions
 import selenium.common.exceptions
@@ -14,19 +16,37 @@ from typing import Union
 
 from appium.webdriver.common.appiumby import AppiumBy
 from appium.webdriver.common.touch_action import TouchAction
+from selenium.webdriver.common.actions import interaction
+from selenium.webdriver.common.actions.action_builder import ActionBuilder
+from selenium.webdriver.common.actions.pointer_input import PointerInput
 from miraelogger import Logger
 from module import exception
+from module.dedup import NEW, REPOST, SAME, FuzzyIndex
+from module.calendar_sink import CalendarSink
+from module.diff import CLOSED_STATUS, diff_notices
+from module.instrumentation import METRICS, instrument_driver, staged
+from module.locator import LOCATORS, NAVER_CALENDAR_PACKAGE, resource_id_with_text, text_contains
+from module.snapshot import HierarchySnapshot
+from module.sync_state import SyncIndex
 
 
-class NaverCalendar:
+DATE_PATTERN = re.compile(r"(\d{4})\.\s*(\d{1,2})\.\s*(\d{1,2})")
+SCREEN_CALENDAR = "calendar"
+
+
+class NaverCalendar(CalendarSink):
     """Naver Calendar control class."""
 
-    def __init__(self, configuration: Union[str, dict], logger=None):
+    def __init__(self, configuration: Union[str, dict], logger=None, sync_index=None, device=None):
         """Initialize the object.
 
         :param str/dict configuration: Configuration path or Configuration dictionary.
         :param logger logger: Logger.
+        :param SyncIndex sync_index: Index of the created schedules. (default=None, open the configured 'sync_index')
+        :param dict device: Device information which has 'capabilities' and 'port', or 'appium_url' of a running
+            Appium server. (default=None, 'capabilities' and 'appium_url' option)
         """
+        super().__init__()
         self._configuration = None
         if logger is not None:
             self._logger = logger
@@ -41,60 +61,247 @@ class NaverCalendar:
         else:
             raise TypeError
 
-        try:
-            self._logger.info(f"Appium service start...")
-            self._appium_service = appium.webdriver.appium_service.AppiumService()
-            self._appium_service.start(args=["--relaxed-security", "--log-timestamp"])
-            self._logger.info(f"Appium service is started.")
-        except appium.webdriver.appium_service.AppiumServiceError as e:
-            raise exception.AppiumException(e)
+        self._own_sync_index = sync_index is None
+        if sync_index is not None:
+            self._sync_index = sync_index
+        else:
+            self._sync_index = SyncIndex(self._configuration.get("sync_index", "./state/sync_index.sqlite3"))
+
+        if device is not None:
+            self._device = device
+        else:
+            self._device = {"capabilities": self._configuration["capabilities"]}
+            if "appium_url" in self._configuration:
+                self._device["appium_url"] = self._configuration["appium_url"]
+
+        self._appium_service = None
+        if "appium_url" in self._device:
+            self._appium_url = self._device["appium_url"]
+            self._logger.info("Attach to the Appium server. (%s)", self._appium_url)
+        else:
+            _port = self._device.get("port", 4723)
+            self._appium_url = f"http://localhost:{_port}"
+            try:
+                self._logger.info("Appium service start... (port: %s)", _port)
+                self._appium_service = appium.webdriver.appium_service.AppiumService()
+                self._appium_service.start(args=["--relaxed-security", "--log-timestamp", "--port", str(_port)])
+                self._logger.info("Appium service is started.")
+            except appium.webdriver.appium_service.AppiumServiceError as e:
+                raise exception.AppiumException(e)
+
+        self._track_screen = self._configuration.get("track_screen", True)
+        self._driver = None
+        self._connect()
+
+        self._logger.debug("NaverCalendar initialize finish.")
 
+    def _connect(self) -> None:
+        """Create the device session.
+
+        :raise: exception.AppiumException: if the Appium server could not be connected.
+        """
         try:
-            self._logger.info(f"{self._configuration['capabilities']['deviceName']} connect...")
-            self._driver = webdriver.Remote(r"http://localhost:4723", self._configuration["capabilities"])
-            self._logger.info(f"{self._configuration['capabilities']['deviceName']} is connected.")
+            self._logger.info("%s connect...", self._device['capabilities']['deviceName'])
+            self._driver = webdriver.Remote(self._appium_url, self._device["capabilities"])
+            instrument_driver(self._driver)
+            self._logger.info("%s is connected.", self._device['capabilities']['deviceName'])
         except urllib3.exceptions.MaxRetryError as e:
             raise exception.AppiumException(e)
 
-        self._logger.debug("NaverCalendar initialize finish.")
+        self._implicit_wait = None
+        self._element_cache = {}
+        # The screen and the form states known by this session. (None while it is unknown)
+        self._screen = None
+        self._search_calendar = None
+        self._form_layout = None
+
+    def is_alive(self) -> bool:
+        """Return whether the device session still answers.
+
+        :return: True if the session is alive.
+        :rtype: bool
+        """
+        try:
+            self._driver.current_activity
+        except (selenium.common.exceptions.WebDriverException, urllib3.exceptions.HTTPError):
+            return False
+        return True
+
+    def ensure_session(self) -> None:
+        """Reconnect the device session if it is stale."""
+        if self.is_alive():
+            return
+
+        self._logger.warning("The session of %s is stale. Reconnect...", self._device['capabilities']['deviceName'])
+        try:
+            self._driver.quit()
+        except (selenium.common.exceptions.WebDriverException, urllib3.exceptions.HTTPError):
+            pass
+        self._connect()
+
+    def open(self, foreground=True) -> None:
+        """Open the Naver calendar.
 
+        :param bool foreground: Bring the Naver calendar to the foreground. (default=True)
+        """
+        if foreground:
+            self.go_to_naver_calendar()
+
+    def prepare(self) -> None:
+        """Reconnect the stale session and bring the Naver calendar to the foreground."""
+        self.ensure_session()
+        self.go_to_naver_calendar()
+
+    @staged("go_to_naver_calendar")
     def go_to_naver_calendar(self):
-        """Open the Naver calendar."""
+        """Open the Naver calendar.
+
+        It is skipped when the last step of this session ended on the calendar screen and the app is still in the
+        foreground. (With the 'track_screen' option)
+        """
+        if self._is_on_calendar():
+            METRICS.count("navigation_skips", step="go_to_naver_calendar")
+            self._logger.debug("The Naver calendar is already in the foreground.")
+            return
+
         self._logger.info("Go to the Naver calendar...")
+        self._screen = None
 
         self._logger.debug("Go to Home")
         self._driver.press_keycode(3)
 
-        self._touch('//*[@content-desc="네이버 캘린더"]')
+        self._touch("launcherIcon")
 
         self._scroll("down", 2)
         self._scroll("up", 1)
+        self._screen = SCREEN_CALENDAR
 
-    def arrange_schedule(self, notice_list) -> list:
+    def _is_on_calendar(self) -> bool:
+        """Return whether the calendar screen is known to be in the foreground.
+
+        :return: True if the last step ended on the calendar screen and the app package is still in the foreground.
+        :rtype: bool
+        """
+        if (not self._track_screen) or (self._screen != SCREEN_CALENDAR):
+            return False
+        return self._driver.current_package == NAVER_CALENDAR_PACKAGE
+
+    @staged("arrange_schedule")
+    def arrange_schedule(self, notice_list, reconcile=None) -> list:
         """Check the old notice and get the new notice list.
 
+        The notices are looked up in the sync index first. The notices not in the index are compared with the titles of
+        the index ('fuzzy_dedup' option), so the same posting under another idx is recorded instead of added and a
+        repost is added without the search. Only the rest are searched in the app when reconciling, which is the
+        default while the index is empty.
+
         :param list notice_list: Notice list.
+        :param bool reconcile: Search the notices not in the index in the app. (default=None, 'reconcile' option)
         :return: New notice list.
         :rtype: list.
         """
         self._logger.info("Arrange the schedule of the Web scraping result start...")
-        _exist = []
-        _new = []
+        if reconcile is None:
+            reconcile = self.should_reconcile()
+
+        _unknown = [_noti for _noti in notice_list if _noti not in self._sync_index]
+        self._logger.debug("Notice in the sync index: %d", len(notice_list) - len(_unknown))
+
+        _reposts = []
+        if self._configuration.get("fuzzy_dedup", True) and _unknown:
+            _unknown, _reposts = self._deduplicate(_unknown)
+
+        if reconcile and _unknown:
+            _mode = self._configuration.get("reconcile_mode", "auto")
+            _new = []
+            # The notices routed by the filter profiles are searched in their own calendar.
+            for _calendar in dict.fromkeys(self._get_calendar(_noti) for _noti in _unknown):
+                _group = [_noti for _noti in _unknown if self._get_calendar(_noti) == _calendar]
+                if _mode == "harvest" or (_mode == "auto" and len(_group) >= self._configuration.get("harvest_threshold", 20)):
+                    _new.extend(self._harvest_new_schedule(_group, _calendar))
+                else:
+                    _new.extend(self._search_new_schedule(_group, _calendar))
+        else:
+            _new = _unknown
+        _new.extend(_reposts)
 
-        self._touch("//*[contains(@resource-id, 'id/menu_search')]")
-        time.sleep(0.5)
+        self._logger.info("Arrange the schedule of the Web scraping result is finish")
+        self._logger.info("New notice: %d, Exists notice: %d", len(_new), len(notice_list) - len(_new))
+        return _new
 
-        self._logger.debug("Setup the search filter.")
-        self._touch("//*[contains(@resource-id, 'id/search_filter')]")
-        self._touch("//*[contains(@resource-id, 'id/searchFilterInit')]")
-        self._touch("//*[contains(@resource-id, 'id/calendarFilter')]")
-        self._touch(f"//*[contains(@text, '{self._configuration['calendar']}')]")
-        self._driver.back()
-        self._driver.back()
+    def _deduplicate(self, notice_list) -> tuple:
+        """Classify the notices not in the sync index with the similar titles of the index.
+
+        The notices which are the same posting as a recorded schedule are recorded under their own key, and the
+        duplicates in the list are dropped.
+
+        :param list notice_list: Notice list not in the sync index.
+        :return: New notice list, repost notice list.
+        :rtype: list, list
+        """
+        _index = FuzzyIndex(self._configuration.get("fuzzy_threshold", 0.85))
+        for _record in self._sync_index.get_records():
+            _index.add(_record["title"], _record["rigister_date"], _record["deadline_date"], _record["route"], _record)
+
+        _groups = {NEW: [], SAME: [], REPOST: []}
+        for _match in _index.classify(notice_list):
+            _groups[_match.kind].append(_match.notice)
+            if _match.kind == SAME and _match.record is not None:
+                self._sync_index.record(_match.notice, _match.record["calendar"] or self._get_calendar(_match.notice))
+            if _match.kind != NEW:
+                self._logger.debug("%s is %s of a known schedule. (%.2f)", _match.notice['title'], _match.kind, _match.similarity,
+                                   extra={"idx": _match.notice["idx"]})
+
+        METRICS.count("fuzzy_matches", len(_groups[SAME]), kind=SAME)
+        METRICS.count("fuzzy_matches", len(_groups[REPOST]), kind=REPOST)
+        self._logger.debug("Fuzzy deduplication - New: %d, Same: %d, Repost: %d", len(_groups[NEW]), len(_groups[SAME]),
+                           len(_groups[REPOST]))
+        return _groups[NEW], _groups[REPOST]
+
+    def should_reconcile(self) -> bool:
+        """Return whether the notices not in the sync index should be searched in the app.
+
+        :return: True if the 'reconcile' option is set or the sync index is empty.
+        :rtype: bool
+        """
+        return self._configuration.get("reconcile", False) or len(self._sync_index) == 0
+
+    def diff(self, notice_list, closed_status=CLOSED_STATUS) -> list:
+        """Get the add, update and delete operations of the notices from the sync index.
 
-        _search_editor = self._driver.find_element(by=AppiumBy.XPATH, value="//*[contains(@resource-id, 'id/search_keyword_editor')]")
+        :param list notice_list: Notice list.
+        :param tuple closed_status: Status texts of the closed notice. (default=('마감',))
+        :return: Operation list.
+        :rtype: list
+        """
+        return diff_notices(notice_list, self._sync_index, closed_status)
+
+    def _get_calendar(self, notice) -> str:
+        """Return the calendar of the notice.
+
+        :param dict notice: Notice.
+        :return: 'calendar' of the notice routed by the filter profiles, otherwise the 'calendar' option.
+        :rtype: str
+        """
+        return notice.get("calendar", self._configuration["calendar"])
+
+    def _search_new_schedule(self, notice_list, calendar=None) -> list:
+        """Search the notices in the app and get the new notice list.
+
+        The notices found in the app are recorded in the sync index.
+
+        :param list notice_list: Notice list.
+        :param str calendar: Calendar to search. (default=None, 'calendar' option)
+        :return: New notice list.
+        :rtype: list.
+        """
+        self._logger.info("Reconcile the schedule with the app...")
+        _new = []
+
+        calendar = calendar or self._configuration["calendar"]
+        _search_editor = self._open_search(calendar)
         for _noti in notice_list:
-            self._logger.debug(f"Target title: {_noti['title']}")
+            self._logger.debug("Target title: %s", _noti['title'], extra={"idx": _noti["idx"]})
             _search_editor.clear()
             _search_editor.send_keys(_noti['title'])
 
@@ -104,7 +311,7 @@ class NaverCalendar:
             # 1st confirmation - empty text
             _empty_view = None
             try:
-                _empty_view = self._driver.find_elements(by=AppiumBy.XPATH,value="//*[contains(@resource-id, 'id/empty_view')]")
+                _empty_view = self._find_all("empty_view", timeout=1.0)
             except (selenium.common.exceptions.NoSuchElementException, RuntimeError, TimeoutError):
                 pass
 
@@ -116,181 +323,663 @@ class NaverCalendar:
             self._scroll_to_bottom()
 
             try:
-                _schedule_list = self._driver.find_elements(by=AppiumBy.XPATH, value=f"//*[contains(@resource-id, 'id/content') and @text='{_noti['title']}']")
+                _schedule_list = self._find_all(resource_id_with_text("content", _noti['title']), timeout=1.0)
             except (selenium.common.exceptions.NoSuchElementException, RuntimeError, TimeoutError):
+                _schedule_list = []
+
+            if not _schedule_list:
                 _new.append(_noti)
                 continue
 
             TouchAction(self._driver).tap(_schedule_list[-1]).perform()
+            self._invalidate_cache()
 
-            self._driver.implicitly_wait(1.0)
-            _start_date = self._driver.find_element(by=AppiumBy.XPATH, value="//*[contains(@resource-id, 'id/startDate')]").text
+            _start_date = self._find("startDate", timeout=1.0).text
 
             if _noti['rigister_date'] not in _start_date:
                 _new.append(_noti)
-            self._driver.back()
+            else:
+                self._sync_index.record(_noti, calendar)
+            self._back()
 
-        self._driver.back()
-        self._logger.info("Arrange the schedule of the Web scraping result is finish")
-        self._logger.info(f"New notice: {len(_new)}, Exists notice: {len(notice_list) - len(_new)}")
+        self._back()
+        self._screen = SCREEN_CALENDAR
+        return _new
+
+    def _harvest_new_schedule(self, notice_list, calendar=None) -> list:
+        """Collect the schedules of the calendar in a single pass and get the new notice list.
+
+        The notices found in the app are recorded in the sync index. A title whose start date could not be read may
+        be an older schedule of the same title, so the notice is searched and its date is checked one by one.
+
+        :param list notice_list: Notice list.
+        :param str calendar: Calendar to search. (default=None, 'calendar' option)
+        :return: New notice list.
+        :rtype: list.
+        """
+        self._logger.info("Reconcile the schedule with the app in a single pass...")
+        calendar = calendar or self._configuration["calendar"]
+        _titles, _schedules = self.harvest_schedule(calendar=calendar)
+        _dated_titles = {_title for _title, _ in _schedules}
+        _new = []
+        _unknown = []
+
+        for _noti in notice_list:
+            if (_noti['title'], _noti['rigister_date']) in _schedules:
+                self._sync_index.record(_noti, calendar)
+            elif (_noti['title'] in _titles) and (_noti['title'] not in _dated_titles):
+                _unknown.append(_noti)
+            else:
+                _new.append(_noti)
+
+        if _unknown:
+            self._logger.debug("The start date of %d titles is unknown. Search them one by one.", len(_unknown))
+            _new_ids = {id(_noti) for _noti in _new + self._search_new_schedule(_unknown, calendar)}
+            _new = [_noti for _noti in notice_list if id(_noti) in _new_ids]
         return _new
 
+    @staged("harvest_schedule")
+    def harvest_schedule(self, max_swipes=100, calendar=None) -> tuple:
+        """Search the calendar once and collect every visible schedule while scrolling.
+
+        The search keyword is the 'harvest_keyword' option (default='[') which every title made by the web
+        scraping contains.
+
+        :param int max_swipes: Maximum swipe count. (default=100)
+        :param str calendar: Calendar to search. (default=None, 'calendar' option)
+        :return: Title set, (title, start date) set.
+        :rtype: set, set
+        """
+        _search_editor = self._open_search(calendar or self._configuration["calendar"])
+        _search_editor.clear()
+        _search_editor.send_keys(self._configuration.get("harvest_keyword", "["))
+        if self._driver.is_keyboard_shown():
+            self._driver.hide_keyboard()
+
+        _titles = set()
+        _schedules = set()
+        for _swipe in range(max_swipes + 1):
+            _visible = self._get_visible_schedule(self._driver.page_source)
+            _before = len(_titles) + len(_schedules)
+            for _title, _date in _visible:
+                _titles.add(_title)
+                if _date is not None:
+                    _schedules.add((_title, _date))
+
+            if (_swipe > 0) and (len(_titles) + len(_schedules) == _before):
+                break
+            self._scroll()
+
+        self._back()
+        self._screen = SCREEN_CALENDAR
+        self._logger.debug("Harvested schedule: %d titles, %d dated", len(_titles), len(_schedules))
+        return _titles, _schedules
+
+    @staticmethod
+    def _get_visible_schedule(page_source) -> list:
+        """Get the schedule title and start date pairs from the search result hierarchy.
+
+        The start date is the date text in the same row, or the latest date header above the row.
+
+        :param str page_source: Page source XML.
+        :return: (title, 'YYYY.MM.DD' or None) list.
+        :rtype: list
+        """
+        _root = ElementTree.fromstring(page_source.encode("utf-8"))
+        _parents = {_child: _parent for _parent in _root.iter() for _child in _parent}
+        _result = []
+        _header_date = None
+
+        for _node in _root.iter():
+            _text = _node.get("text", "")
+            _date = DATE_PATTERN.search(_text)
+            if _date and not _node.get("resource-id", "").endswith("id/content"):
+                _header_date = "{}.{:0>2}.{:0>2}".format(*_date.groups())
+                continue
+
+            if not _node.get("resource-id", "").endswith("id/content") or not _text:
+                continue
+
+            _row_date = None
+            for _sibling in _parents.get(_node, _node).iter():
+                _match = DATE_PATTERN.search(_sibling.get("text", ""))
+                if (_sibling is not _node) and _match:
+                    _row_date = "{}.{:0>2}.{:0>2}".format(*_match.groups())
+                    break
+            _result.append((_text, _row_date or _header_date))
+        return _result
+
+    def _open_search(self, calendar):
+        """Open the search screen and filter the calendar.
+
+        The search filter is kept by the app, so it is set up only when this session has not set it to the calendar
+        yet. (With the 'track_screen' option)
+
+        :param str calendar: Calendar name.
+        :return: Search keyword editor element.
+        :rtype: WebElement
+        """
+        self._screen = None
+        self._touch("menu_search")
+        time.sleep(0.5)
+
+        if self._track_screen and (self._search_calendar == calendar):
+            METRICS.count("navigation_skips", step="search_filter")
+            self._logger.debug("The search filter is already %s.", calendar)
+        else:
+            self._logger.debug("Setup the search filter.")
+            self._search_calendar = None
+            self._touch("search_filter")
+            self._touch("searchFilterInit", navigate=False)
+            self._touch("calendarFilter")
+            self._touch(text_contains(calendar), navigate=False)
+            self._back()
+            self._back()
+            self._search_calendar = calendar
+
+        return self._find("search_keyword_editor", cache=True)
+
+    def add_schedules(self, notice_list) -> list:
+        """Add the schedules one by one.
+
+        :param list notice_list: Notice list.
+        :return: Added notice list.
+        :rtype: list
+        """
+        for _noti in notice_list:
+            self.add_schedule(_noti)
+        return notice_list
+
+    @staged("add_schedule")
     def add_schedule(self, notice) -> None:
         """Add schedule
 
         :param list notice: Notice.
         """
-        self._touch('//*[contains(@resource-id, "id/floating_write_button")]')
-        self._touch('//*[contains(@resource-id, "id/floating_action_menu_schedule")]')
+        self._screen = None
+        self._touch("floating_write_button", navigate=False)
+        self._touch("floating_action_menu_schedule")
         self._logger.info("Open the adding schedule screen.")
 
-        _search_editor = self._driver.find_element(by=AppiumBy.XPATH, value="//*[@resource-id='com.nhn.android.calendar:id/content']")
+        # The form options are read from one hierarchy snapshot, which is taken again only after the layout changes.
+        _snapshot = self.snapshot()
+        _calendar = self._get_calendar(notice)
+        if _snapshot.text("calendarName") != _calendar:
+            self._tap_element(_snapshot, "calendarName")
+            self._touch(resource_id_with_text("calendarText", _calendar))
+            _snapshot = self.snapshot()
+        self._logger.debug("Selected Calendar name: %s", _calendar, extra={"idx": notice["idx"]})
+
+        if _snapshot.selected("allday") is False:
+            self._tap_element(_snapshot, "allday")
+            self._logger.debug("Change the time option to all-day")
+            _snapshot = self._snapshot_after_allday(_snapshot)
+
+        if _snapshot.exists("reminder_chip_view_remove"):
+            self._tap_element(_snapshot, "reminder_chip_view_remove")
+            self._logger.debug("Remove the reminder")
+
+        _search_editor = self._find("content", cache=True)
         _search_editor.clear()
         _search_editor.send_keys(notice['title'])
-        self._logger.debug(f"Input title: {notice['title']}")
+        self._logger.debug("Input title: %s", notice['title'], extra={"idx": notice["idx"]})
 
-        _all_day_btn = self._driver.find_element(by=AppiumBy.XPATH, value="//*[contains(@resource-id, 'id/allday')]")
-        if _all_day_btn.is_selected() is False:
-            TouchAction(self._driver).tap(_all_day_btn).perform()
-            self._logger.debug("Change the time option to all-day")
+        self._control_date(notice['rigister_date'], notice['deadline_date'])
+
+        _memo = self._find("memoEdit", cache=True)
+        _memo.send_keys(notice['memo'])
+        self._logger.debug("Input memo: %s", notice['memo'], extra={"idx": notice["idx"]})
+
+        self._touch("toolbarConfirm")
+        self._screen = SCREEN_CALENDAR
+        self._sync_index.record(notice, _calendar)
+        self._logger.debug("%s is add.", notice['title'], extra={"idx": notice["idx"]})
+
+    def _snapshot_after_allday(self, snapshot) -> HierarchySnapshot:
+        """Get the snapshot of the form after the all-day option is tapped.
+
+        The same form always changes to the same layout, so the snapshot is taken again only when the form before
+        the tap differs from the last one. (With the 'track_screen' option)
 
+        :param HierarchySnapshot snapshot: Snapshot of the form before the tap.
+        :return: Snapshot of the form after the tap.
+        :rtype: HierarchySnapshot
+        """
+        if self._track_screen and (self._form_layout is not None) and (self._form_layout[0] == snapshot.page_source):
+            METRICS.count("navigation_skips", step="form_snapshot")
+            return self._form_layout[1]
+
+        _snapshot = self.snapshot()
+        self._form_layout = (snapshot.page_source, _snapshot)
+        return _snapshot
+
+    @staged("edit_schedule")
+    def edit_schedule(self, notice, record) -> None:
+        """Change the title, the dates and the memo of the schedule to the current notice.
+
+        :param dict notice: Notice.
+        :param dict record: Sync index record of the schedule.
+        :raise: exception.AppiumException: if the schedule could not be found.
+        """
+        _calendar = record.get("calendar") or self._get_calendar(notice)
+        self._open_schedule(record["title"], notice["rigister_date"], _calendar)
+        self._touch("menu_edit")
+
+        _title = self._find("content", cache=True)
+        _title.clear()
+        _title.send_keys(notice['title'])
         self._control_date(notice['rigister_date'], notice['deadline_date'])
 
-        _memo = self._driver.find_element(by=AppiumBy.XPATH, value="//*[contains(@resource-id, 'id/memoEdit')]")
+        _memo = self._find("memoEdit", cache=True)
+        _memo.clear()
         _memo.send_keys(notice['memo'])
-        self._logger.debug(f"Input memo: {notice['memo']}")
 
-        _calendar_name = self._driver.find_element(by=AppiumBy.XPATH, value="//*[contains(@resource-id, 'id/calendarName')]")
-        if _calendar_name.text != self._configuration["calendar"]:
-            TouchAction(self._driver).tap(_calendar_name).perform()
-            self._touch(f"//*[contains(@resource-id, 'id/calendarText') and @text='{self._configuration['calendar']}']")
-        self._logger.debug(f"Selected Calendar name: {self._configuration['calendar']}")
+        self._touch("toolbarConfirm")
+        self._back()
+        self._back()
+        self._screen = SCREEN_CALENDAR
+        self._sync_index.record(notice, _calendar)
+        self._logger.debug("%s is edited. (deadline: %s -> %s)", notice['title'], record['deadline_date'], notice['deadline_date'],
+                           extra={"idx": notice["idx"]})
+
+    @staged("delete_schedule")
+    def delete_schedule(self, notice, record) -> None:
+        """Delete the schedule of the notice.
+
+        :param dict notice: Notice.
+        :param dict record: Sync index record of the schedule.
+        :raise: exception.AppiumException: if the schedule could not be found.
+        """
+        _calendar = record.get("calendar") or self._get_calendar(notice)
+        self._open_schedule(record["title"], notice["rigister_date"], _calendar)
+        self._touch("menu_delete")
+        self._touch("dialog_confirm")
+        self._back()
+        self._screen = SCREEN_CALENDAR
+        self._sync_index.delete(notice)
+        self._logger.debug("%s is deleted.", record['title'], extra={"idx": notice["idx"]})
+
+    def _open_schedule(self, title, register_date, calendar) -> None:
+        """Search the title in the calendar and open the last schedule of the result which starts on the date.
+
+        :param str title: Title of the schedule.
+        :param str register_date: Start date of the schedule. ('YYYY.MM.DD')
+        :param str calendar: Calendar name.
+        :raise: exception.AppiumException: if the schedule could not be found.
+        """
+        _search_editor = self._open_search(calendar)
+        _search_editor.clear()
+        _search_editor.send_keys(title)
+        if self._driver.is_keyboard_shown():
+            self._driver.hide_keyboard()
 
-        try:
-            self._touch("//*[contains(@resource-id, 'id/reminder_chip_view_remove')]")
-        except exception.AppiumException:
-            pass
-        self._logger.debug(f"Remove the reminder")
+        self._scroll_to_bottom()
+        _schedule_list = self._find_all(resource_id_with_text("content", title), timeout=1.0)
+        if _schedule_list:
+            TouchAction(self._driver).tap(_schedule_list[-1]).perform()
+            self._invalidate_cache()
+            if register_date in self._find("startDate", timeout=1.0).text:
+                return
+            self._back()
 
-        self._touch("//*[contains(@resource-id, 'id/toolbarConfirm')]")
-        self._logger.debug(f"{notice['title']} is add.")
+        self._back()
+        self._logger.error(msg := f"Could not find the schedule of {title} ({register_date}).")
+        raise exception.AppiumException(msg)
 
+    def snapshot(self) -> HierarchySnapshot:
+        """Take a snapshot of the current screen hierarchy with a single page source request.
+
+        :return: Hierarchy snapshot.
+        :rtype: HierarchySnapshot
+        """
+        return HierarchySnapshot(self._driver.page_source)
+
+    def _tap_element(self, snapshot, name) -> None:
+        """Tap the center of the element in the snapshot, or find and touch it if the snapshot does not have it.
+
+        :param HierarchySnapshot snapshot: Hierarchy snapshot.
+        :param str name: Locator name which is the resource id name.
+        """
+        _center = snapshot.center(name)
+        if _center is None:
+            self._touch(name, navigate=False)
+        else:
+            self._tap(*_center)
+            self._logger.debug("Touch the '%s' at %s is success.", name, _center)
+
+    def _tap(self, x, y) -> None:
+        """Tap the position.
+
+        :param int x: X position.
+        :param int y: Y position.
+        """
+        _actions = ActionBuilder(self._driver, mouse=PointerInput(interaction.POINTER_TOUCH, "touch"))
+        _actions.pointer_action.move_to_location(int(x), int(y))
+        _actions.pointer_action.pointer_down()
+        _actions.pointer_action.pause(0.05)
+        _actions.pointer_action.release()
+        _actions.perform()
+
+    @staged("control_date")
     def _control_date(self, start_date, end_date):
         """Control the date as target_date
 
         :param str start_date: The YYYY.MM.DD format string.
         :param str end_date: The YYYY.MM.DD format string.
         """
-        self._touch("//*[contains(@resource-id, 'id/startDate')]")
+        self._touch("startDate", navigate=False)
 
-        _year_x, _year_y, _year_distance = self.__get_center_position("//*[contains(@resource-id, 'id/year')]")
-        _month_x, _month_y, _month_distance = self.__get_center_position("//*[contains(@resource-id, 'id/month')]")
-        _day_x, _day_y, _day_distance = self.__get_center_position("//*[contains(@resource-id, 'id/day')]")
         _scroll_info = [
-            [_year_x, _year_y, _year_distance, "Year"],
-            [_month_x, _month_y, _month_distance, "Month"],
-            [_day_x, _day_y, _day_distance, "Day"]
+            [*self.__get_center_position("year"), "Year"],
+            [*self.__get_center_position("month"), "Month"],
+            [*self.__get_center_position("day"), "Day"]
         ]
         self._logger.debug("Get Date scroll position and distance for scroll.")
 
-        self.__set_date(start_date.split("."), "//*[contains(@resource-id, 'id/startDate')]", _scroll_info)
+        self.__set_date(start_date.split("."), "startDate", _scroll_info)
         self._logger.debug("Change the start date.")
 
-        self._touch("//*[contains(@resource-id, 'id/endDate')]")
-        self.__set_date(end_date.split("."), "//*[contains(@resource-id, 'id/endDate')]", _scroll_info)
-        self._touch("//*[contains(@resource-id, 'id/endDate')]")
+        self._touch("endDate", navigate=False)
+        self.__set_date(end_date.split("."), "endDate", _scroll_info)
+        self._touch("endDate", navigate=False)
         self._logger.debug("Change the end date.")
 
-    def __set_date(self, target, xpath, info_list):
-        """
+    def __set_date(self, target, locator, info_list, attempts=2):
+        """Set the date wheels to the target date.
+
+        The whole offset of every wheel is performed as a single W3C action sequence and the date is read back
+        once. A second sequence corrects the remaining offset (e.g. the day wheel clamped by a shorter month).
 
-        :param list target: Target date information list.
-        :param str xpath:
-        :param info_list:
-        :return:
+        :param list target: Target date information list. ([YYYY, MM, DD])
+        :param str locator: Locator name of the date text which shows the current value.
+        :param list info_list: [x position, y position, distance, pitch, name] list of year, month, day wheels.
+        :param int attempts: Maximum action sequence count. (default=2)
         """
+        _current = self.__get_date(locator)
+
+        for _ in range(attempts):
+            _offsets = [int(target[i]) - int(_current[i]) for i in range(3)]
+            if not any(_offsets):
+                break
+
+            _actions = ActionBuilder(self._driver, mouse=PointerInput(interaction.POINTER_TOUCH, "touch"))
+            for i in range(3):
+                self.__append_wheel_swipes(_actions, info_list[i], _offsets[i])
+            _actions.perform()
+
+            _current = self.__get_date(locator)
+
         for i in range(3):
-            try:
-                _current = self._driver.find_element(by=AppiumBy.XPATH, value=xpath).text.split("(")[0].split(".")
-            except (selenium.common.exceptions.NoSuchElementException, RuntimeError, TimeoutError):
-                self._logger.exception(msg := f"Could not find the {xpath} elements.")
-                raise exception.AppiumException(msg)
-
-            if target[i] != _current[i]:
-                _differ = int(target[i]) - int(_current[i])
-                _x = info_list[i][0]
-                _y_start = info_list[i][1]
-                if _differ > 0:
-                    _y_end = info_list[i][1] - info_list[i][2]
-                else:
-                    _y_end = info_list[i][1] + info_list[i][2]
+            if int(target[i]) != int(_current[i]):
+                self._logger.error("Set %s value to %s failed.", info_list[i][-1], target[i])
 
-                for _ in range(abs(_differ)):
-                    TouchAction(self._driver).press(x=_x, y=_y_start).wait(100).move_to(x=_x, y=_y_end).release().wait(100).perform()
+    def __get_date(self, locator) -> list:
+        """Get the current date value.
 
-            _current = self._driver.find_element(by=AppiumBy.XPATH, value=xpath).text.split("(")[0].split(".")
-            if target[i] != _current[i]:
-                self._logger.error(f"Set {info_list[i][-1]} value to {target[i]} failed.")
+        :param str locator: Locator name of the date text.
+        :return: Current date information list. ([YYYY, MM, DD])
+        :rtype: list
+        :raise: exception.AppiumException: if the element could not be found.
+        """
+        try:
+            return self._text(locator).split("(")[0].split(".")
+        except (selenium.common.exceptions.NoSuchElementException, RuntimeError, TimeoutError):
+            self._logger.exception(msg := f"Could not find the {locator} elements.")
+            raise exception.AppiumException(msg)
 
-    def __get_center_position(self, xpath, division=5):
+    @staticmethod
+    def __append_wheel_swipes(actions, info, offset, division=5) -> None:
+        """Append the swipes which move the wheel by the offset to the action sequence.
+
+        One swipe moves up to (division - 1) notches, its length is scaled by the pixel pitch of the wheel.
+
+        :param ActionBuilder actions: Action sequence.
+        :param list info: [x position, y position, distance, pitch, name] of the wheel.
+        :param int offset: Notch count. Positive value moves the wheel to the next value.
+        :param int division: Visible row count of the wheel. (default=5)
+        """
+        _x, _y, _distance, _pitch = info[:4]
+        _direction = 1 if offset > 0 else -1
+        _remain = abs(offset)
+
+        while _remain > 0:
+            _notches = min(_remain, division - 1)
+            _length = (_notches - 1) * _pitch + _distance
+            _y_start = _y + _direction * _length / 2
+            _y_end = _y - _direction * _length / 2
+
+            actions.pointer_action.move_to_location(int(_x), int(_y_start))
+            actions.pointer_action.pointer_down()
+            actions.pointer_action.pause(0.1)
+            actions.pointer_action.move_to_location(int(_x), int(_y_end))
+            actions.pointer_action.release()
+            actions.pointer_action.pause(0.1)
+            _remain -= _notches
+
+    def __get_center_position(self, locator, division=5):
         """Get center position of element. And get distance for scroll.
 
-        :param str xpath: Target Xpath expression.
+        :param str locator: Target locator name.
         :param int division: Division value.
-        :return: x position, y position, distance
-        :rtype: int, int, int
+        :return: x position, y position, distance for one notch, pixel pitch of one row
+        :rtype: int, int, int, int
         """
-        self._driver.implicitly_wait(0.5)
         try:
-            _target_ele = self._driver.find_element(by=AppiumBy.XPATH, value=xpath)
+            _target_ele = self._find(locator, timeout=0.5)
         except (selenium.common.exceptions.NoSuchElementException, RuntimeError, TimeoutError):
-            self._logger.exception(msg := f"Could not find the '{xpath}' within 0.5 sec.")
+            self._logger.exception(msg := f"Could not find the '{locator}' within 0.5 sec.")
             raise exception.AppiumException(msg)
 
         _x_position = _target_ele.location["x"] + (_target_ele.size["width"] / 2)
         _y_position = _target_ele.location["y"] + (_target_ele.size["height"] / 2)
-        _distance = _target_ele.size["height"] / division / 4 * 3
-        return _x_position, _y_position, _distance
+        _pitch = _target_ele.size["height"] / division
+        _distance = _pitch / 4 * 3
+        return _x_position, _y_position, _distance, _pitch
 
     def finalize(self):
         """Finalize."""
         self._logger.debug("Go to Home")
         self._driver.press_keycode(3)
+        self._screen = None
 
         self._driver.quit()
-        self._logger.info(f"{self._configuration['capabilities']['deviceName']} is disconnected.")
-        self._appium_service.stop()
-        self._logger.info("Appium service is stopped.")
-
-    def _touch(self, xpath, timeout=1.0) -> None:
+        self._logger.info("%s is disconnected.", self._device['capabilities']['deviceName'])
+        if self._appium_service is not None:
+            self._appium_service.stop()
+            self._logger.info("Appium service is stopped.")
+        if self._own_sync_index:
+            self._sync_index.close()
+
+    def _touch(self, locator, timeout=1.0, navigate=True) -> None:
         """Touch element.
 
-        :param str xpath: Xpath expression.
+        :param str/list locator: Locator name, (by, value) list or Xpath expression.
         :param float timeout: Timeout for waiting (default=1.0).
+        :param bool navigate: The touch changes the screen, so the cached elements are dropped. (default=True)
         :raise: exception.AppiumException: if exception occurs.
         """
-        self._driver.implicitly_wait(timeout)
         try:
-            _target = self._driver.find_element(by=AppiumBy.XPATH, value=xpath)
+            _target = self._find(locator, timeout=timeout)
             TouchAction(self._driver).tap(_target).perform()
-            self._logger.debug(f"Touch the '{xpath}' is success.")
+            self._logger.debug("Touch the '%s' is success.", locator)
         except (selenium.common.exceptions.NoSuchElementException, RuntimeError):
-            self._logger.exception(msg := f"Touch the '{xpath}' is failed")
+            self._logger.exception(msg := f"Touch the '{locator}' is failed")
             raise exception.AppiumException(msg)
         except TimeoutError:
-            self._logger.exception(msg := f"Could not find the '{xpath}' within {timeout} sec.")
+            self._logger.exception(msg := f"Could not find the '{locator}' within {timeout} sec.")
             raise exception.AppiumException(msg)
+        finally:
+            if navigate:
+                self._invalidate_cache()
 
-    def _scroll_to_bottom(self) -> None:
-        """Scroll to bottom."""
-        _previous_page = self._driver.page_source
+    def _find(self, locator, timeout=1.0, cache=False):
+        """Find the element with the lookup strategies of the locator.
 
-        for _ in range(100):
-            self._scroll()
-            _current_page = self._driver.page_source
-            if _previous_page == _current_page:
-                break
-            _previous_page = _current_page
+        The first strategy waits up to the timeout, the fallback strategies are tried without waiting.
+
+        :param str/list locator: Locator name, (by, value) list or Xpath expression.
+        :param float timeout: Timeout for waiting (default=1.0).
+        :param bool cache: Reuse the element found before on the same screen. (default=False)
+        :return: Element.
+        :rtype: WebElement
+        :raise: selenium.common.exceptions.NoSuchElementException: if no strategy finds the element.
+        """
+        _key = str(locator)
+        _name = self._get_locator_name(locator)
+        if cache and (_key in self._element_cache):
+            METRICS.count("locator_cache_hits", locator=_name)
+            return self._element_cache[_key]
+
+        _error = None
+        with METRICS.timer("locator_seconds", locator=_name):
+            for _order, (_by, _value) in enumerate(self._get_strategies(locator)):
+                self._set_implicit_wait(timeout if _order == 0 else 0)
+                try:
+                    _element = self._driver.find_element(by=_by, value=_value)
+                except selenium.common.exceptions.NoSuchElementException as e:
+                    _error = e
+                    continue
+
+                METRICS.count("locator_lookups", locator=_name, strategy=_by, fallback=str(_order > 0).lower())
+                if cache:
+                    self._element_cache[_key] = _element
+                return _element
+
+        METRICS.count("locator_misses", locator=_name)
+        raise _error
+
+    def _find_all(self, locator, timeout=0) -> list:
+        """Find the elements with the first lookup strategy of the locator which finds any.
+
+        :param str/list locator: Locator name, (by, value) list or Xpath expression.
+        :param float timeout: Timeout for waiting (default=0).
+        :return: Element list.
+        :rtype: list
+        """
+        with METRICS.timer("locator_seconds", locator=self._get_locator_name(locator)):
+            for _order, (_by, _value) in enumerate(self._get_strategies(locator)):
+                self._set_implicit_wait(timeout if _order == 0 else 0)
+                _elements = self._driver.find_elements(by=_by, value=_value)
+                if _elements:
+                    return _elements
+        return []
+
+    def _text(self, locator) -> str:
+        """Get the text of the element, and find it again once if the cached element is stale.
+
+        :param str/list locator: Locator name, (by, value) list or Xpath expression.
+        :return: Text.
+        :rtype: str
+        """
+        try:
+            return self._find(locator, cache=True).text
+        except selenium.common.exceptions.StaleElementReferenceException:
+            self._element_cache.pop(str(locator), None)
+            return self._find(locator, cache=True).text
+
+    @staticmethod
+    def _get_locator_name(locator) -> str:
+        """Return the logical name of the locator for the metrics.
+
+        The locators made at runtime contain a title or a calendar name, so they are named by the resource id or the
+        lookup strategy only to keep the label count small.
+
+        :param str/list locator: Locator name, (by, value) list or Xpath expression.
+        :return: Locator name.
+        :rtype: str
+        """
+        if isinstance(locator, str) and (locator in LOCATORS):
+            return locator
+        _by, _value = locator[0] if isinstance(locator, list) else (AppiumBy.XPATH, locator)
+        _resource_id = re.search(r"id/(\w+)", _value)
+        return _resource_id.group(1) if _resource_id else _by
+
+    @staticmethod
+    def _get_strategies(locator) -> list:
+        """Return the lookup strategies of the locator.
+
+        :param str/list locator: Locator name, (by, value) list or Xpath expression.
+        :return: (by, value) list.
+        :rtype: list
+        """
+        if isinstance(locator, list):
+            return locator
+        if locator in LOCATORS:
+            return LOCATORS[locator]
+        return [(AppiumBy.XPATH, locator)]
+
+    def _set_implicit_wait(self, timeout) -> None:
+        """Change the implicit wait only when the value differs.
+
+        :param float timeout: Timeout for waiting.
+        """
+        if self._implicit_wait != timeout:
+            self._driver.implicitly_wait(timeout)
+            self._implicit_wait = timeout
+
+    def _invalidate_cache(self) -> None:
+        """Drop the elements cached on the current screen."""
+        self._element_cache.clear()
+
+    def _back(self) -> None:
+        """Go back to the previous screen."""
+        self._driver.back()
+        self._invalidate_cache()
+
+    @staged("scroll_to_bottom")
+    def _scroll_to_bottom(self, max_swipes=100) -> dict:
+        """Scroll to bottom.
+
+        With the 'scroll_strategy' option 'uiscrollable', UiAutomator scrolls to the end in a single command.
+        Otherwise (default='signature'), the screen is swiped until the text and bounds of the last visible
+        schedule row stop changing.
+
+        :param int max_swipes: Maximum swipe count. (default=100)
+        :return: Used strategy, swipe count and bytes read to detect the end.
+        :rtype: dict
+        """
+        _usage = {"strategy": self._configuration.get("scroll_strategy", "signature"), "swipes": 0, "bytes": 0}
+
+        if _usage["strategy"] == "uiscrollable":
+            try:
+                self._driver.find_element(
+                    by=AppiumBy.ANDROID_UIAUTOMATOR,
+                    value=f"new UiScrollable(new UiSelector().scrollable(true)).scrollToEnd({max_swipes})"
+                )
+            except selenium.common.exceptions.NoSuchElementException:
+                # scrollToEnd does not return an element, so the lookup always fails after scrolling.
+                pass
+        else:
+            _previous = self._get_last_row_signature()
+            _usage["bytes"] += len(_previous)
+
+            for _ in range(max_swipes):
+                self._scroll()
+                _usage["swipes"] += 1
+                _current = self._get_last_row_signature()
+                _usage["bytes"] += len(_current)
+                if _previous == _current:
+                    break
+                _previous = _current
+
+        self._logger.debug("Scroll to bottom is finish. (%s, swipes: %d, bytes: %d)", _usage['strategy'], _usage['swipes'],
+                           _usage['bytes'])
+        return _usage
+
+    def _get_last_row_signature(self) -> str:
+        """Get the identity of the last visible schedule row.
+
+        :return: Text and bounds of the last row. (Empty string if there is no row.)
+        :rtype: str
+        """
+        _rows = self._find_all(LOCATORS["content"][:1])
+        if not _rows:
+            return ""
+
+        try:
+            return f"{_rows[-1].text}|{_rows[-1].get_attribute('bounds')}"
+        except selenium.common.exceptions.StaleElementReferenceException:
+            return ""
 
     def _scroll(self, direction="up", times=1, x_position=None) -> None:
         """Scroll the screen.
@@ -319,7 +1008,7 @@ class NaverCalendar:
                 elif direction.lower() == "down":
                     TouchAction(self._driver).press(x=x_position, y=int(_height / 2)).wait(100).move_to(x=x_position, y=int(
                         _height / 4 * 3)).release().perform()
-            self._logger.debug(f"Scroll to {direction} is finish.")
+            self._logger.debug("Scroll to %s is finish.", direction)
         except Exception:
             self._logger.exception(msg := f"Could not scroll to {direction}.")
             raise Exception(msg)
\ No newline at end of file
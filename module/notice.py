@@ -0,0 +1,139 @@
+"""Notice of employment of Job-Alio site."""
+
+from collections.abc import Mapping
+
+_FIELDS = ("idx", "title", "rigister_date", "deadline_date", "status", "location", "work_type")
+_OPTIONAL_FIELDS = ("calendar", "period", "headcount", "attachments")
+_KEYS = _FIELDS + ("memo",) + _OPTIONAL_FIELDS
+
+
+class Notice(Mapping):
+    """Compact notice with a lazily rendered memo.
+
+    The notice reads like the dictionary of the notice (e.g. notice['title'], notice.get('calendar', '') and
+    {**notice}), so the code written for the dictionaries keeps working. An optional field which is not set is not a
+    key. The memo is rendered from the fields when it is read first, unless it is given explicitly.
+    """
+
+    __slots__ = _FIELDS + _OPTIONAL_FIELDS + ("_memo", "_rendered_memo")
+
+    def __init__(self, idx, title, rigister_date, deadline_date, status, location="", work_type="", memo=None,
+                 calendar=None, period=None, headcount=None, attachments=None):
+        """Initialize the object.
+
+        :param str idx: Job-Alio idx.
+        :param str title: Title. ('[institution] title')
+        :param str rigister_date: Register date. ('YYYY.MM.DD')
+        :param str deadline_date: Deadline date. ('YYYY.MM.DD')
+        :param str status: Status of the notice.
+        :param str location: Location shown in the result row. (default='')
+        :param str work_type: Work type shown in the result row. (default='')
+        :param str memo: Memo. (default=None, rendered from the fields)
+        :param str calendar: Target calendar of the filter profile. (default=None)
+        :param str period: Application period of the detail page. (default=None)
+        :param str headcount: Headcount of the detail page. (default=None)
+        :param list attachments: Attachment ({'name', 'url'}) list of the detail page. (default=None)
+        """
+        self.idx = str(idx)
+        self.title = title
+        self.rigister_date = rigister_date
+        self.deadline_date = deadline_date
+        self.status = status
+        self.location = location
+        self.work_type = work_type
+        self.calendar = calendar
+        self.period = period
+        self.headcount = headcount
+        self.attachments = attachments
+        self._memo = memo
+        self._rendered_memo = None
+
+    @classmethod
+    def from_dict(cls, data) -> "Notice":
+        """Create the notice from the dictionary of the notice. The keys which are not the fields are ignored.
+
+        :param dict data: Notice dictionary, or the notice itself.
+        :return: Notice.
+        :rtype: Notice
+        """
+        if isinstance(data, cls):
+            return data
+        return cls(**{_key: data[_key] for _key in _KEYS if _key in data})
+
+    @property
+    def memo(self) -> str:
+        """Memo of the schedule, with the details of the detail page if they are added."""
+        if self._rendered_memo is None:
+            _memo = self._memo if self._memo is not None else render_base_memo(self.idx, self.location, self.work_type)
+            self._rendered_memo = render_memo(_memo, self)
+        return self._rendered_memo
+
+    def replace(self, **changes) -> "Notice":
+        """Return a copy of the notice with the changed fields.
+
+        :param changes: Changed fields.
+        :return: Notice.
+        :rtype: Notice
+        """
+        return Notice(**{**self.to_record(), **changes})
+
+    def to_record(self) -> dict:
+        """Return the fields which are set. The memo is included only if it is given explicitly.
+
+        :return: Fields.
+        :rtype: dict
+        """
+        _record = {_key: getattr(self, _key) for _key in _FIELDS + _OPTIONAL_FIELDS if getattr(self, _key) is not None}
+        if self._memo is not None:
+            _record["memo"] = self._memo
+        return _record
+
+    def __getitem__(self, key):
+        if key not in _KEYS:
+            raise KeyError(key)
+        _value = getattr(self, key)
+        if _value is None:
+            raise KeyError(key)
+        return _value
+
+    def __iter__(self):
+        return (_key for _key in _KEYS if (_key == "memo") or (getattr(self, _key) is not None))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"Notice(idx={self.idx!r}, title={self.title!r}, rigister_date={self.rigister_date!r})"
+
+
+def render_base_memo(idx, location, work_type) -> str:
+    """Render the memo of the result row.
+
+    :param str idx: Job-Alio idx.
+    :param str location: Location.
+    :param str work_type: Work type.
+    :return: Memo.
+    :rtype: str
+    """
+    _link = f"https://job.alio.go.kr/recruitview.do?idx={idx}"
+    _mobile_link = f"https://job.alio.go.kr/mobile2021/recruit/recruitView.do?idx={idx}&pageNo=1&apba_type=&search_yn=&title=&org_type=&org_name=&order=REG_DATE&ing="
+    return f"고용형태:{work_type}\n위치: {location}\n공고링크: (web){_link}\n\t(mobile){_mobile_link}"
+
+
+def render_memo(memo, detail) -> str:
+    """Append the detail to the memo. A line which the memo already has is not appended again.
+
+    :param str memo: Memo of the notice.
+    :param dict detail: Detail.
+    :return: Memo.
+    :rtype: str
+    """
+    _lines = []
+    if detail.get("period"):
+        _lines.append(f"접수기간: {detail['period']}")
+    if detail.get("headcount"):
+        _lines.append(f"채용인원: {detail['headcount']}")
+    for _attachment in detail.get("attachments") or []:
+        _lines.append(f"첨부파일: {_attachment['name']} ({_attachment['url']})")
+    _existing = set(memo.split("\n"))
+    return "\n".join([memo] + [_line for _line in _lines if _line not in _existing])
@@ -0,0 +1,303 @@
+"""Parse the result pages of recruit.do.
+
+Every backend only extracts the cell texts and the notice link of each row, and the notice is built from them by
+the same code, so the backends give the same result. 'html.parser' builds the whole BeautifulSoup tree, 'lxml' builds
+the tree in C, and 'regex' only scans the rows of the result table with precompiled expressions.
+"""
+
+import html
+import re
+
+from bs4 import BeautifulSoup
+from bs4.dammit import UnicodeDammit
+
+from module.notice import Notice
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+_DIGITS = re.compile(r"\d+")
+_PAGE_NUMBER = re.compile(r"(?:pageNo=|goPage\(|fn_\w+\()\s*'?(\d+)")
+_CONTROL_CHARACTERS = str.maketrans("", "", "\r\t\n")
+
+_RESULT_TABLE = re.compile(r"<\w+\b[^>]*?\bid\s*=\s*[\"']?frm[\"'\s>]", re.I)
+_TABLE = re.compile(r"<table\b", re.I)
+_TBODY = re.compile(r"<tbody\b[^>]*>(.*?)</tbody\s*>", re.I | re.S)
+_ROW = re.compile(r"<tr\b[^>]*>(.*?)</tr\s*>", re.I | re.S)
+_CELL = re.compile(r"<td\b[^>]*>(.*?)</td\s*>", re.I | re.S)
+_HREF = re.compile(r"<a\b[^>]*?\bhref\s*=\s*(?:\"([^\"]*)\"|'([^']*)')", re.I)
+_COMMENT = re.compile(r"<!--.*?-->", re.S)
+_TAG = re.compile(r"<[^>]*>")
+_PAGING = re.compile(
+    r"<(\w+)\b[^>]*?\bclass\s*=\s*[\"'][^\"']*(?<![\w-])(?:paging|pagination|page)(?![\w-])[^\"']*[\"'][^>]*>", re.I
+)
+_ANCHOR = re.compile(r"<a\b([^>]*)>(.*?)</a\s*>", re.I | re.S)
+_ATTRIBUTE = re.compile(r"\b(href|onclick)\s*=\s*(?:\"([^\"]*)\"|'([^']*)')", re.I)
+
+
+class ResultParser:
+    """Parser interface of the result page."""
+
+    name = None
+
+    def parse(self, content) -> list:
+        """Parse the page content.
+
+        :param bytes content: Page content.
+        :return: Parsed data list. (Empty list if there is no data.)
+        :rtype: list
+        """
+        return [build_notice(_cells, _href) for _cells, _href in self.iter_rows(content)]
+
+    def iter_rows(self, content):
+        """Yield the cell texts and the notice link of each row of the result table.
+
+        :param bytes content: Page content.
+        :return: Generator of (cell text list, href of the title cell).
+        :rtype: generator
+        """
+        raise NotImplementedError
+
+    def get_last_page_no(self, content):
+        """Get the last page number from the paging area of the page.
+
+        :param bytes content: Page content.
+        :return: Last page number. (None if the paging area could not be found.)
+        :rtype: int/None
+        """
+        raise NotImplementedError
+
+
+class SoupParser(ResultParser):
+    """Parse with BeautifulSoup and html.parser."""
+
+    name = "html.parser"
+
+    def iter_rows(self, content):
+        """Yield the cell texts and the notice link of each row of the result table.
+
+        :param bytes content: Page content.
+        :return: Generator of (cell text list, href of the title cell).
+        :rtype: generator
+        """
+        my_soup = BeautifulSoup(content, "html.parser")
+        for _row in my_soup.select("#frm > table > tbody > tr"):
+            _column = _row.select("td")
+            yield [_cell.text for _cell in _column], _column[2].find('a').get('href')
+
+    def get_last_page_no(self, content):
+        """Get the last page number from the paging area of the page.
+
+        :param bytes content: Page content.
+        :return: Last page number. (None if the paging area could not be found.)
+        :rtype: int/None
+        """
+        my_soup = BeautifulSoup(content, "html.parser")
+        _anchors = []
+        for _anchor in my_soup.select(".paging a, .pagination a, .page a"):
+            _anchors.append((f"{_anchor.get('href', '')} {_anchor.get('onclick', '')}", _anchor.text))
+        return get_max_page_no(_anchors)
+
+
+class LxmlParser(ResultParser):
+    """Parse with lxml. (Optional dependency)"""
+
+    name = "lxml"
+
+    def __init__(self):
+        """Initialize the object.
+
+        :raise ImportError: if lxml is not installed.
+        """
+        if lxml is None:
+            raise ImportError("The 'lxml' parser needs the lxml package.")
+
+    def iter_rows(self, content):
+        """Yield the cell texts and the notice link of each row of the result table.
+
+        :param bytes content: Page content.
+        :return: Generator of (cell text list, href of the title cell).
+        :rtype: generator
+        """
+        _root = lxml.html.document_fromstring(content)
+        for _row in _root.xpath("//*[@id='frm']/table/tbody/tr"):
+            _column = _row.xpath(".//td")
+            yield [str(_cell.text_content()) for _cell in _column], _column[2].xpath(".//a")[0].get("href")
+
+    def get_last_page_no(self, content):
+        """Get the last page number from the paging area of the page.
+
+        :param bytes content: Page content.
+        :return: Last page number. (None if the paging area could not be found.)
+        :rtype: int/None
+        """
+        _root = lxml.html.document_fromstring(content)
+        _class = " or ".join(
+            f"contains(concat(' ', normalize-space(@class), ' '), ' {_name} ')" for _name in ("paging", "pagination", "page")
+        )
+        _anchors = []
+        for _anchor in _root.xpath(f"//*[{_class}]//a"):
+            _anchors.append((f"{_anchor.get('href', '')} {_anchor.get('onclick', '')}", str(_anchor.text_content())))
+        return get_max_page_no(_anchors)
+
+
+class RegexParser(ResultParser):
+    """Scan only the rows of the result table with precompiled expressions.
+
+    A page whose rows could not be read as expected, or which looks empty, is parsed again with html.parser, so an
+    unexpected markup never stops the paging silently.
+    """
+
+    name = "regex"
+
+    def __init__(self):
+        """Initialize the object."""
+        self._fallback = SoupParser()
+
+    def iter_rows(self, content):
+        """Yield the cell texts and the notice link of each row of the result table.
+
+        :param bytes content: Page content.
+        :return: Generator of (cell text list, href of the title cell).
+        :rtype: generator
+        """
+        _rows = self._scan_rows(_decode(content))
+        if not _rows:
+            yield from self._fallback.iter_rows(content)
+            return
+        yield from _rows
+
+    def get_last_page_no(self, content):
+        """Get the last page number from the paging area of the page.
+
+        :param bytes content: Page content.
+        :return: Last page number. (None if the paging area could not be found.)
+        :rtype: int/None
+        """
+        _markup = _decode(content)
+        _anchors = []
+        for _area in _PAGING.finditer(_markup):
+            _end = _markup.find(f"</{_area.group(1)}", _area.end())
+            for _attributes, _text in _ANCHOR.findall(_markup[_area.end():_end if _end >= 0 else None]):
+                _values = {_name.lower(): _double or _single for _name, _double, _single in _ATTRIBUTE.findall(_attributes)}
+                _anchors.append((
+                    html.unescape(f"{_values.get('href', '')} {_values.get('onclick', '')}"), _get_text(_text)
+                ))
+        return get_max_page_no(_anchors)
+
+    @staticmethod
+    def _scan_rows(markup) -> list:
+        """Scan the rows of the result table.
+
+        :param str markup: Page markup.
+        :return: (cell text list, href of the title cell) list. (Empty list if any row is not as expected.)
+        :rtype: list
+        """
+        _result_table = _RESULT_TABLE.search(markup)
+        if _result_table is None:
+            return []
+        _table = _TABLE.search(markup, _result_table.end())
+        _tbody = _TBODY.search(markup, _table.end()) if _table else None
+        if _tbody is None:
+            return []
+
+        _rows = []
+        for _row in _ROW.finditer(_tbody.group(1)):
+            _cells = _CELL.findall(_row.group(1))
+            _href = _HREF.search(_cells[2]) if len(_cells) > 8 else None
+            if _href is None:
+                return []
+            _rows.append(([_get_text(_cell) for _cell in _cells], html.unescape(_href.group(1) or _href.group(2))))
+        return _rows
+
+
+PARSERS = {_parser.name: _parser for _parser in (SoupParser, LxmlParser, RegexParser)}
+
+
+def create_parser(name="auto") -> ResultParser:
+    """Create the parser of the name.
+
+    :param str name: 'html.parser', 'lxml', 'regex' or 'auto'. ('auto' is lxml if installed, otherwise regex.)
+    :return: Parser.
+    :rtype: ResultParser
+    :raise ValueError: if the name is unknown.
+    :raise ImportError: if lxml is selected but not installed.
+    """
+    if name == "auto":
+        name = "lxml" if lxml is not None else "regex"
+    if name not in PARSERS:
+        raise ValueError(f"Unknown parser: {name}")
+    return PARSERS[name]()
+
+
+def build_notice(cells, href) -> Notice:
+    """Build the notice from the cell texts of a row.
+
+    :param list cells: Cell text list of the row.
+    :param str href: Link of the title cell.
+    :return: Notice.
+    :rtype: Notice
+    """
+    __idx = _DIGITS.findall(href.split('idx=')[-1])[0]
+
+    _title = f"[{cells[3].strip()}] {cells[2].strip()}".replace("\'", "")
+    _location = cells[4].strip().translate(_CONTROL_CHARACTERS)
+    _work_type = cells[5].strip().translate(_CONTROL_CHARACTERS)
+    _register_date = cells[6].strip().translate(_CONTROL_CHARACTERS)
+    _deadline_date = cells[7].strip().translate(_CONTROL_CHARACTERS)[:8]
+    _status = cells[8].strip()
+
+    return Notice(
+        idx=__idx,
+        title=_title,
+        rigister_date=_register_date,
+        deadline_date=f"20{_deadline_date}",
+        status=_status,
+        location=_location,
+        work_type=_work_type
+    )
+
+
+def get_max_page_no(anchors):
+    """Get the biggest page number of the paging anchors.
+
+    :param list anchors: (href and onclick script, text) list of the anchors.
+    :return: Last page number. (None if there is no page number.)
+    :rtype: int/None
+    """
+    _page_numbers = []
+    for _script, _text in anchors:
+        _page_numbers.extend(int(i) for i in _PAGE_NUMBER.findall(_script))
+        if _text.strip().isdigit():
+            _page_numbers.append(int(_text.strip()))
+
+    if not _page_numbers:
+        return None
+    return max(_page_numbers)
+
+
+def _decode(content) -> str:
+    """Decode the page content. The declared or detected encoding is used if it is not UTF-8.
+
+    :param bytes content: Page content.
+    :return: Page markup.
+    :rtype: str
+    """
+    if isinstance(content, str):
+        return content
+    try:
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        return UnicodeDammit(content, is_html=True).unicode_markup
+
+
+def _get_text(fragment) -> str:
+    """Get the text of the markup fragment.
+
+    :param str fragment: Markup fragment.
+    :return: Text without the tags and the comments.
+    :rtype: str
+    """
+    return html.unescape(_TAG.sub("", _COMMENT.sub("", fragment)))
@@ -0,0 +1,298 @@
+"""Synchronize the Job-Alio notices into the Naver calendar as a pipeline."""
+
+import json
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union
+
+from miraelogger import Logger
+
+from module.calendar_sink import CalDAVSink, ICalendarSink
+from module.diff import ADD, CLOSED_STATUS, DELETE, UPDATE, count_operations
+from module.enrichment import DetailEnricher
+from module.instrumentation import METRICS
+from module.journal import SCRAPED, NoticeJournal
+from module.sharding import DevicePool
+from module.web_scraping import JobAlioScraping
+
+_END = object()
+
+
+def create_sink(configuration, logger, calendar_factory=None):
+    """Create the calendar sink of the 'calendar_sink' type option.
+
+    With the default type 'naver', the device pool of the Naver calendar is created. It starts the Appium services
+    and connects the devices when it is opened.
+
+    :param dict configuration: Configuration dictionary.
+    :param logger logger: Logger.
+    :param callable calendar_factory: Calendar controller factory of the device pool. (default=None, NaverCalendar)
+    :return: Calendar sink.
+    :rtype: CalendarSink
+    """
+    _type = configuration.get("calendar_sink", {}).get("type", "naver")
+    if _type == "ics":
+        return ICalendarSink(configuration, logger)
+    if _type == "caldav":
+        return CalDAVSink(configuration, logger)
+    if _type == "naver":
+        return DevicePool(configuration, logger, calendar_factory=calendar_factory)
+    raise ValueError(f"Unknown calendar sink type: {_type}")
+
+
+class SyncPipeline:
+    """Overlap the device startup with the web scraping, and insert the notices page by page."""
+
+    def __init__(self, configuration: Union[str, dict], logger=None, calendar_factory=None):
+        """Initialize the object.
+
+        :param str/dict configuration: Configuration path or Configuration dictionary.
+        :param logger logger: Logger.
+        :param callable calendar_factory: Calendar controller factory of the device pool. (default=None, NaverCalendar)
+        """
+        if logger is not None:
+            self._logger = logger
+        else:
+            self._logger = Logger(log_name=__name__, stream_log_level=logging.DEBUG).logger
+
+        if isinstance(configuration, str) and os.path.exists(configuration) and ('.json' in configuration):
+            with open(configuration, encoding="utf-8") as _f:
+                self._configuration = json.load(_f)
+        elif isinstance(configuration, dict):
+            self._configuration = configuration
+        else:
+            raise TypeError
+
+        _sink = self._configuration.get("calendar_sink", {})
+        self._track_changes = _sink.get("track_changes", False)
+        self._closed_status = tuple(_sink.get("closed_status", CLOSED_STATUS))
+
+        self._calendar_factory = calendar_factory
+        self._logger.debug("SyncPipeline initialize finish.")
+
+    def run(self, full=False, reconcile=None, resume=True) -> list:
+        """Scrape the notices and add the new ones to the calendar.
+
+        The Appium services and the device sessions are started in the background while the pages are fetched.
+        Each page is deduplicated and its new notices are queued to the calendar sink as soon as it is ready.
+        When the journal has an unfinished run, its notices are not scraped or deduplicated again, and only the ones
+        not inserted yet are queued.
+        With the 'track_changes' option, every page of the period is walked, and the schedules of the notices whose
+        deadline date or title has changed are edited, and the ones of the closed notices are deleted.
+        When a page fails after the retries, the notices of the pages got before are still added, then the error is
+        raised. The watermark is not moved and the journal is left unfinished, so the next run walks the rest.
+
+        :param bool full: Walk every page of the period regardless of the watermark. (default=False)
+        :param bool reconcile: Search the notices not in the sync index in the app. (default=None, 'reconcile' option)
+        :param bool resume: Resume the unfinished run of the journal. (default=True)
+        :return: Added notice list.
+        :rtype: list
+        """
+        METRICS.reset()
+        full = full or self._track_changes
+        job_scraping = JobAlioScraping(self._configuration, self._logger)
+        enricher = DetailEnricher(self._configuration, self._logger)
+        journal = self._open_journal()
+        _resumed = (journal is not None) and journal.begin(resume)
+        _pages = queue.Queue()
+        _stop = threading.Event()
+        _scraped = []
+        _changes = []
+        _scrape_error = None
+
+        with ThreadPoolExecutor(max_workers=2) as _executor:
+            _calendar_future = _executor.submit(self._open_sink)
+            if _resumed and journal.scrape_finished:
+                # The journal has every page of the unfinished run, so the watermark can be moved after it.
+                job_scraping.complete = True
+                _pages.put(_END)
+            else:
+                _executor.submit(self._scrape, job_scraping, full, _pages, _stop)
+
+            try:
+                sink = _calendar_future.result()
+            except Exception:
+                _stop.set()
+                if journal is not None:
+                    journal.close()
+                raise
+
+            try:
+                sink.journal = journal
+                # Decide once, because the sync index is filled while the pages are inserted.
+                if reconcile is None:
+                    reconcile = sink.should_reconcile()
+
+                if _resumed:
+                    _scraped.extend(journal.get_notices())
+                    _pending = journal.get_pending()
+                    self._logger.info("Resume the unfinished run. (Notices: %d, not inserted: %d)", len(_scraped),
+                                      len(_pending))
+                    for _noti in enricher.enrich(_pending):
+                        sink.submit(_noti)
+                    self._arrange(sink, enricher, journal, journal.get_notices(SCRAPED), reconcile, _changes)
+
+                while (_page := _pages.get()) is not _END:
+                    if isinstance(_page, Exception):
+                        _scrape_error = _page
+                        continue
+
+                    if journal is not None:
+                        _page = [_noti for _noti in _page if _noti not in journal]
+                        journal.record_scraped(_page)
+                    _scraped.extend(_page)
+                    self._arrange(sink, enricher, journal, _page, reconcile, _changes)
+
+                if (journal is not None) and (_scrape_error is None) and not journal.scrape_finished:
+                    journal.finish_scrape()
+                _added = sink.join()
+                METRICS.count("notices", len(_added), state="added")
+                if _changes:
+                    for _kind, _count in count_operations(sink.apply_changes(_changes)).items():
+                        METRICS.count("notices", _count, state=_kind)
+                if _scrape_error is not None:
+                    self._logger.error("Web scraping is stopped. The %d schedules of the pages got before are added.",
+                                       len(_added))
+                    raise _scrape_error
+                job_scraping.update_watermark(_scraped)
+                if journal is not None:
+                    journal.end()
+            finally:
+                _stop.set()
+                sink.finalize()
+                enricher.finalize()
+                if journal is not None:
+                    journal.close()
+                METRICS.count("notices", len(_scraped), state="scraped")
+                METRICS.write(self._configuration)
+
+        self._logger.info("Add %d new schedules and change %d schedules is finish. (Total notice of employment: %d)",
+                          len(_added), len(_changes), len(_scraped))
+        return _added
+
+    def push(self, notice_list, reconcile=None) -> list:
+        """Add the given notices, e.g. the output of the 'scrape' command, to the calendar.
+
+        The watermark and the journal are not used.
+
+        :param list notice_list: Notice list.
+        :param bool reconcile: Search the notices not in the sync index in the app. (default=None, 'reconcile' option)
+        :return: Added notice list.
+        :rtype: list
+        """
+        METRICS.reset()
+        enricher = DetailEnricher(self._configuration, self._logger)
+        sink = self._open_sink()
+        _changes = []
+
+        try:
+            if reconcile is None:
+                reconcile = sink.should_reconcile()
+            self._arrange(sink, enricher, None, notice_list, reconcile, _changes)
+
+            _added = sink.join()
+            METRICS.count("notices", len(_added), state="added")
+            if _changes:
+                for _kind, _count in count_operations(sink.apply_changes(_changes)).items():
+                    METRICS.count("notices", _count, state=_kind)
+        finally:
+            sink.finalize()
+            enricher.finalize()
+            METRICS.write(self._configuration)
+
+        self._logger.info("Add %d new schedules and change %d schedules is finish.", len(_added), len(_changes))
+        return _added
+
+    def plan(self, notice_list) -> dict:
+        """Get the operations of the notices without opening the calendar sink, e.g. for a dry run.
+
+        The new notices are decided by the sync index only ('caldav' reads its collection), so no device is needed.
+        The update and delete operations are planned only with the 'track_changes' option.
+
+        :param list notice_list: Notice list.
+        :return: {'add': notice list, 'update': operation list, 'delete': operation list}
+        :rtype: dict
+        """
+        sink = create_sink(self._configuration, self._logger, self._calendar_factory)
+        try:
+            _operations = sink.diff(notice_list, self._closed_status if self._track_changes else ())
+            _adds = [_operation.notice for _operation in _operations if _operation.kind == ADD]
+            if isinstance(sink, CalDAVSink):
+                _adds = sink.arrange_schedule(_adds)
+        finally:
+            sink.finalize()
+
+        return {
+            ADD: _adds,
+            UPDATE: [_operation for _operation in _operations if self._track_changes and _operation.kind == UPDATE],
+            DELETE: [_operation for _operation in _operations if self._track_changes and _operation.kind == DELETE]
+        }
+
+    def _arrange(self, sink, enricher, journal, notice_list, reconcile, changes) -> None:
+        """Deduplicate the notices and queue the new ones to the calendar sink.
+
+        With the 'track_changes' option, the update and delete operations are collected into the changes, and only
+        the notices to add are deduplicated.
+
+        :param CalendarSink sink: Calendar sink.
+        :param DetailEnricher enricher: Detail enricher. Only the new notices need the detail pages.
+        :param NoticeJournal journal: Journal. (None if it is disabled.)
+        :param list notice_list: Notice list.
+        :param bool reconcile: Search the notices not in the sync index in the app.
+        :param list changes: Update and delete operation list.
+        """
+        if not notice_list:
+            return
+
+        _adds = notice_list
+        if self._track_changes:
+            _operations = sink.diff(notice_list, self._closed_status)
+            changes.extend(_operation for _operation in _operations if _operation.kind != ADD)
+            _adds = [_operation.notice for _operation in _operations if _operation.kind == ADD]
+
+        _new = sink.arrange_schedule(_adds, reconcile=reconcile) if _adds else []
+        if journal is not None:
+            journal.record_deduped(notice_list, _new)
+        for _noti in enricher.enrich(_new):
+            sink.submit(_noti)
+
+    def _open_journal(self):
+        """Create the journal of the 'journal' path option.
+
+        :return: Journal. (None if the path is an empty string.)
+        :rtype: NoticeJournal
+        """
+        _path = self._configuration.get("journal", {}).get("path", "./state/journal.jsonl")
+        return NoticeJournal(_path) if _path else None
+
+    def _open_sink(self):
+        """Open the calendar sink of the 'calendar_sink' type option.
+
+        :return: Calendar sink.
+        :rtype: CalendarSink
+        """
+        sink = create_sink(self._configuration, self._logger, self._calendar_factory)
+        sink.open()
+        return sink
+
+    def _scrape(self, job_scraping, full, pages, stop) -> None:
+        """Put the parsed data list of each page into the queue, then the end mark.
+
+        :param JobAlioScraping job_scraping: Web scraping object.
+        :param bool full: Walk every page of the period regardless of the watermark.
+        :param queue.Queue pages: Page queue.
+        :param threading.Event stop: Stop request from the consumer.
+        """
+        try:
+            for _page in job_scraping.iter_pages(full):
+                if stop.is_set():
+                    break
+                pages.put(_page)
+        except Exception as e:
+            self._logger.exception("Web scraping is failed.")
+            pages.put(e)
+        finally:
+            pages.put(_END)
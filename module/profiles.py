@@ -0,0 +1,133 @@
+"""Route the notices of one shared crawl to the filter profiles.
+
+A profile has the same filters as the 'web_scraping' section and the target 'calendar'. The site is requested once
+with the union of the filters of every profile, and each row is routed to the profiles locally.
+
+The location and the work type are shown in the result rows, so they are matched by their Korean names. The detail
+code, the career and the education are not shown, so the idx set of a profile for such a filter is learned from a
+tag crawl which requests the codes of the profile. The profiles with the same codes share a tag crawl, and no tag
+crawl is needed when the union query already has exactly the codes of the profile.
+"""
+
+import re
+
+from module.code_table import LOCATION_INFO, WORK_TYPE_INFO
+from module.notice import Notice
+
+FILTER_KEYS = ("detail_code", "location", "work_type", "career", "education")
+TEXT_KEYS = {"location": LOCATION_INFO, "work_type": WORK_TYPE_INFO}
+
+
+def get_union_filters(profiles) -> dict:
+    """Return the filters which select every notice of any profile.
+
+    A filter is kept only if every profile has it, because a profile without the filter needs every value.
+
+    :param list profiles: Profile list.
+    :return: Filters.
+    :rtype: dict
+    """
+    _filters = {}
+    for _key in FILTER_KEYS:
+        if all(_key in _profile for _profile in profiles):
+            _filters[_key] = sorted({_code for _profile in profiles for _code in _profile[_key]})
+    return _filters
+
+
+class ProfileRouter:
+    """Route the notices to the profiles which match them."""
+
+    def __init__(self, profiles):
+        """Initialize the object.
+
+        :param list profiles: Profile list which has 'name', 'calendar' and the filters.
+        """
+        self._profiles = profiles
+        self.union_filters = get_union_filters(profiles)
+        self._tags = {}
+        # A cell may list several values without a separator, and one name may be a part of another, e.g. '정규직' of
+        # '비정규직'. The longer names come first in the alternation so that a cell is split into whole names.
+        self._patterns = {}
+        for _key, _names in TEXT_KEYS.items():
+            _values = set(_names.values())
+            _values.update(_names.get(_code, _code) for _profile in profiles for _code in _profile.get(_key, ()))
+            _values = sorted(_values, key=len, reverse=True)
+            self._patterns[_key] = re.compile("|".join(re.escape(_value) for _value in _values))
+
+    def get_tags(self) -> list:
+        """Return the filters which need a tag crawl.
+
+        :return: (key, sorted codes tuple) list.
+        :rtype: list
+        """
+        return sorted({_tag for _profile in self._profiles for _tag in self._get_tags(_profile)})
+
+    def get_tag_filters(self, tag) -> dict:
+        """Return the filters of the tag crawl. The other filters of the union query narrow it down.
+
+        :param tuple tag: (key, sorted codes tuple).
+        :return: Filters.
+        :rtype: dict
+        """
+        return {**self.union_filters, tag[0]: list(tag[1])}
+
+    def add_tag(self, tag, notice_list) -> None:
+        """Remember the notices of the tag crawl.
+
+        :param tuple tag: (key, sorted codes tuple).
+        :param list notice_list: Notice list of the tag crawl.
+        """
+        self._tags[tag] = {str(_noti["idx"]) for _noti in notice_list}
+
+    def route(self, notice_list) -> list:
+        """Route the notices to the profiles.
+
+        A notice is copied with the 'calendar' of each matched profile. A notice which matches no profile is dropped.
+
+        :param list notice_list: Notice list of the union query.
+        :return: Routed notice list.
+        :rtype: list
+        """
+        _routed = []
+        for _noti in notice_list:
+            _calendars = []
+            for _profile in self._profiles:
+                if (_profile["calendar"] not in _calendars) and self._match(_profile, _noti):
+                    _calendars.append(_profile["calendar"])
+            _routed.extend(Notice.from_dict(_noti).replace(calendar=_calendar) for _calendar in _calendars)
+        return _routed
+
+    def _match(self, profile, notice) -> bool:
+        """Return whether the notice matches every filter of the profile.
+
+        :param dict profile: Profile.
+        :param dict notice: Notice.
+        :return: True if the notice matches.
+        :rtype: bool
+        """
+        for _key, _names in TEXT_KEYS.items():
+            if _key not in profile:
+                continue
+            _values = set(self._patterns[_key].findall(notice[_key]))
+            if not any(_names.get(_code, _code) in _values for _code in profile[_key]):
+                return False
+
+        for _tag in self._get_tags(profile):
+            if str(notice["idx"]) not in self._tags.get(_tag, ()):
+                return False
+        return True
+
+    def _get_tags(self, profile) -> list:
+        """Return the (key, codes) of the filters of the profile which the union query does not answer.
+
+        :param dict profile: Profile.
+        :return: (key, sorted codes tuple) list.
+        :rtype: list
+        """
+        _tags = []
+        for _key in FILTER_KEYS:
+            if (_key in TEXT_KEYS) or (_key not in profile):
+                continue
+            if sorted(set(profile[_key])) != self.union_filters.get(_key):
+                _tags.append((_key, tuple(sorted(set(profile[_key])))))
+        return _tags
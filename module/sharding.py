@@ -0,0 +1,292 @@
+"""Spread the schedule insertion over several devices."""
+
+import json
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union
+
+from miraelogger import Logger
+
+from module import exception
+from module.calendar_sink import CalendarSink
+from module.diff import CLOSED_STATUS, Operation, diff_notices
+from module.journal import FAILED, INSERTED
+from module.sync_state import SyncIndex
+
+_STOP = object()
+
+
+class DevicePool(CalendarSink):
+    """Worker pool which adds the schedules with one calendar controller per device, sharing one sync index."""
+
+    def __init__(self, configuration: Union[str, dict], logger=None, sync_index=None, calendar_factory=None):
+        """Initialize the object.
+
+        :param str/dict configuration: Configuration path or Configuration dictionary.
+        :param logger logger: Logger.
+        :param SyncIndex sync_index: Shared index of the created schedules. (default=None, open the configured 'sync_index')
+        :param callable calendar_factory: Function which gets (device, sync_index) and returns a calendar controller.
+            (default=None, NaverCalendar)
+        """
+        super().__init__()
+        if logger is not None:
+            self._logger = logger
+        else:
+            self._logger = Logger(log_name=__name__, stream_log_level=logging.DEBUG).logger
+
+        if isinstance(configuration, str) and os.path.exists(configuration) and ('.json' in configuration):
+            with open(configuration, encoding="utf-8") as _f:
+                self._configuration = json.load(_f)
+        elif isinstance(configuration, dict):
+            self._configuration = configuration
+        else:
+            raise TypeError
+
+        _mobile = self._configuration["mobile"]
+        self._devices = _mobile.get("devices") or [{"capabilities": _mobile["capabilities"]}]
+
+        self._own_sync_index = sync_index is None
+        if sync_index is not None:
+            self._sync_index = sync_index
+        else:
+            self._sync_index = SyncIndex(_mobile.get("sync_index", "./state/sync_index.sqlite3"))
+
+        if calendar_factory is not None:
+            self._calendar_factory = calendar_factory
+        else:
+            self._calendar_factory = self._create_naver_calendar
+
+        self._calendars = []
+        self._calendar_locks = []
+        self._workers = []
+        self._notices = queue.Queue()
+        self._lock = threading.Lock()
+        self._added = []
+        self._changed = []
+        self._failed = []
+
+        self._logger.debug("DevicePool initialize finish. (Devices: %d)", len(self._devices))
+
+    def open(self, foreground=True) -> None:
+        """Connect every device at the same time and open the calendar.
+
+        If any device could not be opened, the calendars of the other devices are finalized before the error is raised.
+
+        :param bool foreground: Bring the calendar to the foreground. (default=True)
+        """
+        with ThreadPoolExecutor(max_workers=len(self._devices)) as _executor:
+            _futures = [_executor.submit(self._open_calendar, _device, foreground) for _device in self._devices]
+
+        _calendars = [_future.result() for _future in _futures if _future.exception() is None]
+        _errors = [_future.exception() for _future in _futures if _future.exception() is not None]
+        if _errors:
+            for _calendar in _calendars:
+                self._finalize_calendar(_calendar)
+            raise _errors[0]
+
+        self._calendars = _calendars
+        self._calendar_locks = [threading.Lock() for _ in self._calendars]
+
+        for _calendar, _calendar_lock in zip(self._calendars, self._calendar_locks):
+            _worker = threading.Thread(target=self._work, args=(_calendar, _calendar_lock), daemon=True)
+            _worker.start()
+            self._workers.append(_worker)
+
+    def prepare(self) -> None:
+        """Reconnect the stale sessions and bring the calendar to the foreground on every device."""
+        for _calendar, _calendar_lock in zip(self._calendars, self._calendar_locks):
+            with _calendar_lock:
+                _calendar.prepare()
+
+    def should_reconcile(self) -> bool:
+        """Return whether the notices not in the sync index should be searched in the app.
+
+        :return: True if the first device should reconcile.
+        :rtype: bool
+        """
+        return self._calendars[0].should_reconcile()
+
+    def arrange_schedule(self, notice_list, reconcile=None) -> list:
+        """Check the old notice with the first device and get the new notice list.
+
+        The first device is locked against its worker while it searches.
+
+        :param list notice_list: Notice list.
+        :param bool reconcile: Search the notices not in the index in the app. (default=None, 'reconcile' option)
+        :return: New notice list.
+        :rtype: list.
+        """
+        with self._calendar_locks[0]:
+            return self._calendars[0].arrange_schedule(notice_list, reconcile=reconcile)
+
+    def diff(self, notice_list, closed_status=CLOSED_STATUS) -> list:
+        """Get the add, update and delete operations of the notices from the shared sync index.
+
+        :param list notice_list: Notice list.
+        :param tuple closed_status: Status texts of the closed notice. (default=('마감',))
+        :return: Operation list.
+        :rtype: list
+        """
+        return diff_notices(notice_list, self._sync_index, closed_status)
+
+    def apply_changes(self, operations) -> list:
+        """Apply the update and delete operations with every device.
+
+        :param list operations: Operation list.
+        :return: Applied operation list.
+        :rtype: list
+        :raise AppiumException: if any operation could not be applied.
+        """
+        for _operation in operations:
+            self._notices.put(_operation)
+        self._notices.join()
+
+        with self._lock:
+            _changed, self._changed = self._changed, []
+            _failed, self._failed = self._failed, []
+
+        if _failed:
+            raise exception.AppiumException(f"Could not change {len(_failed)} schedules. ({', '.join(_operation.notice['title'] for _operation in _failed)})")
+        return _changed
+
+    def add_schedules(self, notice_list) -> list:
+        """Add the schedules with every device.
+
+        :param list notice_list: Notice list.
+        :return: Added notice list.
+        :rtype: list
+        :raise AppiumException: if any notice could not be added.
+        """
+        for _noti in notice_list:
+            self.submit(_noti)
+        return self.join()
+
+    def submit(self, notice) -> None:
+        """Queue the notice for the next free device.
+
+        :param dict notice: Notice.
+        """
+        self._notices.put(notice)
+
+    def join(self) -> list:
+        """Wait until every queued notice is processed.
+
+        :return: Added notice list.
+        :rtype: list
+        :raise AppiumException: if any notice could not be added.
+        """
+        self._notices.join()
+
+        with self._lock:
+            _added, self._added = self._added, []
+            _failed, self._failed = self._failed, []
+
+        if _failed:
+            raise exception.AppiumException(f"Could not add {len(_failed)} schedules. ({', '.join(_noti['title'] for _noti in _failed)})")
+        return _added
+
+    def finalize(self) -> None:
+        """Stop the workers and finalize every device."""
+        for _ in self._workers:
+            self._notices.put(_STOP)
+        for _worker in self._workers:
+            _worker.join()
+
+        for _calendar in self._calendars:
+            _calendar.finalize()
+        if self._own_sync_index:
+            self._sync_index.close()
+
+    def _work(self, calendar, calendar_lock) -> None:
+        """Add the queued notices, or apply the queued operations, with the calendar until the stop mark.
+
+        :param calendar: Calendar controller.
+        :param threading.Lock calendar_lock: Lock of the calendar controller.
+        """
+        while (_noti := self._notices.get()) is not _STOP:
+            try:
+                if isinstance(_noti, Operation):
+                    self._apply(calendar, calendar_lock, _noti)
+                    continue
+
+                if not self._sync_index.claim(_noti):
+                    self._logger.debug("%s is already added by another device.", _noti['title'], extra={"idx": _noti["idx"]})
+                    continue
+
+                try:
+                    with calendar_lock:
+                        calendar.add_schedule(_noti)
+                except Exception as e:
+                    self._sync_index.release(_noti)
+                    self._logger.exception("Could not add the %s.", _noti['title'], extra={"idx": _noti["idx"]})
+                    self._record(_noti, FAILED, repr(e))
+                    with self._lock:
+                        self._failed.append(_noti)
+                else:
+                    self._record(_noti, INSERTED)
+                    with self._lock:
+                        self._added.append(_noti)
+            finally:
+                self._notices.task_done()
+        self._notices.task_done()
+
+    def _apply(self, calendar, calendar_lock, operation) -> None:
+        """Apply the operation with the calendar.
+
+        :param calendar: Calendar controller.
+        :param threading.Lock calendar_lock: Lock of the calendar controller.
+        :param Operation operation: Update or delete operation.
+        """
+        try:
+            with calendar_lock:
+                calendar.apply_change(operation)
+        except Exception:
+            self._logger.exception(
+                "Could not %s the %s.", operation.kind, operation.notice['title'], extra={"idx": operation.notice["idx"]}
+            )
+            with self._lock:
+                self._failed.append(operation)
+        else:
+            with self._lock:
+                self._changed.append(operation)
+
+    def _open_calendar(self, device, foreground=True):
+        """Create the calendar controller of the device and open the calendar.
+
+        :param dict device: Device information.
+        :param bool foreground: Bring the calendar to the foreground. (default=True)
+        :return: Calendar controller.
+        """
+        _calendar = self._calendar_factory(device, self._sync_index)
+        if foreground:
+            try:
+                _calendar.open()
+            except Exception:
+                self._finalize_calendar(_calendar)
+                raise
+        return _calendar
+
+    def _finalize_calendar(self, calendar) -> None:
+        """Finalize the calendar controller of a device which could not join the pool. Its error is only logged.
+
+        :param calendar: Calendar controller.
+        """
+        try:
+            calendar.finalize()
+        except Exception:
+            self._logger.exception("Could not finalize the calendar of a device.")
+
+    def _create_naver_calendar(self, device, sync_index):
+        """Create the Naver calendar controller of the device.
+
+        :param dict device: Device information.
+        :param SyncIndex sync_index: Shared index of the created schedules.
+        :return: Naver calendar controller.
+        :rtype: NaverCalendar
+        """
+        from module.mobile_automation import NaverCalendar
+
+        return NaverCalendar(self._configuration, self._logger, sync_index=sync_index, device=device)
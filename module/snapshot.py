@@ -0,0 +1,98 @@
+"""Read the UI hierarchy of the mobile app from a single page source dump."""
+
+import re
+
+try:
+    from lxml import etree as ElementTree
+except ImportError:
+    from xml.etree import ElementTree
+
+_BOUNDS_PATTERN = re.compile(r"\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]")
+
+
+class HierarchySnapshot:
+    """Snapshot of the UI hierarchy which answers several element queries without a round trip to the device."""
+
+    def __init__(self, page_source):
+        """Initialize the object.
+
+        :param str page_source: Page source XML of the uiautomator2 driver.
+        """
+        self.page_source = page_source
+        self.size = len(page_source)
+        self._root = ElementTree.fromstring(page_source.encode("utf-8"))
+        self._nodes = {}
+
+        for _node in self._root.iter():
+            _resource_id = _node.get("resource-id", "")
+            if "id/" in _resource_id:
+                self._nodes.setdefault(_resource_id.split("id/")[-1], []).append(_node)
+
+    def exists(self, name, text=None) -> bool:
+        """Return whether the element exists.
+
+        :param str name: Resource id name without the package. (e.g. 'allday')
+        :param str text: Exact text of the element. (default=None, any text)
+        :return: True if the element exists.
+        :rtype: bool
+        """
+        return self._get_node(name, text) is not None
+
+    def text(self, name) -> str:
+        """Return the text of the element.
+
+        :param str name: Resource id name without the package.
+        :return: Text. (None if the element does not exist.)
+        :rtype: str
+        """
+        _node = self._get_node(name)
+        return None if _node is None else _node.get("text", "")
+
+    def selected(self, name) -> bool:
+        """Return the selected state of the element.
+
+        :param str name: Resource id name without the package.
+        :return: True if the element is selected.
+        :rtype: bool
+        """
+        _node = self._get_node(name)
+        return (_node is not None) and (_node.get("selected") == "true")
+
+    def bounds(self, name, text=None) -> tuple:
+        """Return the bounds of the element.
+
+        :param str name: Resource id name without the package.
+        :param str text: Exact text of the element. (default=None, any text)
+        :return: (left, top, right, bottom). (None if the element does not exist.)
+        :rtype: tuple
+        """
+        _node = self._get_node(name, text)
+        if _node is None:
+            return None
+        _match = _BOUNDS_PATTERN.match(_node.get("bounds", ""))
+        return None if _match is None else tuple(int(i) for i in _match.groups())
+
+    def center(self, name, text=None) -> tuple:
+        """Return the center position of the element.
+
+        :param str name: Resource id name without the package.
+        :param str text: Exact text of the element. (default=None, any text)
+        :return: (x, y). (None if the element does not exist.)
+        :rtype: tuple
+        """
+        _bounds = self.bounds(name, text)
+        if _bounds is None:
+            return None
+        return (_bounds[0] + _bounds[2]) // 2, (_bounds[1] + _bounds[3]) // 2
+
+    def _get_node(self, name, text=None):
+        """Return the first node of the resource id name.
+
+        :param str name: Resource id name without the package.
+        :param str text: Exact text of the node. (default=None, any text)
+        :return: Node. (None if the node does not exist.)
+        """
+        for _node in self._nodes.get(name, []):
+            if (text is None) or (_node.get("text") == text):
+                return _node
+        return None
@@ -0,0 +1,213 @@
+"""Keep the synchronization state of the Job-Alio notices."""
+
+import datetime
+import json
+import os
+import sqlite3
+import threading
+
+_CREATE_SCHEDULE = (
+    "CREATE TABLE IF NOT EXISTS schedule ("
+    "idx TEXT NOT NULL, "
+    "register_date TEXT NOT NULL, "
+    "title TEXT NOT NULL, "
+    "deadline_date TEXT, "
+    "status TEXT, "
+    "calendar TEXT, "
+    "created_at TEXT NOT NULL, "
+    "route TEXT NOT NULL DEFAULT '', "
+    "PRIMARY KEY (idx, register_date, route))"
+)
+
+
+class Watermark:
+    """Highest notice already processed, stored in a small local state file."""
+
+    def __init__(self, path):
+        """Initialize the object.
+
+        :param str path: State file path.
+        """
+        self._path = path
+        self.idx = None
+        self.register_date = None
+
+        if os.path.exists(self._path):
+            with open(self._path, encoding="utf-8") as _f:
+                _state = json.load(_f)
+            self.idx = _state.get("idx")
+            self.register_date = _state.get("register_date")
+
+    def is_empty(self) -> bool:
+        """Return whether any notice is processed before.
+
+        :return: True if there is no watermark.
+        :rtype: bool
+        """
+        return self.idx is None or self.register_date is None
+
+    def is_seen(self, notice) -> bool:
+        """Return whether the notice is already processed.
+
+        :param dict notice: Notice.
+        :return: True if the notice is not newer than the watermark.
+        :rtype: bool
+        """
+        if self.is_empty():
+            return False
+        return (notice["rigister_date"], int(notice["idx"])) <= (self.register_date, int(self.idx))
+
+    def update(self, notice_list) -> None:
+        """Move the watermark to the newest notice of the list.
+
+        :param list notice_list: Processed notice list.
+        """
+        for _noti in notice_list:
+            if self.is_empty() or not self.is_seen(_noti):
+                self.idx = int(_noti["idx"])
+                self.register_date = _noti["rigister_date"]
+
+    def save(self) -> None:
+        """Save the watermark to the state file."""
+        if os.path.dirname(self._path):
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+
+        _temp_path = f"{self._path}.tmp"
+        with open(_temp_path, "w", encoding="utf-8") as _f:
+            json.dump({"idx": self.idx, "register_date": self.register_date}, _f, ensure_ascii=False)
+        os.replace(_temp_path, self._path)
+
+
+class SyncIndex:
+    """On-disk index of the schedules created in the calendar, keyed by the Job-Alio idx and register date.
+
+    A notice routed by the filter profiles is also keyed by its target 'calendar', because the same notice can be
+    added to several calendars. The route of the other notices is an empty string.
+    """
+
+    def __init__(self, path):
+        """Initialize the object.
+
+        :param str path: SQLite database path.
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._migrate()
+        self._connection.execute(_CREATE_SCHEDULE)
+        self._connection.commit()
+
+        self._records = {}
+        for _row in self._connection.execute(
+                "SELECT idx, register_date, route, title, deadline_date, status, calendar FROM schedule"):
+            self._records[_row[:3]] = {"title": _row[3], "deadline_date": _row[4], "status": _row[5], "calendar": _row[6]}
+        self._claimed = set()
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, notice):
+        return self._get_key(notice) in self._records
+
+    def get(self, notice):
+        """Return the recorded state of the schedule of the notice.
+
+        :param dict notice: Notice.
+        :return: Record which has 'title', 'deadline_date', 'status' and 'calendar'. (None if it is not recorded.)
+        :rtype: dict/None
+        """
+        return self._records.get(self._get_key(notice))
+
+    def get_records(self) -> list:
+        """Return every recorded state with its key.
+
+        :return: Record list which also has 'idx', 'rigister_date' and 'route'.
+        :rtype: list
+        """
+        with self._lock:
+            return [
+                {"idx": _key[0], "rigister_date": _key[1], "route": _key[2], **_record}
+                for _key, _record in self._records.items()
+            ]
+
+    @staticmethod
+    def _get_key(notice) -> tuple:
+        """Return the key of the notice.
+
+        :param dict notice: Notice.
+        :return: (idx, register date, route)
+        :rtype: tuple
+        """
+        return str(notice["idx"]), notice["rigister_date"], notice.get("calendar", "")
+
+    def _migrate(self) -> None:
+        """Add the route to the primary key of the index made before the filter profiles."""
+        _columns = [_row[1] for _row in self._connection.execute("PRAGMA table_info(schedule)")]
+        if (not _columns) or ("route" in _columns):
+            return
+
+        self._connection.execute("ALTER TABLE schedule RENAME TO schedule_old")
+        self._connection.execute(_CREATE_SCHEDULE)
+        self._connection.execute(f"INSERT INTO schedule ({', '.join(_columns)}) SELECT * FROM schedule_old")
+        self._connection.execute("DROP TABLE schedule_old")
+
+    def claim(self, notice) -> bool:
+        """Reserve the notice for one worker, so the same schedule is not added twice by concurrent workers.
+
+        :param dict notice: Notice.
+        :return: True if the notice is neither recorded nor reserved by another worker.
+        :rtype: bool
+        """
+        _key = self._get_key(notice)
+        with self._lock:
+            if (_key in self._records) or (_key in self._claimed):
+                return False
+            self._claimed.add(_key)
+            return True
+
+    def release(self, notice) -> None:
+        """Cancel the reservation of the notice.
+
+        :param dict notice: Notice.
+        """
+        with self._lock:
+            self._claimed.discard(self._get_key(notice))
+
+    def record(self, notice, calendar) -> None:
+        """Record the schedule created for the notice.
+
+        :param dict notice: Notice.
+        :param str calendar: Calendar name.
+        """
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO schedule VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (str(notice["idx"]), notice["rigister_date"], notice["title"], notice.get("deadline_date"),
+                 notice.get("status"), calendar, datetime.datetime.now().isoformat(timespec="seconds"),
+                 notice.get("calendar", ""))
+            )
+            self._connection.commit()
+            self._records[self._get_key(notice)] = {
+                "title": notice["title"], "deadline_date": notice.get("deadline_date"), "status": notice.get("status"),
+                "calendar": calendar
+            }
+            self._claimed.discard(self._get_key(notice))
+
+    def delete(self, notice) -> None:
+        """Delete the record of the schedule removed from the calendar.
+
+        :param dict notice: Notice.
+        """
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM schedule WHERE idx = ? AND register_date = ? AND route = ?", self._get_key(notice)
+            )
+            self._connection.commit()
+            self._records.pop(self._get_key(notice), None)
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
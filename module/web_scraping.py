@@ -4,14 +4,20 @@ import datetime
 import json
 import logging
 import os
-import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Union
 
 import requests
-from bs4 import BeautifulSoup
 from miraelogger import Logger
 
 from module import exception
+from module.code_table import CAREER_INFO, DETAIL_CODE_INFO, EDUCATION_INFO, LOCATION_INFO, WORK_TYPE_INFO
+from module.http_client import HttpClient
+from module.instrumentation import METRICS, staged
+from module.parser import create_parser
+from module.profiles import FILTER_KEYS, ProfileRouter
+from module.sync_state import Watermark
 
 
 class JobAlioScraping:
@@ -23,7 +29,6 @@ class JobAlioScraping:
         :param str/dict configuration: Configuration path or Configuration dictionary.
         :param logger logger: Logger.
         """
-        self._url = "https://job.alio.go.kr/recruit.do"
         self._configuration = None
         self._params = {
             "eduType": "multi",
@@ -43,90 +48,295 @@ class JobAlioScraping:
         else:
             raise TypeError
 
+        self._url = self._configuration.get("url", "https://job.alio.go.kr/recruit.do")
+        self._concurrency = int(self._configuration.get("concurrency", 4))
+        self._slow_threshold = float(self._configuration.get("slow_threshold", 3.0))
+        self._latency = {}
+        self._watermark = Watermark(self._configuration.get("state_file", "./state/watermark.json"))
+        self._reached_watermark = False
+        self.complete = False
+        self._parser = create_parser(self._configuration.get("parser", "auto"))
+        self._router = ProfileRouter(self._configuration["profiles"]) if self._configuration.get("profiles") else None
+
+        self._client = HttpClient(self._configuration.get("http"), self._concurrency, self._logger)
+
         self._logger.debug("JobAlioScraping initialize finish.")
 
-    def _create_params(self) -> None:
-        """Create params for requests."""
-        current_date = datetime.datetime.now()
-        start_date = current_date - datetime.timedelta(days=30)
+    def _create_params(self, start_date=None, end_date=None, filters=None) -> dict:
+        """Create params for requests.
+
+        :param datetime.date start_date: First register date of the period. (default=None, 30 days before the end date)
+        :param datetime.date end_date: Last register date of the period. (default=None, today)
+        :param dict filters: Filters. (default=None, the union filters of the profiles or the configured filters)
+        :return: Copy of the created params.
+        :rtype: dict
+        """
+        current_date = end_date or datetime.datetime.now()
+        start_date = start_date or (current_date - datetime.timedelta(days=30))
 
         self._params["s_date"] = start_date.strftime("%Y.%m.%d")
         self._params["e_date"] = current_date.strftime("%Y.%m.%d")
 
-        if "detail_code" in self._configuration.keys():
-            self._params["detail_code"] = self._configuration["detail_code"]
-            self._logger.debug(f"'채용분야' is selected. [{self.__get_detail_code_info(self._configuration['detail_code'])}]")
+        if filters is None:
+            filters = self._router.union_filters if self._router is not None else self._configuration
+        for _key in FILTER_KEYS:
+            self._params.pop(_key, None)
+
+        if "detail_code" in filters.keys():
+            self._params["detail_code"] = filters["detail_code"]
+            self._logger.debug("'채용분야' is selected. [%s]", self.__get_detail_code_info(filters['detail_code']))
+
+        if "location" in filters.keys():
+            self._params["location"] = filters["location"]
+            self._logger.debug("'위치' is selected. [%s]", self.__get_location_info(filters['location']))
 
-        if "location" in self._configuration.keys():
-            self._params["location"] = self._configuration["location"]
-            self._logger.debug(f"'위치' is selected. [{self.__get_location_info(self._configuration['location'])}]")
+        if "work_type" in filters.keys():
+            self._params["work_type"] = filters["work_type"]
+            self._logger.debug("'고용형태' is selected. [%s]", self.__get_work_type_info(filters['work_type']))
 
-        if "work_type" in self._configuration.keys():
-            self._params["work_type"] = self._configuration["work_type"]
-            self._logger.debug(f"'고용형태' is selected. [{self.__get_work_type_info(self._configuration['work_type'])}]")
+        if "career" in filters.keys():
+            self._params["career"] = filters["career"]
+            self._logger.debug("'채용 구분' is selected. [%s]", self.__get_career_info(filters['career']))
 
-        if "career" in self._configuration.keys():
-            self._params["career"] = self._configuration["career"]
-            self._logger.debug(f"'채용 구분' is selected. [{self.__get_career_info(self._configuration['career'])}]")
+        if "education" in filters.keys():
+            self._params["education"] = filters["education"]
+            self._logger.debug("'학력 정보' is selected. [%s]", self.__get_education_info(filters['education']))
 
-        if "education" in self._configuration.keys():
-            self._params["education"] = self._configuration["education"]
-            self._logger.debug(f"'학력 정보' is selected. [{self.__get_education_info(self._configuration['education'])}]")
+        return dict(self._params)
 
-    def start(self):
+    def start(self, full=False):
         """Get all page information.
 
+        When a page fails after the retries, the notices of the pages got before are kept and 'complete' is False.
+
+        :param bool full: Walk every page of the period regardless of the watermark. (default=False)
         :return: Parsed data list.
         :rtype: list
-        :raise RequestException: if request is not normal.
+        :raise RequestException: if the first page could not be got.
         """
+        _parsing = []
+        try:
+            for _page in self.iter_pages(full):
+                _parsing.extend(_page)
+        except exception.RequestException:
+            if not _parsing:
+                raise
+            self._logger.exception("Web scraping is stopped. The %d notices got before are kept.", len(_parsing))
+
+        self._logger.info("Web scraping is finish. (Total notice of employment: %d)", len(_parsing))
+        return _parsing
 
-        self._create_params()
+    def iter_pages(self, full=False):
+        """Yield the parsed data list of each page in the page order.
 
-        _parsing = []
-        _pageNo = 1
+        With the 'profiles' option, the union of the filters of every profile is requested once and each notice is
+        copied with the 'calendar' of every profile it matches. The tag crawls of the filters which the result rows
+        do not show are requested before.
+
+        'complete' is True only after the last page is got, and the per-page latency is logged at the end.
+
+        :param bool full: Walk every page of the period regardless of the watermark. (default=False)
+        :return: Generator of the parsed data list of a page. (Pages without new notice are not yielded.)
+        :rtype: generator
+        :raise RequestException: if request is not normal.
+        """
+        self.complete = False
+        try:
+            if self._router is None:
+                yield from self._iter_query(full)
+            else:
+                for _tag in self._router.get_tags():
+                    self._logger.debug("Tag crawl of %s %s", _tag[0], list(_tag[1]))
+                    _tagged = [_noti for _page in self._iter_query(full, self._router.get_tag_filters(_tag)) for _noti in _page]
+                    self._router.add_tag(_tag, _tagged)
+
+                for _page in self._iter_query(full):
+                    _routed = self._router.route(_page)
+                    self._logger.debug("%d schedules are routed from %d notices.", len(_routed), len(_page))
+                    if _routed:
+                        yield _routed
+            self.complete = True
+        finally:
+            _percentiles = self._client.get_percentiles()
+            if _percentiles:
+                self._logger.info("Page latency: %s", ", ".join(f"{_k} {_v:.3f} sec" for _k, _v in _percentiles.items()))
+
+    def _iter_query(self, full=False, filters=None):
+        """Yield the parsed data list of each page of one query in the page order.
+
+        The first page is requested alone to learn the last page number. The remaining pages are requested
+        concurrently in batches when 'concurrency' is bigger than 1, otherwise one after another.
+        Unless 'full' is set, paging stops at the page which has a notice already processed before.
+
+        :param bool full: Walk every page of the period regardless of the watermark. (default=False)
+        :param dict filters: Filters. (default=None, the union filters of the profiles or the configured filters)
+        :return: Generator of the parsed data list of a page. (Pages without new notice are not yielded.)
+        :rtype: generator
+        :raise RequestException: if request is not normal.
+        """
+        self._create_params(filters=filters)
+        self._reached_watermark = False
+        if full or self._watermark.is_empty():
+            self._logger.debug("Get every page of the period.")
+        else:
+            self._logger.debug("Get pages until the watermark. (idx: %s, date: %s)", self._watermark.idx, self._watermark.register_date)
 
         self._logger.info("Web scraping start...")
+        _first_page = self._get_page(1)
+        _parsing = self._filter_seen(self._parse_page(_first_page), full)
+        if not _parsing:
+            return
+        yield _parsing
+
+        if self._reached_watermark:
+            return
+
+        _last_page_no = self._get_last_page_no(_first_page)
+        if (_last_page_no is None) or (self._concurrency <= 1):
+            self._logger.debug("Get the remaining pages sequentially.")
+            yield from self._iter_sequential(2, full)
+        else:
+            self._logger.debug("Get the remaining pages concurrently. (Last page: %d)", _last_page_no)
+            yield from self._iter_concurrent(2, _last_page_no, full)
+            # The paging area may show only a part of the pages, so confirm that the next page is empty.
+            if not self._reached_watermark:
+                yield from self._iter_sequential(_last_page_no + 1, full)
+
+    def _iter_sequential(self, page_no, full=False):
+        """Get the pages one after another until an empty page or the watermark is found.
+
+        :param int page_no: First page number.
+        :param bool full: Ignore the watermark. (default=False)
+        :return: Generator of the parsed data list of a page.
+        :rtype: generator
+        """
         while True:
-            self._params["pageNo"] = _pageNo
-            self._logger.debug(f"Get ({_pageNo}) th page information...")
-            response = requests.get(self._url, params=self._params)
-
-            if response.status_code == 200:
-                my_soup = BeautifulSoup(response.content, "html.parser")
-                selected_list = my_soup.select("#frm > table > tbody > tr")
-
-                if not selected_list:
-                    break
-
-                for _row in selected_list:
-                    _column = _row.select("td")
-                    __idx = re.findall(r'\d+', _column[2].find('a').get('href').split('idx=')[-1])[0]
-                    _link = f"https://job.alio.go.kr/recruitview.do?idx={__idx}"
-                    _mobile_link = f"https://job.alio.go.kr/mobile2021/recruit/recruitView.do?idx={__idx}&pageNo=1&apba_type=&search_yn=&title=&org_type=&org_name=&order=REG_DATE&ing="
-
-                    _title = f"[{_column[3].text.strip()}] {_column[2].text.strip()}".replace("\'", "")
-                    _location = _column[4].text.strip().replace("\r", "").replace("\t", "").replace("\n","")
-                    _work_type = _column[5].text.strip().replace("\r", "").replace("\t", "").replace("\n","")
-                    _register_date = _column[6].text.strip().replace("\r", "").replace("\t", "").replace("\n","")
-                    _deadline_date = _column[7].text.strip().replace("\r", "").replace("\t", "").replace("\n","")[:8]
-                    _status = _column[8].text.strip()
-
-                    _parsing.append({
-                        "title": _title,
-                        "rigister_date": _register_date,
-                        "deadline_date": f"20{_deadline_date}",
-                        "status": _status,
-                        "memo": f"고용형태:{_work_type}\n위치: {_location}\n공고링크: (web){_link}\n\t(mobile){_mobile_link}"
-                    })
-            else:
-                self._logger.error(msg := f"Could not get the webpage. status code is {response.status_code}")
-                raise exception.RequestException(msg)
+            _selected = self._parse_page(self._get_page(page_no))
+            if not _selected:
+                break
+
+            _selected = self._filter_seen(_selected, full)
+            if _selected:
+                yield _selected
+            if self._reached_watermark:
+                break
+            page_no += 1
+
+    def _iter_concurrent(self, first_page_no, last_page_no, full=False):
+        """Get the pages concurrently and keep the page order.
+
+        The pages are requested in batches of the current worker count. The worker count is halved when the
+        slowest page of a batch takes longer than 'slow_threshold' times the median latency of the recent pages, and
+        it is increased by one again when a batch is fast.
+
+        :param int first_page_no: First page number.
+        :param int last_page_no: Last page number.
+        :param bool full: Ignore the watermark. (default=False)
+        :return: Generator of the parsed data list of a page.
+        :rtype: generator
+        """
+        _workers = self._concurrency
+        _page_no = first_page_no
+
+        with ThreadPoolExecutor(max_workers=self._concurrency) as _executor:
+            while _page_no <= last_page_no:
+                _batch = list(range(_page_no, min(_page_no + _workers, last_page_no + 1)))
+
+                for _content in _executor.map(self._get_page, _batch):
+                    _selected = self._filter_seen(self._parse_page(_content), full)
+                    if _selected:
+                        yield _selected
+                    if self._reached_watermark:
+                        return
+
+                _slowest = max(self._latency[_no] for _no in _batch)
+                _median = self._client.get_percentiles((50,), self._url).get("p50")
+                if (_median is not None) and (_slowest > _median * self._slow_threshold):
+                    _workers = max(1, _workers // 2)
+                    self._logger.debug("Server slows down (%.2f sec). Concurrency is decreased to %d.", _slowest, _workers)
+                elif _workers < self._concurrency:
+                    _workers += 1
+                    self._logger.debug("Concurrency is increased to %d.", _workers)
+
+                _page_no = _batch[-1] + 1
+
+    def _filter_seen(self, parsed_list, full=False) -> list:
+        """Remove the notices which are already processed, and remember whether the watermark is reached.
+
+        :param list parsed_list: Parsed data list of one page.
+        :param bool full: Keep every notice. (default=False)
+        :return: Notices newer than the watermark.
+        :rtype: list
+        """
+        if full:
+            return parsed_list
 
-            _pageNo += 1
+        _new = [_noti for _noti in parsed_list if not self._watermark.is_seen(_noti)]
+        if len(_new) != len(parsed_list):
+            self._reached_watermark = True
+            self._logger.debug("The watermark is reached. (%d notices are skipped.)", len(parsed_list) - len(_new))
+        return _new
 
-        self._logger.info(f"Web scraping is finish. (Total notice of employment: {len(_parsing)})")
-        return _parsing
+    def update_watermark(self, notice_list) -> None:
+        """Save the newest processed notice as the watermark.
+
+        The watermark is kept while the last scraping is not complete, so the pages not got are walked again.
+
+        :param list notice_list: Processed notice list.
+        """
+        if not self.complete:
+            self._logger.warning("The watermark is not updated, because the web scraping is not complete.")
+            return
+
+        self._watermark.update(notice_list)
+        self._watermark.save()
+        self._logger.debug("The watermark is updated. (idx: %s, date: %s)", self._watermark.idx, self._watermark.register_date)
+
+    @staged("fetch")
+    def _get_page(self, page_no, params=None) -> bytes:
+        """Get the page content.
+
+        :param int page_no: Page number.
+        :param dict params: Params of the period and the filters. (default=None, the params of the last period)
+        :return: Page content.
+        :rtype: bytes
+        :raise RequestException: if request is not normal.
+        """
+        self._logger.debug("Get (%d) th page information...", page_no)
+        _start_time = time.perf_counter()
+        try:
+            response = self._client.get(self._url, params={**(params or self._params), "pageNo": page_no})
+        except requests.exceptions.RequestException as e:
+            self._logger.error(msg := f"Could not get the webpage. ({type(e).__name__}: {e})")
+            raise exception.RequestException(msg)
+        finally:
+            _elapsed = time.perf_counter() - _start_time
+            self._latency[page_no] = _elapsed
+            METRICS.observe("page_seconds", _elapsed)
+
+        if response.status_code != 200:
+            self._logger.error(msg := f"Could not get the webpage. status code is {response.status_code}")
+            raise exception.RequestException(msg)
+        return response.content
+
+    @staged("parse")
+    def _parse_page(self, content) -> list:
+        """Parse the page content.
+
+        :param bytes content: Page content.
+        :return: Parsed data list. (Empty list if there is no data.)
+        :rtype: list
+        """
+        return self._parser.parse(content)
+
+    def _get_last_page_no(self, content) -> Union[int, None]:
+        """Get the last page number from the paging area of the page.
+
+        :param bytes content: Page content.
+        :return: Last page number. (None if the paging area could not be found.)
+        :rtype: int/None
+        """
+        return self._parser.get_last_page_no(content)
 
     def __get_detail_code_info(self, detail_codes) -> list:
         """Return selected detail code information.
@@ -135,39 +345,13 @@ class JobAlioScraping:
         :return: Detail code information of Korean.
         :rtype: list.
         """
-        _korean_info = {
-            "600002": "경영·회계·사무",
-            "600003": "금융·보험",
-            "600004": "교육·자연·사회과학",
-            "600005": "법률·경찰·소방·교도·국방",
-            "600006": "보건·의료",
-            "600007": "사회복지·종교",
-            "600008": "문화·예술·디자인·방송",
-            "600009": "운전·운송",
-            "600010": "영업판매",
-            "600011": "경비·청소",
-            "600012": "이용·숙박·여행·오락·스포츠",
-            "600013": "음식서비스",
-            "600014": "건설",
-            "600015": "기계",
-            "600016": "재료",
-            "600017": "화학",
-            "600018": "섬유·의복",
-            "600019": "전기·전자",
-            "600020": "정보통신",
-            "600021": "식품가공",
-            "600022": "인쇄·목재·가구·공예",
-            "600023": "환경·에너지·안전",
-            "600024": "농림어업",
-            "600025": "연구",
-        }
         _result = []
 
         for i in detail_codes:
-            if i in _korean_info.keys():
-                _result.append(_korean_info[i])
+            if i in DETAIL_CODE_INFO.keys():
+                _result.append(DETAIL_CODE_INFO[i])
             else:
-                self._logger.warn(f"({i}) is not in detail code.")
+                self._logger.warning("(%s) is not in detail code.", i)
         return _result
 
     def __get_location_info(self, locations) -> list:
@@ -177,33 +361,13 @@ class JobAlioScraping:
         :return: Location information of Korean.
         :rtype: list.
         """
-        _korean_info = {
-            "R3009": "해외",
-            "R3010": "서울특별시",
-            "R3011": "인천광역시",
-            "R3012": "대전광역시",
-            "R3013": "대구광역시",
-            "R3014": "부산광역시",
-            "R3015": "광주광역시",
-            "R3016": "울산광역시",
-            "R3017": "경기도",
-            "R3018": "강원도",
-            "R3019": "충청남도",
-            "R3020": "충청북도",
-            "R3021": "경상북도",
-            "R3022": "경상남도",
-            "R3023": "전라남도",
-            "R3024": "전라북도",
-            "R3025": "제주특별자치도",
-            "R3026": "세종특별자치시"
-        }
         _result = []
 
         for i in locations:
-            if i in _korean_info.keys():
-                _result.append(_korean_info[i])
+            if i in LOCATION_INFO.keys():
+                _result.append(LOCATION_INFO[i])
             else:
-                self._logger.warn(f"({i}) is not in location.")
+                self._logger.warning("(%s) is not in location.", i)
         return _result
 
     def __get_work_type_info(self, work_types) -> list:
@@ -213,20 +377,13 @@ class JobAlioScraping:
         :return: Work types information of Korean.
         :rtype: list.
         """
-        _korean_info = {
-            "R1010": "정규직",
-            "R1030": "무기계약직",
-            "R1040": "비정규직",
-            "R1060": "청년인턴(체험형)",
-            "R1070": "청년인턴(채용형)"
-        }
         _result = []
 
         for i in work_types:
-            if i in _korean_info.keys():
-                _result.append(_korean_info[i])
+            if i in WORK_TYPE_INFO.keys():
+                _result.append(WORK_TYPE_INFO[i])
             else:
-                self._logger.warn(f"({i}) is not in work types.")
+                self._logger.warning("(%s) is not in work types.", i)
         return _result
 
     def __get_career_info(self, careers) -> list:
@@ -236,19 +393,13 @@ class JobAlioScraping:
         :return: Career information of Korean.
         :rtype: list.
         """
-        _korean_info = {
-            "R2010": "신입",
-            "R2020": "경력",
-            "R2030": "신입+경력",
-            "R2040": "외국인 전형"
-        }
         _result = []
 
         for i in careers:
-            if i in _korean_info.keys():
-                _result.append(_korean_info[i])
+            if i in CAREER_INFO.keys():
+                _result.append(CAREER_INFO[i])
             else:
-                self._logger.warn(f"({i}) is not in work types.")
+                self._logger.warning("(%s) is not in careers.", i)
         return _result
 
     def __get_education_info(self, educations) -> list:
@@ -258,21 +409,12 @@ class JobAlioScraping:
         :return: Education information of Korean.
         :rtype: list.
         """
-        _korean_info = {
-            "R7010": "학력무관",
-            "R7020": "중졸이하",
-            "R7030": "고졸",
-            "R7040": "대졸(2~3년)",
-            "R7050": "대졸(4년)",
-            "R7060": "석사",
-            "R7070": "박사"
-        }
         _result = []
 
         for i in educations:
-            if i in _korean_info.keys():
-                _result.append(_korean_info[i])
+            if i in EDUCATION_INFO.keys():
+                _result.append(EDUCATION_INFO[i])
             else:
-                self._logger.warn(f"({i}) is not in work types.")
+                self._logger.warning("(%s) is not in educations.", i)
         return _result
 
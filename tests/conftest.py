@@ -0,0 +1,46 @@
+import datetime
+import json
+import logging
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIGURATION_PATH = os.path.join(ROOT, "config", "init.json")
+
+
+@pytest.fixture
+def configuration():
+    """Configuration dictionary of config/init.json. Each test gets its own copy."""
+    with open(CONFIGURATION_PATH, encoding="utf-8") as _f:
+        return json.load(_f)
+
+
+@pytest.fixture
+def logger():
+    """Logger which writes nothing."""
+    _logger = logging.getLogger("tests")
+    if not _logger.handlers:
+        _logger.addHandler(logging.NullHandler())
+    _logger.propagate = False
+    return _logger
+
+
+@pytest.fixture
+def make_notice():
+    """Factory of the scraped notice dictionary.
+
+    The register date is today and the deadline date is 3 days later unless they are given.
+    """
+    def _make_notice(idx, title=None, register_date=None, deadline_date=None, **fields):
+        register_date = register_date or datetime.date.today().strftime("%Y.%m.%d")
+        if deadline_date is None:
+            _register = datetime.datetime.strptime(register_date, "%Y.%m.%d").date()
+            deadline_date = (_register + datetime.timedelta(days=3)).strftime("%Y.%m.%d")
+        return {
+            "idx": str(idx), "title": title or f"[기관] 채용 공고 ({idx})", "rigister_date": register_date,
+            "deadline_date": deadline_date, "status": "진행중", "location": "서울특별시", "work_type": "정규직",
+            "memo": f"https://job.alio.go.kr/recruitview.do?idx={idx}", **fields
+        }
+
+    return _make_notice
@@ -0,0 +1,46 @@
+import datetime
+import json
+import os
+
+import pytest
+
+from benchmark.fixture_server import FixtureServer
+from module import exception
+from module.backfill import JobAlioBackfill
+
+
+@pytest.fixture
+def fixture():
+    _fixture = FixtureServer(pages=6, rows=5, start_date=datetime.date(2024, 1, 21))
+    _fixture.start()
+    yield _fixture
+    _fixture.stop()
+
+
+def _create_backfill(configuration, logger, fixture, directory):
+    _configuration = json.loads(json.dumps(configuration))
+    _configuration["web_scraping"].update({
+        "url": fixture.url, "http": {"retries": 0},
+        "backfill": {"window_days": 2, "concurrency": 1, "processes": 1, "max_pending_pages": 1,
+                     "output_dir": os.path.join(directory, "backfill")}
+    })
+    return JobAlioBackfill(_configuration, logger)
+
+
+def _read_manifest(directory):
+    with open(os.path.join(directory, "backfill", "manifest.json"), encoding="utf-8") as _f:
+        return json.load(_f)["windows"]
+
+
+def test_finished_windows_are_recorded_when_a_window_fails(configuration, logger, fixture, tmp_path):
+    # The first request of the first page fails, which is the first window with one fetcher.
+    fixture.faults = {1: [500]}
+    with pytest.raises(exception.RequestException):
+        _create_backfill(configuration, logger, fixture, tmp_path).run(datetime.date(2024, 1, 16), datetime.date(2024, 1, 21))
+    assert sorted(_read_manifest(tmp_path)) == ["20240118-20240119", "20240120-20240121"]
+
+    _requests = fixture.requests
+    assert _create_backfill(configuration, logger, fixture, tmp_path).run(datetime.date(2024, 1, 16), datetime.date(2024, 1, 21)) == 10
+    assert len(_read_manifest(tmp_path)) == 3
+    # Only the failed window is fetched again. (Its 2 pages and the empty page after them)
+    assert fixture.requests - _requests == 3
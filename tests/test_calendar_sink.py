@@ -0,0 +1,106 @@
+import datetime
+import os
+
+import pytest
+
+from benchmark.caldav_server import FakeCalDAVServer
+from module.calendar_sink import CalDAVSink, ICalendarSink, get_uid, read_events
+from module.diff import ADD, DELETE, UPDATE
+
+
+def _create_ics_sink(directory):
+    return ICalendarSink({"calendar_sink": {
+        "type": "ics", "path": os.path.join(directory, "jobalio.ics"),
+        "sync_index": os.path.join(directory, "sync_index.sqlite3")
+    }})
+
+
+def test_ics_keeps_the_events_of_the_previous_run(tmp_path, make_notice):
+    _sink = _create_ics_sink(tmp_path)
+    _sink.add_schedules([make_notice(1), make_notice(2)])
+    _sink.finalize()
+
+    _sink = _create_ics_sink(tmp_path)
+    assert _sink.arrange_schedule([make_notice(1), make_notice(3)]) == [make_notice(3)]
+    _sink.add_schedules([make_notice(3)])
+    _sink.finalize()
+
+    assert set(read_events(os.path.join(tmp_path, "jobalio.ics"))) == {get_uid(make_notice(_idx)) for _idx in (1, 2, 3)}
+
+
+def test_ics_replaces_the_event_of_a_changed_notice(tmp_path, make_notice):
+    _sink = _create_ics_sink(tmp_path)
+    _sink.add_schedules([make_notice(1), make_notice(2)])
+    _sink.finalize()
+
+    _sink = _create_ics_sink(tmp_path)
+    _sink.delete_schedule(make_notice(2), None)
+    _sink.apply_changes([])
+    _sink.finalize()
+
+    _events = read_events(os.path.join(tmp_path, "jobalio.ics"))
+    assert len(_events) == 2
+    assert "STATUS:CANCELLED" in _events[get_uid(make_notice(2))]
+    assert "STATUS:CANCELLED" not in _events[get_uid(make_notice(1))]
+
+
+def _create_caldav_sink(directory, fake):
+    return CalDAVSink({"calendar_sink": {
+        "type": "caldav", "url": fake.url, "sync_index": os.path.join(directory, "sync_index.sqlite3"),
+        "http": {"retries": 0}
+    }})
+
+
+def test_join_adds_the_submitted_notices_once(tmp_path, make_notice):
+    _sink = _create_ics_sink(tmp_path)
+    assert _sink.join() == []
+    _sink.submit(make_notice(1))
+    _sink.submit(make_notice(2))
+
+    assert _sink.join() == [make_notice(1), make_notice(2)]
+    assert _sink.join() == []
+    _sink.finalize()
+
+
+@pytest.fixture
+def fake_caldav(make_notice):
+    _fake = FakeCalDAVServer(events={f"{get_uid(make_notice(1))}.ics": "BEGIN:VCALENDAR\r\nEND:VCALENDAR\r\n"})
+    _fake.start()
+    yield _fake
+    _fake.stop()
+
+
+def test_caldav_puts_the_new_notices(tmp_path, fake_caldav, make_notice):
+    _sink = _create_caldav_sink(tmp_path, fake_caldav)
+    _new = _sink.arrange_schedule([make_notice(1), make_notice(2), make_notice(3)])
+    assert _new == [make_notice(2), make_notice(3)]
+
+    assert _sink.add_schedules(_new) == _new
+    _sink.finalize()
+    assert fake_caldav.requests == {"REPORT": 1, "PUT": 2}
+    assert "SUMMARY:[기관] 채용 공고 (2)" in fake_caldav.events[f"{get_uid(make_notice(2))}.ics"]
+
+
+def test_caldav_does_not_overwrite_an_existing_event(tmp_path, fake_caldav, make_notice):
+    _sink = _create_caldav_sink(tmp_path, fake_caldav)
+    _original = fake_caldav.events[f"{get_uid(make_notice(1))}.ics"]
+
+    assert _sink.add_schedules([make_notice(1), make_notice(2)]) == [make_notice(2)]
+    _sink.finalize()
+    assert fake_caldav.events[f"{get_uid(make_notice(1))}.ics"] == _original
+
+
+def test_caldav_updates_and_deletes_the_changed_notices(tmp_path, fake_caldav, make_notice):
+    _sink = _create_caldav_sink(tmp_path, fake_caldav)
+    _sink.add_schedules([make_notice(2), make_notice(3)])
+
+    _deadline = datetime.date.today() + datetime.timedelta(days=10)
+    _changed = make_notice(2, deadline_date=_deadline.strftime("%Y.%m.%d"))
+    _closed = make_notice(3, status="마감")
+    _operations = _sink.diff([make_notice(1), _changed, _closed])
+    assert [_operation.kind for _operation in _operations] == [ADD, UPDATE, DELETE]
+
+    _sink.apply_changes(_operations[1:])
+    _sink.finalize()
+    assert f"DTEND;VALUE=DATE:{_deadline + datetime.timedelta(days=1):%Y%m%d}" in fake_caldav.events[f"{get_uid(_changed)}.ics"]
+    assert f"{get_uid(_closed)}.ics" not in fake_caldav.events
@@ -0,0 +1,39 @@
+from module.dedup import NEW, REPOST, SAME, FuzzyIndex, normalize_title
+
+ORIGINAL = "[한국공항공사] 2024년 전문직(변호사) 채용 공고"
+
+
+def _notice(title, register_date="2024.03.04", deadline_date="2024.03.18"):
+    return {"title": title, "rigister_date": register_date, "deadline_date": deadline_date}
+
+
+def test_normalize_title_keeps_the_posting_word_of_a_repost():
+    assert normalize_title(ORIGINAL) == normalize_title("[한국공항공사] 2024년 전문직(변호사) 채용 재공고")
+
+
+def test_repost_of_a_known_schedule():
+    _index = FuzzyIndex()
+    _index.add(ORIGINAL, "2024.02.01", "2024.02.15", record={"idx": "1"})
+
+    _match = _index.classify([_notice("[한국공항공사] 2024년 전문직(변호사) 채용 재공고")])[0]
+    assert _match.kind == REPOST
+    assert _match.record == {"idx": "1"}
+
+
+def test_same_posting_listed_again():
+    _index = FuzzyIndex()
+    _index.add(ORIGINAL, "2024.03.04", "2024.03.18")
+
+    assert _index.classify([_notice(ORIGINAL)])[0].kind == SAME
+
+
+def test_unrelated_postings_of_the_same_organization_stay_new():
+    _index = FuzzyIndex()
+    _index.add(ORIGINAL, "2024.02.01", "2024.02.15")
+
+    _matches = _index.classify([
+        _notice("[한국공항공사] 2024년 시설관리직 채용 공고"),
+        _notice("[한국공항공사] 2024년 청년인턴 모집"),
+        _notice("[한국공항공사] 2023년 전문직(변호사) 채용 공고"),
+    ])
+    assert [_match.kind for _match in _matches] == [NEW, NEW, NEW]
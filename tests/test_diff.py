@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from module.diff import ADD, DELETE, UPDATE, count_operations, diff_notices
+from module.sync_state import SyncIndex
+
+
+@pytest.fixture
+def sync_index(tmp_path):
+    _sync_index = SyncIndex(os.path.join(tmp_path, "sync_index.sqlite3"))
+    yield _sync_index
+    _sync_index.close()
+
+
+def test_every_open_notice_is_added_without_an_index(make_notice):
+    _operations = diff_notices([make_notice(1), make_notice(2, status="마감")])
+
+    assert [(_operation.kind, _operation.notice["idx"], _operation.record) for _operation in _operations] == [
+        (ADD, "1", None)
+    ]
+
+
+def test_recorded_notices_are_updated_or_deleted(sync_index, make_notice):
+    for _idx in range(1, 5):
+        sync_index.record(make_notice(_idx), "calendar")
+    _notices = [
+        make_notice(1),
+        make_notice(2, deadline_date="2099.12.31"),
+        make_notice(3, title="[기관] 채용 공고 (변경)"),
+        make_notice(4, status="마감"),
+        make_notice(5),
+        make_notice(6, status="마감")
+    ]
+    _operations = diff_notices(_notices, sync_index)
+
+    assert [(_operation.kind, _operation.notice["idx"]) for _operation in _operations] == [
+        (UPDATE, "2"), (UPDATE, "3"), (DELETE, "4"), (ADD, "5")
+    ]
+    assert _operations[0].record == sync_index.get(make_notice(2))
+    assert count_operations(_operations) == {UPDATE: 2, DELETE: 1, ADD: 1}
+
+
+def test_deadline_not_recorded_by_the_old_index_is_not_compared(sync_index, make_notice):
+    sync_index.record(dict(make_notice(1), deadline_date=None), "calendar")
+
+    assert diff_notices([make_notice(1, deadline_date="2099.12.31")], sync_index) == []
+    assert diff_notices([make_notice(1, status="접수마감")], sync_index, ("마감", "접수마감"))[0].kind == DELETE
@@ -0,0 +1,76 @@
+import json
+import os
+import time
+
+import pytest
+
+from benchmark.fixture_server import FixtureServer
+from module.enrichment import DetailEnricher, parse_detail
+
+
+def test_parse_detail_finds_the_items_by_the_header_labels():
+    _detail = parse_detail(FixtureServer.render_detail("12"), "https://job.alio.go.kr/recruitview.do?idx=12")
+
+    assert _detail == {
+        "period": "2026.01.01 09:00 ~ 2026.01.15 18:00",
+        "headcount": "4명",
+        "attachments": [
+            {"name": "공고문.hwp", "url": "https://job.alio.go.kr/fileDownload.do?fileNo=121"},
+            {"name": "응시원서.hwp", "url": "https://job.alio.go.kr/fileDownload.do?fileNo=122"}
+        ]
+    }
+
+
+def test_parse_detail_matches_the_fallback_labels_as_a_whole():
+    _content = (
+        '<table><tr><th>근무기간</th><td>2년</td><th>응시인원 제한</th><td>없음</td></tr>'
+        '<tr><th>기간</th><td>2026.01.01 ~ 2026.01.15</td><th>첨부파일 안내</th><td><a href="/a.hwp">a</a></td></tr>'
+        '</table>'
+    ).encode("utf-8")
+    _detail = parse_detail(_content, "https://job.alio.go.kr/recruitview.do?idx=1")
+
+    assert _detail == {"period": "2026.01.01 ~ 2026.01.15", "headcount": None, "attachments": []}
+
+
+@pytest.fixture
+def fixture():
+    _fixture = FixtureServer(pages=1, rows=1)
+    _fixture.start()
+    yield _fixture
+    _fixture.stop()
+
+
+def _create_enricher(fixture, directory, ttl, logger):
+    return DetailEnricher({"web_scraping": {"enrichment": {
+        "url": fixture.url.replace("recruit.do", "recruitview.do"), "ttl": ttl, "concurrency": 1,
+        "cache_dir": os.path.join(directory, "detail_cache"), "http": {"retries": 0}
+    }}}, logger)
+
+
+def test_fresh_cache_is_used_without_a_request(fixture, tmp_path, logger, make_notice):
+    _enricher = _create_enricher(fixture, tmp_path, 3600, logger)
+    _first = _enricher.enrich([make_notice(12)])
+    _requests = fixture.requests
+
+    assert _enricher.enrich([make_notice(12)]) == _first
+    assert fixture.requests == _requests
+    assert _first[0]["headcount"] == "4명"
+    _enricher.finalize()
+
+
+def test_expired_cache_is_revalidated_by_the_etag(fixture, tmp_path, logger, make_notice):
+    _enricher = _create_enricher(fixture, tmp_path, 0, logger)
+    _first = _enricher.enrich([make_notice(12)])
+    _path = os.path.join(tmp_path, "detail_cache", "12.json")
+    with open(_path, encoding="utf-8") as _f:
+        _entry = json.load(_f)
+    assert _entry["etag"] == '"detail-12"'
+
+    _requests, _bytes = fixture.requests, fixture.bytes
+    time.sleep(0.01)
+    assert _enricher.enrich([make_notice(12)]) == _first
+    # The server answered 304 Not Modified, so the page was not downloaded again and the entry is renewed.
+    assert (fixture.requests, fixture.bytes) == (_requests + 1, _bytes)
+    with open(_path, encoding="utf-8") as _f:
+        assert json.load(_f)["fetched_at"] > _entry["fetched_at"]
+    _enricher.finalize()
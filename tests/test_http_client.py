@@ -0,0 +1,69 @@
+import json
+import os
+
+from benchmark.fixture_server import FixtureServer
+from module.http_client import HttpClient, get_percentiles
+from module.sync_state import Watermark
+from module.web_scraping import JobAlioScraping
+
+
+def test_get_percentiles_uses_the_nearest_rank():
+    assert get_percentiles(list(range(1, 101))) == {"p50": 50, "p90": 90, "p99": 99}
+    assert get_percentiles([]) == {}
+
+
+def test_hedge_delay_is_the_recent_p95_of_the_same_host():
+    _slow = FixtureServer(pages=1, rows=1, latency=0.1)
+    _fast = FixtureServer(pages=1, rows=1)
+    _slow.start()
+    _fast.start()
+    _client = HttpClient({"hedge_after": "auto", "latency_window": 20})
+    try:
+        # A fast host does not make the requests to the slow host hedged at once.
+        for _ in range(20):
+            _client.get(_fast.url)
+        assert _client._get_hedge_delay(_slow.url) is None
+
+        for _ in range(20):
+            _client.get(_slow.url)
+        # The fast host is compared with the slow one, not with a fixed time, as a busy machine slows both.
+        assert _client._get_hedge_delay(_slow.url) >= 0.1
+        assert _client._get_hedge_delay(_fast.url) < _client._get_hedge_delay(_slow.url)
+        assert _slow.requests == 20
+    finally:
+        _client.close()
+        _slow.stop()
+        _fast.stop()
+
+
+def _create_scraping(configuration, logger, fixture, directory):
+    _configuration = json.loads(json.dumps(configuration))
+    _configuration["web_scraping"].update({
+        "url": fixture.url, "concurrency": 1, "http": {"retries": 0},
+        "state_file": os.path.join(directory, "watermark.json")
+    })
+    return JobAlioScraping(_configuration, logger)
+
+
+def test_notices_of_the_pages_before_a_failed_page_are_kept(configuration, logger, tmp_path):
+    _fixture = FixtureServer(pages=3, rows=2)
+    _fixture.faults = {2: [500]}
+    _fixture.start()
+    try:
+        _scraping = _create_scraping(configuration, logger, _fixture, tmp_path)
+        _notices = _scraping.start()
+        assert len(_notices) == 2
+        assert not _scraping.complete
+
+        # The watermark stays, so the next run walks the pages not got.
+        _scraping.update_watermark(_notices)
+        assert Watermark(os.path.join(tmp_path, "watermark.json")).is_empty()
+
+        _scraping = _create_scraping(configuration, logger, _fixture, tmp_path)
+        _notices = _scraping.start()
+        assert len(_notices) == 6
+        assert _scraping.complete
+        _scraping.update_watermark(_notices)
+        assert not Watermark(os.path.join(tmp_path, "watermark.json")).is_empty()
+    finally:
+        _fixture.stop()
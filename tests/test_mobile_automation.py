@@ -0,0 +1,53 @@
+import datetime
+import os
+
+import pytest
+
+from benchmark.fake_webdriver import FakeWebDriverServer
+from module.mobile_automation import NaverCalendar
+
+
+@pytest.fixture
+def fake(configuration):
+    _today = datetime.date.today().strftime("%Y.%m.%d")
+    # An annual posting reuses the title of the last year, whose schedule is still in the calendar.
+    _fake = FakeWebDriverServer(configuration["mobile"]["calendar"], events={
+        "[기관] 정기 채용 공고": "2023.03.02", "[기관] 인턴 채용 공고": _today
+    })
+    _fake.start()
+    yield _fake
+    _fake.stop()
+
+
+@pytest.fixture
+def calendar(tmp_path, configuration, logger, fake):
+    configuration["mobile"].update({
+        "appium_url": fake.url, "sync_index": os.path.join(tmp_path, "sync_index.sqlite3"),
+        "reconcile_mode": "harvest", "fuzzy_dedup": False
+    })
+    _calendar = NaverCalendar(configuration, logger)
+    _calendar.open()
+    yield _calendar
+    _calendar.finalize()
+
+
+def test_harvest_checks_the_date_of_a_title_only_match(calendar, make_notice):
+    _annual = make_notice(1, "[기관] 정기 채용 공고")
+    _known = make_notice(2, "[기관] 인턴 채용 공고")
+    _new = make_notice(3, "[기관] 연구직 채용 공고")
+
+    assert calendar.arrange_schedule([_annual, _known, _new], reconcile=True) == [_annual, _new]
+
+
+def test_changed_schedule_is_edited_then_deleted(calendar, fake, configuration, make_notice):
+    _known = make_notice(2, "[기관] 인턴 채용 공고")
+    calendar._sync_index.record(_known, configuration["mobile"]["calendar"])
+    _changed = make_notice(2, "[기관] 인턴 채용 공고 (연장)")
+
+    calendar.edit_schedule(_changed, calendar._sync_index.get(_known))
+    assert fake.state.events == {"[기관] 정기 채용 공고": "2023.03.02", _changed["title"]: _changed["rigister_date"]}
+    assert calendar._sync_index.get(_changed)["title"] == _changed["title"]
+
+    calendar.delete_schedule(_changed, calendar._sync_index.get(_changed))
+    assert fake.state.events == {"[기관] 정기 채용 공고": "2023.03.02"}
+    assert _changed not in calendar._sync_index
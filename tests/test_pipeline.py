@@ -0,0 +1,53 @@
+import json
+import os
+
+import pytest
+
+from benchmark.caldav_server import FakeCalDAVServer
+from benchmark.fixture_server import FixtureServer
+from module import exception
+from module.pipeline import SyncPipeline
+
+
+@pytest.fixture
+def servers():
+    _fixture = FixtureServer(pages=2, rows=3)
+    _caldav = FakeCalDAVServer()
+    _fixture.start()
+    _caldav.start()
+    yield _fixture, _caldav
+    _fixture.stop()
+    _caldav.stop()
+
+
+def _create_pipeline(configuration, logger, servers, directory):
+    _fixture, _caldav = servers
+    _configuration = json.loads(json.dumps(configuration))
+    _configuration["web_scraping"].update({
+        "url": _fixture.url, "http": {"retries": 0}, "state_file": os.path.join(directory, "watermark.json")
+    })
+    _configuration["calendar_sink"] = {
+        "type": "caldav", "url": _caldav.url, "concurrency": 1, "http": {"retries": 0},
+        "sync_index": os.path.join(directory, "sync_index.sqlite3")
+    }
+    _configuration["journal"] = {"path": os.path.join(directory, "journal.jsonl")}
+    return SyncPipeline(_configuration, logger)
+
+
+def test_resumed_run_inserts_only_the_notices_not_inserted(configuration, logger, servers, tmp_path):
+    _fixture, _caldav = servers
+    # The first PUT fails, so the run stops after the other notices are inserted.
+    _caldav.faults = {"PUT": [500]}
+    with pytest.raises(exception.RequestException):
+        _create_pipeline(configuration, logger, servers, tmp_path).run()
+    assert (len(_caldav.events), _caldav.requests["PUT"]) == (5, 6)
+    assert not os.path.exists(os.path.join(tmp_path, "watermark.json"))
+
+    _requests = _fixture.requests
+    _added = _create_pipeline(configuration, logger, servers, tmp_path).run(resume=True)
+
+    # Only the failed notice is put again, and the pages are not scraped again.
+    assert len(_added) == 1
+    assert (len(_caldav.events), _caldav.requests["PUT"]) == (6, 7)
+    assert _fixture.requests == _requests
+    assert os.path.exists(os.path.join(tmp_path, "watermark.json"))
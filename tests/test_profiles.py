@@ -0,0 +1,24 @@
+from module.profiles import ProfileRouter
+
+PROFILES = [
+    {"name": "regular", "calendar": "정규직", "work_type": ["R1010"]},
+    {"name": "contract", "calendar": "비정규직", "work_type": ["R1040"]},
+    {"name": "busan", "calendar": "부산", "location": ["R3014"]},
+]
+
+
+def _route(notice):
+    return [_noti["calendar"] for _noti in ProfileRouter(PROFILES).route([notice])]
+
+
+def test_regular_does_not_match_a_non_regular_notice(make_notice):
+    assert _route(make_notice(1, work_type="비정규직")) == ["비정규직"]
+    assert _route(make_notice(2, work_type="정규직")) == ["정규직"]
+
+
+def test_a_cell_with_several_values_matches_each_of_them(make_notice):
+    assert _route(make_notice(1, location="서울특별시부산광역시", work_type="무기계약직")) == ["부산"]
+    assert _route(make_notice(2, location="서울특별시, 부산광역시", work_type="비정규직정규직")) == [
+        "정규직", "비정규직", "부산"
+    ]
+    assert _route(make_notice(3, location="서울특별시 경기도", work_type="무기계약직")) == []
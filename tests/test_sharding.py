@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from benchmark.fake_webdriver import FakeWebDriverServer
+from module import exception
+from module.sharding import DevicePool
+from module.sync_state import SyncIndex
+
+
+@pytest.fixture
+def fakes(configuration):
+    _fakes = [FakeWebDriverServer(configuration["mobile"]["calendar"]) for _ in range(2)]
+    for _fake in _fakes:
+        _fake.start()
+    yield _fakes
+    for _fake in _fakes:
+        _fake.stop()
+
+
+def _create_pool(configuration, fakes, tmp_path, logger):
+    _capabilities = configuration["mobile"]["capabilities"]
+    configuration["mobile"]["devices"] = [
+        {"capabilities": dict(_capabilities, deviceName=f"fake-{i}"), "appium_url": _fake.url}
+        for i, _fake in enumerate(fakes)
+    ]
+    _sync_index = SyncIndex(os.path.join(tmp_path, "sync_index.sqlite3"))
+    return DevicePool(configuration, logger, sync_index=_sync_index), _sync_index
+
+
+def test_each_notice_is_added_by_one_device(configuration, fakes, tmp_path, logger, make_notice):
+    _pool, _sync_index = _create_pool(configuration, fakes, tmp_path, logger)
+    _pool.open()
+    _notices = [make_notice(_idx) for _idx in range(1, 7)]
+
+    # A notice queued twice is claimed by only one device.
+    for _noti in _notices + _notices:
+        _pool.submit(_noti)
+    _added = _pool.join()
+    _pool.finalize()
+
+    assert sorted(_noti["idx"] for _noti in _added) == [_noti["idx"] for _noti in _notices]
+    assert all(_noti in _sync_index for _noti in _notices)
+    _events = [_title for _fake in fakes for _title in _fake.state.events]
+    assert sorted(_events) == sorted(_noti["title"] for _noti in _notices)
+
+
+def test_failing_device_releases_its_claims(configuration, fakes, tmp_path, logger, make_notice):
+    _pool, _sync_index = _create_pool(configuration, fakes, tmp_path, logger)
+    _pool.open()
+    fakes[1].faults["GET /source"] = [500] * 100
+    _notices = [make_notice(_idx) for _idx in range(1, 7)]
+
+    with pytest.raises(exception.AppiumException):
+        _pool.add_schedules(_notices)
+    _pool.finalize()
+
+    _failed = [_noti for _noti in _notices if _noti not in _sync_index]
+    assert _failed
+    assert not fakes[1].state.events
+    assert sorted(fakes[0].state.events) == sorted(_noti["title"] for _noti in _notices if _noti in _sync_index)
+    assert all(_sync_index.claim(_noti) for _noti in _failed)
+
+
+def test_opened_devices_are_finalized_when_a_device_fails(configuration, fakes, tmp_path, logger, make_notice):
+    _pool, _sync_index = _create_pool(configuration, fakes, tmp_path, logger)
+    fakes[1].faults["POST /session"] = [500]
+
+    with pytest.raises(Exception):
+        _pool.open()
+    assert fakes[0].commands["DELETE /session"] == 1
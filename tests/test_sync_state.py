@@ -0,0 +1,84 @@
+import os
+import sqlite3
+
+from module.sync_state import SyncIndex, Watermark
+
+
+def _notice(idx, register_date):
+    return {"idx": str(idx), "rigister_date": register_date}
+
+
+def test_empty_watermark_has_seen_nothing(tmp_path):
+    _watermark = Watermark(os.path.join(tmp_path, "watermark.json"))
+
+    assert _watermark.is_empty()
+    assert not _watermark.is_seen(_notice(1, "2024.01.01"))
+
+
+def test_notices_of_the_same_date_are_ordered_by_the_idx(tmp_path):
+    _watermark = Watermark(os.path.join(tmp_path, "watermark.json"))
+    _watermark.update([_notice(9, "2024.03.04"), _notice(10, "2024.03.04"), _notice(12, "2024.03.01")])
+
+    assert (_watermark.idx, _watermark.register_date) == (10, "2024.03.04")
+    assert _watermark.is_seen(_notice(10, "2024.03.04"))
+    assert _watermark.is_seen(_notice(9, "2024.03.04"))
+    assert not _watermark.is_seen(_notice(11, "2024.03.04"))
+    # A smaller idx of a newer date is new.
+    assert not _watermark.is_seen(_notice(2, "2024.03.05"))
+
+
+def test_saved_watermark_is_loaded(tmp_path):
+    _path = os.path.join(tmp_path, "state", "watermark.json")
+    _watermark = Watermark(_path)
+    _watermark.update([_notice(10, "2024.03.04")])
+    _watermark.save()
+
+    _loaded = Watermark(_path)
+    assert (_loaded.idx, _loaded.register_date) == (10, "2024.03.04")
+    assert _loaded.is_seen(_notice(10, "2024.03.04"))
+
+
+def test_notice_is_claimed_by_one_worker(tmp_path, make_notice):
+    _index = SyncIndex(os.path.join(tmp_path, "sync_index.sqlite3"))
+    _notice = make_notice(1)
+
+    assert _index.claim(_notice)
+    assert not _index.claim(_notice)
+    _index.release(_notice)
+    assert _index.claim(_notice)
+
+    _index.record(_notice, "calendar")
+    assert _notice in _index
+    assert not _index.claim(_notice)
+    # The same notice routed to another calendar is another schedule.
+    assert _index.claim(dict(_notice, calendar="other"))
+    _index.close()
+
+
+def test_index_without_the_route_is_migrated(tmp_path, make_notice):
+    _path = os.path.join(tmp_path, "sync_index.sqlite3")
+    _notice = make_notice(1)
+    _connection = sqlite3.connect(_path)
+    _connection.execute(
+        "CREATE TABLE schedule (idx TEXT NOT NULL, register_date TEXT NOT NULL, title TEXT NOT NULL, "
+        "deadline_date TEXT, status TEXT, calendar TEXT, created_at TEXT NOT NULL, PRIMARY KEY (idx, register_date))"
+    )
+    _connection.execute(
+        "INSERT INTO schedule VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ("1", _notice["rigister_date"], _notice["title"], _notice["deadline_date"], "진행중", "calendar", "2024-01-01")
+    )
+    _connection.commit()
+    _connection.close()
+
+    _index = SyncIndex(_path)
+    assert _notice in _index
+    assert _index.get_records() == [{
+        "idx": "1", "rigister_date": _notice["rigister_date"], "route": "", "title": _notice["title"],
+        "deadline_date": _notice["deadline_date"], "status": "진행중", "calendar": "calendar"
+    }]
+    _index.record(dict(_notice, calendar="other"), "other")
+    _index.close()
+
+    _index = SyncIndex(_path)
+    assert len(_index) == 2
+    _index.close()